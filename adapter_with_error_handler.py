@@ -3,6 +3,7 @@
 import sys
 import traceback
 from datetime import datetime
+from typing import Awaitable, Callable, List
 
 from botbuilder.core import (
     BotFrameworkAdapter,
@@ -10,7 +11,13 @@ from botbuilder.core import (
     ConversationState,
     TurnContext,
 )
-from botbuilder.schema import ActivityTypes, Activity
+from botbuilder.schema import ActivityTypes, Activity, ResourceResponse
+from botframework.connector.aio import ConnectorClient
+from botframework.connector.auth import AppCredentials
+
+from helpers.http_pool import HttpPool, PooledPipeline
+from helpers.metrics import METRICS, TurnMetrics
+from helpers.outbound_buffer import OutboundBuffer
 
 
 class AdapterWithErrorHandler(BotFrameworkAdapter):
@@ -18,9 +25,13 @@ class AdapterWithErrorHandler(BotFrameworkAdapter):
             self,
             settings: BotFrameworkAdapterSettings,
             conversation_state: ConversationState,
+            http_pool: HttpPool = None,
+            batch_outbound: bool = False,
     ):
         super().__init__(settings)
         self._conversation_state = conversation_state
+        self._http_pool = http_pool
+        self._batch_outbound = batch_outbound
 
         # Catch-all for errors.
         async def on_error(context: TurnContext, error: Exception):
@@ -54,3 +65,46 @@ class AdapterWithErrorHandler(BotFrameworkAdapter):
             await self._conversation_state.delete(context)
 
         self.on_turn_error = on_error
+
+    def _get_or_create_connector_client(
+            self, service_url: str, credentials: AppCredentials
+    ) -> ConnectorClient:
+        client = super()._get_or_create_connector_client(service_url, credentials)
+        # Connector clients are cached per service URL and credentials: switch each one to the pool once.
+        if self._http_pool is not None and not isinstance(client.config.pipeline, PooledPipeline):
+            client.config.pipeline = self._http_pool.create_pipeline(client.config)
+        return client
+
+    async def run_pipeline(
+            self, context: TurnContext, callback: Callable[[TurnContext], Awaitable] = None
+    ):
+        if not self._batch_outbound:
+            return await super().run_pipeline(context, callback)
+
+        # Hold the turn's activities, error messages included, and send them together once it's over.
+        buffer = context.turn_state[OutboundBuffer.KEY] = OutboundBuffer()
+        try:
+            return await super().run_pipeline(context, callback)
+        finally:
+            activities = buffer.take()
+            if activities:
+                await self._send(context, activities)
+
+    async def send_activities(
+            self, context: TurnContext, activities: List[Activity]
+    ) -> List[ResourceResponse]:
+        buffer = OutboundBuffer.get(context)
+        if buffer is None:
+            return await self._send(context, activities)
+        if buffer.is_holding:
+            return buffer.hold(activities)
+
+        # Sent immediately: the activities held so far go first.
+        held = buffer.take()
+        responses = await self._send(context, held + activities)
+        return responses[len(held):]
+
+    async def _send(self, context: TurnContext, activities: List[Activity]) -> List[ResourceResponse]:
+        # Each activity is a round trip to the channel's Bot Connector service.
+        with METRICS.time(TurnMetrics.SEND):
+            return await super().send_activities(context, activities)
@@ -8,30 +8,44 @@ This sample shows how to create a bot that demonstrates the following:
 - Handle user interruptions for such things as `Help` or `Cancel`.
 - Prompt for and validate requests for information from the user.
 """
+import asyncio
+import hmac
+import os
+import sys
 from http import HTTPStatus
+from typing import Optional
 
 from aiohttp import web
 from aiohttp.web import Request, Response, json_response
-from botbuilder.applicationinsights import ApplicationInsightsTelemetryClient
 from botbuilder.core import (
     BotFrameworkAdapterSettings,
-    ConversationState,
-    MemoryStorage,
+    BotTelemetryClient,
+    NullTelemetryClient,
     TelemetryLoggerMiddleware,
-    UserState,
 )
 from botbuilder.core.integration import aiohttp_error_middleware
-from botbuilder.integration.applicationinsights.aiohttp import (
-    AiohttpTelemetryProcessor,
-    bot_telemetry_middleware,
-)
 from botbuilder.schema import Activity
+from recognizers_choice import recognize_boolean
+from recognizers_date_time import recognize_datetime
+from recognizers_number import recognize_number
+from recognizers_text import Culture
 
 from adapter_with_error_handler import AdapterWithErrorHandler
 from bots import DialogAndWelcomeBot
 from config import DefaultConfig
 from dialogs import MainDialog, BookingDialog
 from flight_booking_recognizer import FlightBookingRecognizer
+from helpers.admission import AdmissionController, AdmissionRejected
+from helpers.gazetteer import Gazetteer
+from helpers.http_pool import HttpPool
+from helpers.lazy import Lazy, build_all, warm_up
+from helpers.mailbox import ConversationMailboxes, MailboxFull
+from helpers.metrics import METRICS, TurnMetrics
+from helpers.telemetry_sink import BufferedTelemetryClient
+from helpers.timex_parser import TIMEX_PARSER
+from helpers.turn_profiler import TurnProfiler
+from storage import BoundedMemoryStorage, SqliteStorage, TrackedConversationState, TrackedUserState, create_storage
+from workers import run_workers
 
 CONFIG = DefaultConfig()
 
@@ -39,65 +53,274 @@ CONFIG = DefaultConfig()
 # See https://aka.ms/about-bot-adapter to learn more about how bots work.
 SETTINGS = BotFrameworkAdapterSettings(CONFIG.APP_ID, CONFIG.APP_PASSWORD)
 
-# Create MemoryStorage, UserState and ConversationState
-MEMORY = MemoryStorage()
-USER_STATE = UserState(MEMORY)
-CONVERSATION_STATE = ConversationState(MEMORY)
+# Create the storage (see StateStorage in config.py), UserState and ConversationState
+MEMORY = create_storage(CONFIG)
+if isinstance(MEMORY, BoundedMemoryStorage):
+    METRICS.register(*MEMORY.metrics())
+
+# Both skip the write when nothing changed during the turn, and only write the changed dialog stack frames to
+# SqliteStorage.
+USER_STATE = TrackedUserState(MEMORY)
+CONVERSATION_STATE = TrackedConversationState(MEMORY)
+
+# Keep-alive connections shared by the LUIS predictions and the replies sent through the Bot Connector.
+# The session is opened when the app starts and closed on shutdown, see init_func.
+HTTP_POOL = HttpPool(
+    limit=CONFIG.HTTP_POOL_SIZE,
+    limit_per_host=CONFIG.HTTP_POOL_SIZE_PER_HOST,
+    keepalive_timeout=CONFIG.HTTP_KEEPALIVE_TIMEOUT,
+    dns_cache_ttl=CONFIG.HTTP_DNS_CACHE_TTL,
+    timeout=CONFIG.HTTP_TIMEOUT,
+)
+METRICS.register(*HTTP_POOL.metrics())
+METRICS.register(*TIMEX_PARSER.metrics())
 
 # Create adapter.
 # See https://aka.ms/about-bot-adapter to learn more about how bots work.
-ADAPTER = AdapterWithErrorHandler(SETTINGS, CONVERSATION_STATE)
+ADAPTER = AdapterWithErrorHandler(SETTINGS, CONVERSATION_STATE, HTTP_POOL, CONFIG.OUTBOUND_BATCHING)
 
 # Create telemetry client.
 # Note the small 'client_queue_size'.  This is for demonstration purposes.  Larger queue sizes
 # result in fewer calls to ApplicationInsights, improving bot performance at the expense of
 # less frequent updates.
+# Without an instrumentation key, Application Insights (and its import) is skipped altogether.
 INSTRUMENTATION_KEY = CONFIG.APPINSIGHTS_INSTRUMENTATION_KEY
-TELEMETRY_CLIENT = ApplicationInsightsTelemetryClient(
-    INSTRUMENTATION_KEY, telemetry_processor=AiohttpTelemetryProcessor(), client_queue_size=10
-)
+TELEMETRY_CLIENT: BotTelemetryClient = NullTelemetryClient()
+DIALOG_TELEMETRY_CLIENT: BotTelemetryClient = NullTelemetryClient()
+TELEMETRY_MIDDLEWARES = []
+if INSTRUMENTATION_KEY:
+    from botbuilder.applicationinsights import ApplicationInsightsTelemetryClient
+    from botbuilder.integration.applicationinsights.aiohttp import (
+        AiohttpTelemetryProcessor,
+        bot_telemetry_middleware,
+    )
+
+    TELEMETRY_CLIENT = ApplicationInsightsTelemetryClient(
+        INSTRUMENTATION_KEY, telemetry_processor=AiohttpTelemetryProcessor(), client_queue_size=10
+    )
+    TELEMETRY_MIDDLEWARES.append(bot_telemetry_middleware)
+
+    # Code for enabling activity and personal information logging.
+    TELEMETRY_LOGGER_MIDDLEWARE = TelemetryLoggerMiddleware(
+        telemetry_client=TELEMETRY_CLIENT, log_personal_information=True
+    )
+    ADAPTER.use(TELEMETRY_LOGGER_MIDDLEWARE)
+
+    # Dialog step logs and waterfall events are sent in batches by a background thread instead of inline.
+    # The middleware keeps the direct client: the aiohttp telemetry processor reads the request body per thread.
+    DIALOG_TELEMETRY_CLIENT = BufferedTelemetryClient(
+        TELEMETRY_CLIENT,
+        capacity=CONFIG.TELEMETRY_BUFFER_SIZE,
+        batch_size=CONFIG.TELEMETRY_BATCH_SIZE,
+        flush_interval=CONFIG.TELEMETRY_FLUSH_INTERVAL,
+    )
+    METRICS.register(*DIALOG_TELEMETRY_CLIENT.metrics())
+
+
+# The components below are built on first use or by the warm-up started with the app (see LazyInit in config.py),
+# each after the components its factory uses.
+
+# City names answering the origin/destination prompts locally.
+def create_gazetteer() -> Optional[Gazetteer]:
+    if not CONFIG.CITY_GAZETTEER:
+        return None
+    return Gazetteer().load(CONFIG.CITY_GAZETTEER)
+
+
+def create_recognizer() -> FlightBookingRecognizer:
+    recognizer = FlightBookingRecognizer(CONFIG, http_pool=HTTP_POOL)
+    METRICS.register(*recognizer.metrics())
+    return recognizer
 
-# Code for enabling activity and personal information logging.
-TELEMETRY_LOGGER_MIDDLEWARE = TelemetryLoggerMiddleware(
-    telemetry_client=TELEMETRY_CLIENT, log_personal_information=True
-)
-ADAPTER.use(TELEMETRY_LOGGER_MIDDLEWARE)
 
 # Create dialogs and Bot
-RECOGNIZER = FlightBookingRecognizer(CONFIG)
-BOOKING_DIALOG = BookingDialog(telemetry_client=TELEMETRY_CLIENT)
-DIALOG = MainDialog(RECOGNIZER, BOOKING_DIALOG, telemetry_client=TELEMETRY_CLIENT)
-BOT = DialogAndWelcomeBot(CONVERSATION_STATE, USER_STATE, DIALOG, TELEMETRY_CLIENT)
+def create_bot() -> DialogAndWelcomeBot:
+    booking_dialog = BookingDialog(
+        telemetry_client=DIALOG_TELEMETRY_CLIENT, gazetteer=GAZETTEER.get(), luis_recognizer=RECOGNIZER.get()
+    )
+    dialog = MainDialog(RECOGNIZER.get(), booking_dialog, telemetry_client=DIALOG_TELEMETRY_CLIENT)
+    return DialogAndWelcomeBot(CONVERSATION_STATE, USER_STATE, dialog, DIALOG_TELEMETRY_CLIENT)
+
+
+# The recognizers-text models of the date, number and confirm prompts are compiled on their first use.
+def load_prompt_models() -> Culture:
+    recognize_datetime("10 February 2023", Culture.English)
+    recognize_number("two", Culture.English)
+    recognize_boolean("yes", Culture.English)
+    return Culture.English
+
+
+GAZETTEER = Lazy("gazetteer", create_gazetteer)
+RECOGNIZER = Lazy("recognizer", create_recognizer)
+BOT = Lazy("bot", create_bot)
+PROMPT_MODELS = Lazy("prompt_models", load_prompt_models)
+COMPONENTS = [GAZETTEER, RECOGNIZER, BOT, PROMPT_MODELS]
+if not CONFIG.LAZY_INIT:
+    build_all(COMPONENTS)
+
+
+# Turns processed at once, the excess waiting in a bounded queue or shed (see MaxConcurrentTurns in config.py).
+ADMISSION = None
+if CONFIG.MAX_CONCURRENT_TURNS > 0:
+    ADMISSION = AdmissionController(
+        max_concurrency=CONFIG.MAX_CONCURRENT_TURNS,
+        max_queue=CONFIG.ADMISSION_QUEUE_SIZE,
+        queue_timeout=CONFIG.ADMISSION_QUEUE_TIMEOUT,
+    )
+    METRICS.register(*ADMISSION.metrics())
+
+
+# Turns of a conversation run one after the other, each loading the state saved by the previous one; turns of
+# different conversations run concurrently. Workers sharing the state don't coordinate, see workers.py.
+MAILBOXES = ConversationMailboxes(CONFIG.CONVERSATION_QUEUE_SIZE)
+METRICS.register(*MAILBOXES.metrics())
+
+
+# CPU profiles of sampled turns and of flagged conversations, adjustable through /admin/profiling.
+PROFILER = TurnProfiler(
+    CONFIG.PROFILE_DIRECTORY,
+    sample_rate=CONFIG.PROFILE_SAMPLE_RATE,
+    interval=CONFIG.PROFILE_INTERVAL,
+    max_files=CONFIG.PROFILE_MAX_FILES,
+)
+METRICS.register(*PROFILER.metrics())
 
 
 # Listen for incoming requests on /api/messages.
 async def messages(req: Request) -> Response:
+    try:
+        return await process_message(req)
+    except AdmissionRejected as rejection:
+        return Response(status=rejection.status, headers={"Retry-After": str(CONFIG.ADMISSION_RETRY_AFTER)})
+    except MailboxFull:
+        return Response(
+            status=HTTPStatus.TOO_MANY_REQUESTS, headers={"Retry-After": str(CONFIG.ADMISSION_RETRY_AFTER)}
+        )
+
+
+async def process_message(req: Request) -> Response:
     # Main bot message handler.
     if "application/json" in req.headers["Content-Type"]:
-        body = await req.json()
+        with METRICS.time(TurnMetrics.PARSE):
+            body = await req.json()
     else:
         return Response(status=HTTPStatus.UNSUPPORTED_MEDIA_TYPE)
 
-    activity = Activity().deserialize(body)
-    auth_header = req.headers["Authorization"] if "Authorization" in req.headers else ""
+    conversation = body.get("conversation") if isinstance(body, dict) else None
+    async with PROFILER.profile(conversation.get("id") if isinstance(conversation, dict) else None):
+        with METRICS.time(TurnMetrics.DESERIALIZE):
+            activity = Activity().deserialize(body)
+        METRICS.track_activity(activity.type, activity.conversation.id if activity.conversation else None)
+        auth_header = req.headers["Authorization"] if "Authorization" in req.headers else ""
 
-    response = await ADAPTER.process_activity(activity, auth_header, BOT.on_turn)
+        # Turns arriving before the warm-up is done wait for it without blocking the event loop.
+        bot = await BOT.get_async()
+        await PROMPT_MODELS.get_async()
+        if activity.conversation is None:
+            response = await run_turn(activity, auth_header, bot)
+        else:
+            async with MAILBOXES.turn((activity.channel_id, activity.conversation.id)):
+                response = await run_turn(activity, auth_header, bot)
     if response:
         return json_response(data=response.body, status=response.status)
     return Response(status=HTTPStatus.OK)
 
 
+# A turn takes an admission slot once the previous turns of its conversation are done: turns waiting in their
+# conversation's mailbox don't hold slots other conversations could use.
+async def run_turn(activity: Activity, auth_header: str, bot: DialogAndWelcomeBot):
+    if ADMISSION is None:
+        return await ADAPTER.process_activity(activity, auth_header, bot.on_turn)
+    async with ADMISSION.admit():
+        return await ADAPTER.process_activity(activity, auth_header, bot.on_turn)
+
+
+# Expose turn phase timings, intent counters and active conversations to Prometheus scrapers.
+async def metrics(req: Request) -> Response:
+    return Response(text=METRICS.render(), content_type="text/plain", charset="utf-8")
+
+
+# Read (GET) or change (POST) the turn profiling without a restart, e.g. with
+# {"sample_rate": 100, "flag": ["<conversation id>"], "unflag": []}. Requires the AdminToken bearer token.
+async def profiling(req: Request) -> Response:
+    expected = f"Bearer {CONFIG.ADMIN_TOKEN}".encode()
+    if not hmac.compare_digest(req.headers.get("Authorization", "").encode(), expected):
+        return Response(status=HTTPStatus.UNAUTHORIZED)
+
+    if req.method == "POST":
+        try:
+            settings = await req.json()
+            PROFILER.update(settings.get("sample_rate"), settings.get("flag", ()), settings.get("unflag", ()))
+        except (ValueError, TypeError, AttributeError) as exception:
+            return json_response({"error": str(exception)}, status=HTTPStatus.BAD_REQUEST)
+    return json_response(PROFILER.stats())
+
+
+# Build the lazy components off the event loop while the app starts listening.
+async def start_warm_up(app: web.Application) -> None:
+    app["warm_up"] = asyncio.ensure_future(warm_up(COMPONENTS))
+
+
+# Open the outbound connection pool on the app's event loop.
+async def start_http_pool(app: web.Application) -> None:
+    await HTTP_POOL.start()
+
+
+# Close the outbound connections once the last replies are sent.
+async def close_http_pool(app: web.Application) -> None:
+    await HTTP_POOL.close()
+
+
+# Stop the background LUIS cache refreshes before the connection pool closes.
+async def close_recognizer(app: web.Application) -> None:
+    if RECOGNIZER.is_built:
+        await RECOGNIZER.get().close()
+
+
+# Commit the state writes still buffered by the storage, or stop its sweeper, before exiting.
+async def close_storage(app: web.Application) -> None:
+    if isinstance(MEMORY, (SqliteStorage, BoundedMemoryStorage)):
+        await MEMORY.close()
+
+
+# Send the telemetry records still buffered before exiting.
+async def drain_telemetry(app: web.Application) -> None:
+    if isinstance(DIALOG_TELEMETRY_CLIENT, BufferedTelemetryClient):
+        await DIALOG_TELEMETRY_CLIENT.drain()
+
+
+# Finish writing the turn profiles before exiting.
+async def drain_profiles(app: web.Application) -> None:
+    await PROFILER.drain()
+
+
 # python3.8 -m aiohttp.web -H 0.0.0.0 -P 8000 app:init_func
 def init_func(argv):
-    app = web.Application(middlewares=[bot_telemetry_middleware, aiohttp_error_middleware])
+    app = web.Application(middlewares=[*TELEMETRY_MIDDLEWARES, aiohttp_error_middleware])
     app.router.add_post("/api/messages", messages)
+    app.router.add_get("/metrics", metrics)
+    if CONFIG.ADMIN_TOKEN:
+        app.router.add_get("/admin/profiling", profiling)
+        app.router.add_post("/admin/profiling", profiling)
+    app.on_startup.append(start_http_pool)
+    if CONFIG.LAZY_INIT:
+        app.on_startup.append(start_warm_up)
+    app.on_cleanup.append(close_recognizer)
+    app.on_cleanup.append(close_storage)
+    app.on_cleanup.append(close_http_pool)
+    app.on_cleanup.append(drain_telemetry)
+    app.on_cleanup.append(drain_profiles)
     return app
 
 
 if __name__ == "__main__":
-    app = init_func(None)
-    try:
-        # Run app in production
-        web.run_app(app, host='localhost', port=CONFIG.PORT)
-    except Exception as error:
-        raise error
+    if CONFIG.WORKERS > 1 and not CONFIG.WORKER_ID:
+        # Supervise CONFIG.WORKERS copies of this script instead of serving.
+        run_workers(CONFIG, [sys.executable, os.path.abspath(__file__)])
+    else:
+        app = init_func(None)
+        try:
+            # Run app in production; workers bind the same port with SO_REUSEPORT.
+            web.run_app(app, host='localhost', port=CONFIG.PORT, reuse_port=bool(CONFIG.WORKER_ID) or None)
+        except Exception as error:
+            raise error
@@ -0,0 +1,71 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""
+Serialized size and serialize/deserialize time of BookingDetails.
+
+Compares the previous plain-object BookingDetails saved through jsonpickle with the `__slots__` one through
+jsonpickle (what the state storages do) and through its own compact codec:
+
+    python -m benchmarks.booking_details_codec --number 20000
+"""
+import argparse
+import timeit
+from typing import Callable, Dict
+
+import jsonpickle
+
+from booking_details import BookingDetails
+
+
+class PlainBookingDetails:
+    """BookingDetails as it was before the compact representation."""
+
+    def __init__(self, dst_city=None, or_city=None, str_date=None, end_date=None, budget=None, n_adults=None,
+                 n_children=None, unsupported_airports=None):
+        self.dst_city = dst_city
+        self.or_city = or_city
+        self.str_date = str_date
+        self.end_date = end_date
+        self.budget = budget
+        self.n_adults = n_adults
+        self.n_children = n_children
+        self.unsupported_airports = unsupported_airports if unsupported_airports is not None else []
+
+
+SLOTS = dict(
+    dst_city="Paris", or_city="Berlin", str_date="2023-02-10", end_date="2023-02-15", budget="1500 Dollar",
+    n_adults="2", n_children="1",
+)
+
+
+def measure(encode: Callable[[], str], decode: Callable[[str], object], number: int) -> Dict[str, float]:
+    encoded = encode()
+    return {
+        "bytes": len(encoded.encode("utf-8")),
+        "encode_us": timeit.timeit(encode, number=number) / number * 1e6,
+        "decode_us": timeit.timeit(lambda: decode(encoded), number=number) / number * 1e6,
+    }
+
+
+def run(number: int) -> Dict[str, Dict[str, float]]:
+    plain = PlainBookingDetails(**SLOTS)
+    compact = BookingDetails(**SLOTS)
+    return {
+        "plain object, jsonpickle": measure(lambda: jsonpickle.encode(plain), jsonpickle.decode, number),
+        "__slots__, jsonpickle": measure(lambda: jsonpickle.encode(compact), jsonpickle.decode, number),
+        "__slots__, compact codec": measure(compact.encode, BookingDetails.decode, number),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="iterations per measurement")
+    args = parser.parse_args()
+
+    for name, result in run(args.number).items():
+        print(f"{name:<26} {result['bytes']:>5} bytes  encode {result['encode_us']:7.2f} us"
+              f"  decode {result['decode_us']:7.2f} us")
+
+
+if __name__ == "__main__":
+    main()
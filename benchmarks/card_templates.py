@@ -0,0 +1,55 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""
+Time to build the flight itinerary and welcome cards.
+
+Compares reading the card file and filling it through json.dumps/str.replace/json.loads, as done before,
+with the cached, precompiled CardTemplate:
+
+    python -m benchmarks.card_templates --number 5000
+"""
+import argparse
+import json
+import timeit
+
+from helpers.card_template import CardTemplate
+
+ITINERARY_CARD = "bots/resources/FlightItineraryCard.json"
+WELCOME_CARD = "bots/resources/welcomeCard.json"
+SLOTS = {
+    "or_city": "Paris", "dst_city": "Berlin", "str_date": "2023-02-10", "end_date": "2023-02-15",
+    "budget": "300 Euro", "n_adults": "2", "n_children": "1",
+}
+
+
+def read_and_replace(path: str, data: dict) -> dict:
+    """Former FlightItineraryCard.create_attachment."""
+    with open(path, encoding="utf-8") as card_file:
+        card = json.load(card_file)
+    card_str = json.dumps(card)
+    for key, value in data.items():
+        card_str = card_str.replace("${{{}}}".format(key), str(value))
+    return json.loads(card_str)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=5000, help="iterations per measurement")
+    args = parser.parse_args()
+
+    if read_and_replace(ITINERARY_CARD, SLOTS) != CardTemplate.load(ITINERARY_CARD).render(SLOTS):
+        raise Exception("[card_templates]: CardTemplate output differs from the former implementation")
+
+    cases = {
+        "itinerary, read + replace": lambda: read_and_replace(ITINERARY_CARD, SLOTS),
+        "itinerary, CardTemplate": lambda: CardTemplate.load(ITINERARY_CARD).render(SLOTS),
+        "welcome, read": lambda: read_and_replace(WELCOME_CARD, {}),
+        "welcome, CardTemplate": lambda: CardTemplate.load(WELCOME_CARD).render(),
+    }
+    for name, build in cases.items():
+        seconds = timeit.timeit(build, number=args.number)
+        print(f"{name:<28} {seconds / args.number * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
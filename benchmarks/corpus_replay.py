@@ -0,0 +1,174 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""
+Replay every utterance of cognitiveModels/FlightBooking.json through LuisHelper.execute_luis_query.
+
+Records per-utterance latency, intent accuracy and slot accuracy, writes a JSON report and prints
+p50/p95/p99 latency histograms. The recognizer is FlightBookingRecognizer built from DefaultConfig, so
+LUIS, the offline recognizer or both are exercised depending on the environment:
+
+    OfflineRecognizerModel=cognitiveModels/FlightBooking.json python -m benchmarks.corpus_replay
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import re
+import time
+from typing import Dict, Optional
+
+from botbuilder.core import TurnContext
+from botbuilder.core.adapters import TestAdapter
+from botbuilder.schema import Activity, ActivityTypes, ChannelAccount, ConversationAccount
+
+from benchmarks.stats import format_summary, summarize
+from config import DefaultConfig
+from flight_booking_recognizer import FlightBookingRecognizer
+from helpers.luis_helper import LuisHelper
+
+SLOTS = ("dst_city", "or_city", "budget", "str_date", "end_date", "n_adults", "n_children")
+NUMBER_WORDS = {
+    word: value for value, word in enumerate(
+        "zero one two three four five six seven eight nine ten eleven twelve thirteen fourteen fifteen "
+        "sixteen seventeen eighteen nineteen twenty".split()
+    )
+}
+NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+def _amount(text: str) -> Optional[float]:
+    match = NUMBER_PATTERN.search(text)
+    return float(match.group().replace(",", "")) if match else None
+
+
+def _count(text: str) -> Optional[int]:
+    text = text.strip().casefold()
+    if text.isdigit():
+        return int(text)
+    return NUMBER_WORDS.get(text)
+
+
+def _day(text: str) -> Optional[int]:
+    # Gold dates are free text ("august 27th"), predictions are timex ("XXXX-08-27"): compare the day.
+    if re.match(r"^[X\d]{4}-[X\d]{2}-\d{2}", text):
+        return int(text[8:10])
+    match = re.search(r"\b(\d{1,2})(?:st|nd|rd|th)?\b", text)
+    return int(match.group(1)) if match else None
+
+
+NORMALIZERS = {
+    "dst_city": str.casefold,
+    "or_city": str.casefold,
+    "budget": _amount,
+    "str_date": _day,
+    "end_date": _day,
+    "n_adults": _count,
+    "n_children": _count,
+}
+
+
+def normalized_slots(values: Dict[str, str]) -> Dict[str, object]:
+    normalized = {}
+    for slot, value in values.items():
+        if value is not None:
+            normalized[slot] = NORMALIZERS[slot](str(value))
+    return normalized
+
+
+async def replay(recognizer: FlightBookingRecognizer, utterances: list) -> dict:
+    records = []
+    for utterance in utterances:
+        gold = normalized_slots({
+            entity["entity"]: utterance["text"][entity["startPos"]:entity["endPos"] + 1]
+            for entity in utterance["entities"]
+        })
+        turn_context = TurnContext(TestAdapter(), Activity(
+            type=ActivityTypes.message,
+            text=utterance["text"],
+            locale="en-us",
+            channel_id="test",
+            from_property=ChannelAccount(id="user"),
+            recipient=ChannelAccount(id="bot"),
+            conversation=ConversationAccount(id="corpus-replay"),
+        ))
+
+        # LuisHelper reports post-processing failures with print(), keep them per utterance instead.
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            start = time.perf_counter()
+            intent, booking_details = await LuisHelper.execute_luis_query(recognizer, turn_context)
+            latency_ms = (time.perf_counter() - start) * 1000
+
+        predicted = normalized_slots(
+            {slot: getattr(booking_details, slot) for slot in SLOTS} if booking_details else {}
+        )
+        records.append({
+            "text": utterance["text"],
+            "intent": utterance["intent"].replace(".", "_"),
+            "predicted_intent": intent,
+            "latency_ms": latency_ms,
+            "slots": {
+                slot: {"expected": value, "predicted": predicted.get(slot)}
+                for slot, value in gold.items() if value is not None
+            },
+            "error": output.getvalue().strip() or None,
+        })
+
+    return build_report(records)
+
+
+def build_report(records: list) -> dict:
+    slot_scores = {slot: {"support": 0, "correct": 0} for slot in SLOTS}
+    for record in records:
+        for slot, values in record["slots"].items():
+            slot_scores[slot]["support"] += 1
+            slot_scores[slot]["correct"] += values["expected"] == values["predicted"]
+    for score in slot_scores.values():
+        score["accuracy"] = score["correct"] / score["support"] if score["support"] else None
+
+    intent_correct = sum(record["intent"] == record["predicted_intent"] for record in records)
+    return {
+        "utterances": len(records),
+        "intent_accuracy": intent_correct / len(records) if records else None,
+        "slot_accuracy": slot_scores,
+        "errors": sum(record["error"] is not None for record in records),
+        "latency": summarize([record["latency_ms"] for record in records]),
+        "records": records,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default="cognitiveModels/FlightBooking.json")
+    parser.add_argument("--report", default="corpus_replay_report.json")
+    parser.add_argument("--limit", type=int, default=None, help="replay only the first N utterances")
+    parser.add_argument("--cache", action="store_true", help="keep the recognition cache enabled")
+    args = parser.parse_args()
+
+    config = DefaultConfig()
+    if not args.cache:
+        # Repeated corpus utterances would otherwise measure the cache, not the recognizer.
+        config.LUIS_CACHE_SIZE = 0
+    recognizer = FlightBookingRecognizer(config)
+    if not recognizer.is_configured:
+        parser.error("no recognizer configured: set the LUIS settings or OfflineRecognizerModel")
+
+    with open(args.corpus, encoding="utf-8") as corpus_file:
+        utterances = json.load(corpus_file)["utterances"][:args.limit]
+
+    report = asyncio.get_event_loop().run_until_complete(replay(recognizer, utterances))
+    with open(args.report, "w", encoding="utf-8") as report_file:
+        json.dump(report, report_file, indent=2)
+
+    print(f"utterances: {report['utterances']}  intent accuracy: {report['intent_accuracy']:.4f}"
+          f"  post-processing errors: {report['errors']}")
+    for slot, score in report["slot_accuracy"].items():
+        accuracy = "n/a" if score["accuracy"] is None else f"{score['accuracy']:.4f}"
+        print(f"  {slot:<10} support={score['support']:<5} accuracy={accuracy}")
+    print(format_summary("execute_luis_query latency", report["latency"]))
+    print(f"report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
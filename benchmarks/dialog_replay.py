@@ -0,0 +1,119 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""
+In-process cost of the dialogs: conversations walked through MainDialog on a TestAdapter, the recognitions replayed
+from a cassette (see cassette_recognizer.py), so no LUIS, network or Bot Connector latency is measured.
+
+The default cassette is the one of tests/flight_booking_test.py, recorded against LUIS (LuisAppId, LuisAPIKey and
+LuisAPIHostName set) with --record before the first run:
+
+    python -m benchmarks.dialog_replay --record --conversations 1
+    python -m benchmarks.dialog_replay --conversations 500
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+from typing import List
+
+from botbuilder.core import ConversationState, MemoryStorage, TurnContext
+from botbuilder.core.adapters import TestAdapter
+from botbuilder.schema import Activity, ChannelAccount, ConversationAccount
+from botframework.connector import Channels
+
+from benchmarks.stats import format_summary, summarize
+from config import DefaultConfig
+from dialogs import BookingDialog, MainDialog
+from flight_booking_recognizer import FlightBookingRecognizer
+from helpers.dialog_helper import DialogHelper
+
+# User turns of each conversation, all recognitions being in the default cassette.
+CONVERSATIONS = [
+    [
+        "Hey!",
+        "I want to go to Paris from Le Havre for the 10th February 2023 and return the 15th February 2023. For 100€,"
+        " 1 adult and 2 children.",
+        "yes",
+    ],
+    [
+        "Hi!",
+        "I want to go to Tunis!",
+        "Actually, I'm at Le Havre.",
+        "the 2nd February 2023",
+        "I want to come back on 2023-02-15",
+        "I've one bitcoin, some euros and 2 bananas for scale",
+        "1",
+        "0",
+        "no",
+    ],
+    ["Yo!", "I love you!"],
+]
+
+
+class ReplayConfig(DefaultConfig):
+    LUIS_CACHE_SIZE = 0
+    LUIS_CASSETTE_MODE = "replay"
+
+
+async def walk(
+        dialog: MainDialog, conversation_state: ConversationState, utterances: List[str], conversation_id: str
+) -> List[float]:
+    """Milliseconds taken by each turn of a new conversation."""
+    dialog_state = conversation_state.create_property("DialogState")
+
+    async def on_turn(turn_context: TurnContext):
+        await DialogHelper.run_dialog(dialog, turn_context, dialog_state)
+        await conversation_state.save_changes(turn_context)
+
+    adapter = TestAdapter(on_turn, Activity(
+        channel_id=Channels.test,
+        service_url="https://test.com",
+        from_property=ChannelAccount(id="user", name="User"),
+        recipient=ChannelAccount(id="bot", name="Bot"),
+        conversation=ConversationAccount(id=conversation_id),
+    ))
+    milliseconds = []
+    for text in utterances:
+        start = time.perf_counter()
+        await adapter.send(text)
+        milliseconds.append((time.perf_counter() - start) * 1000)
+    return milliseconds
+
+
+async def run(args) -> None:
+    config = ReplayConfig()
+    config.LUIS_CASSETTE = args.cassette
+    if args.record:
+        config.LUIS_CASSETTE_MODE = "record"
+    recognizer = FlightBookingRecognizer(config)
+    dialog = MainDialog(recognizer, BookingDialog(luis_recognizer=recognizer))
+    conversation_state = ConversationState(MemoryStorage())
+
+    # One untimed walk builds the prompt models.
+    with contextlib.redirect_stdout(io.StringIO()):
+        for index, utterances in enumerate(CONVERSATIONS):
+            await walk(dialog, conversation_state, utterances, f"warm-up-{index}")
+
+        samples = []
+        start = time.perf_counter()
+        for index in range(args.conversations):
+            samples += await walk(dialog, conversation_state, CONVERSATIONS[index % len(CONVERSATIONS)], str(index))
+        elapsed = time.perf_counter() - start
+
+    print(f"{args.conversations} conversations, {len(samples)} turns, {len(samples) / elapsed:.1f} turns/sec")
+    print(format_summary("turn latency", summarize(samples)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cassette", default="tests/cassettes/flight_booking.json")
+    parser.add_argument("--conversations", type=int, default=300)
+    parser.add_argument("--record", action="store_true", help="add the LUIS results to the cassette")
+    args = parser.parse_args()
+
+    asyncio.get_event_loop().run_until_complete(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""
+Synthetic-conversation load generator for the bot's /api/messages endpoint.
+
+Simulated users walk MainDialog -> BookingDialog -> DateResolverDialog, answering each prompt with utterances
+sampled from cognitiveModels/FlightBooking.json. Bot replies are received by a stub Bot Connector service
+started by this tool. Concurrency ramps through the given stages and each stage reports turns/sec, per-turn
+latency percentiles and the error rate.
+
+Start the bot without MicrosoftAppId/MicrosoftAppPassword (e.g. against benchmarks/luis_server.py), then:
+
+    python -m benchmarks.load_test --bot http://localhost:3978/api/messages --ramp 10,100,500,1000
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import re
+import time
+import uuid
+from collections import defaultdict
+from http import HTTPStatus
+from typing import Dict, List
+
+import aiohttp
+from aiohttp import web
+from aiohttp.web import Request, Response, json_response
+
+from benchmarks.stats import format_summary, summarize
+
+MAX_TURNS_PER_CONVERSATION = 25
+NUMBER_WORD_PATTERN = re.compile(r"^(\d+|one|two|three|four|five|six|seven|eight|nine|ten)$")
+
+
+class UtterancePools:
+    """Answers for each booking prompt, sampled from the LUIS corpus."""
+
+    def __init__(self, utterances: list):
+        spans = defaultdict(list)
+        for utterance in utterances:
+            for entity in utterance["entities"]:
+                spans[entity["entity"]].append(utterance["text"][entity["startPos"]:entity["endPos"] + 1])
+
+        self.requests = [u["text"] for u in utterances if u["intent"] == "BookFlight" and u["entities"]]
+        self.dst_cities = [span for span in spans["dst_city"] if span.replace(" ", "").isalpha()]
+        self.or_cities = [span for span in spans["or_city"] if span.replace(" ", "").isalpha()]
+        self.budgets = [f"{span} dollars" for span in spans["budget"] if span.isdigit()]
+        self.adults = [span for span in spans["n_adults"] if NUMBER_WORD_PATTERN.match(span.lower())]
+        self.children = [span for span in spans["n_children"] if NUMBER_WORD_PATTERN.match(span.lower())]
+
+    def answer(self, prompt: str, state: dict) -> str:
+        """Pick the user's next utterance from the bot's last prompt."""
+        if "confirm" in prompt:
+            # Checked first: the confirmation recaps every slot, budget included.
+            return "yes"
+        if "would you like to travel?" in prompt and "date" in prompt:
+            start = datetime.date.today() + datetime.timedelta(days=random.randint(30, 300))
+            state["start"] = start
+            return start.strftime("%d %B %Y")
+        if "come back" in prompt or "return date" in prompt:
+            start = state.get("start") or datetime.date.today() + datetime.timedelta(days=30)
+            return (start + datetime.timedelta(days=random.randint(3, 20))).strftime("%d %B %Y")
+        if "what city would you like to travel" in prompt.lower():
+            return random.choice(self.dst_cities)
+        if "from what city" in prompt.lower():
+            return random.choice(self.or_cities)
+        if "budget" in prompt:
+            return random.choice(self.budgets)
+        if "adult" in prompt and "how many" in prompt:
+            return random.choice(self.adults)
+        if "child" in prompt and "how many" in prompt:
+            return random.choice(self.children)
+        return random.choice(self.requests)
+
+
+class StubConnector:
+    """Minimal Bot Connector service collecting the bot's replies per conversation."""
+
+    def __init__(self):
+        self.replies: Dict[str, List[dict]] = defaultdict(list)
+        self.received = 0
+
+    async def post_activity(self, req: Request) -> Response:
+        activity = await req.json()
+        self.replies[req.match_info["conversation_id"]].append(activity)
+        self.received += 1
+        return json_response({"id": str(uuid.uuid4())})
+
+    async def ignore(self, req: Request) -> Response:
+        return Response(status=HTTPStatus.OK)
+
+    def create_app(self) -> web.Application:
+        app = web.Application(client_max_size=4 * 1024 ** 2)
+        app.router.add_post("/v3/conversations/{conversation_id}/activities", self.post_activity)
+        app.router.add_post("/v3/conversations/{conversation_id}/activities/{activity_id}", self.post_activity)
+        app.router.add_route("*", "/{tail:.*}", self.ignore)
+        return app
+
+
+class Stage:
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.latencies_ms: List[float] = []
+        self.errors = 0
+        self.conversations_completed = 0
+        self.elapsed = 0.0
+
+    def report(self) -> dict:
+        turns = len(self.latencies_ms) + self.errors
+        return {
+            "concurrency": self.concurrency,
+            "turns": turns,
+            "turns_per_sec": turns / self.elapsed if self.elapsed else 0.0,
+            "error_rate": self.errors / turns if turns else 0.0,
+            "conversations_completed": self.conversations_completed,
+            "latency": summarize(self.latencies_ms),
+        }
+
+
+class LoadTest:
+    def __init__(self, bot_url: str, service_url: str, connector: StubConnector, pools: UtterancePools,
+                 timeout: float):
+        self.bot_url = bot_url
+        self.service_url = service_url
+        self.connector = connector
+        self.pools = pools
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+
+    def _activity(self, conversation_id: str, activity_type: str, text: str = None) -> dict:
+        activity = {
+            "type": activity_type,
+            "id": str(uuid.uuid4()),
+            "timestamp": datetime.datetime.utcnow().isoformat() + "Z",
+            "channelId": "loadtest",
+            "serviceUrl": self.service_url,
+            "from": {"id": "user-" + conversation_id, "name": "Load Test"},
+            "recipient": {"id": "bot", "name": "Bot"},
+            "conversation": {"id": conversation_id},
+            "locale": "en-US",
+        }
+        if activity_type == "conversationUpdate":
+            activity["membersAdded"] = [activity["from"], activity["recipient"]]
+        else:
+            activity["text"] = text
+        return activity
+
+    async def _turn(self, session: aiohttp.ClientSession, stage: Stage, activity: dict) -> bool:
+        start = time.perf_counter()
+        try:
+            async with session.post(self.bot_url, json=activity, timeout=self.timeout) as response:
+                await response.read()
+                ok = response.status < 400
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            ok = False
+
+        if ok:
+            stage.latencies_ms.append((time.perf_counter() - start) * 1000)
+        else:
+            stage.errors += 1
+        return ok
+
+    async def conversation(self, session: aiohttp.ClientSession, stage: Stage) -> None:
+        conversation_id = str(uuid.uuid4())
+        state = {}
+        if not await self._turn(session, stage, self._activity(conversation_id, "conversationUpdate")):
+            return
+
+        text = "Hi!"
+        for _ in range(MAX_TURNS_PER_CONVERSATION):
+            seen = len(self.connector.replies[conversation_id])
+            if not await self._turn(session, stage, self._activity(conversation_id, "message", text)):
+                break
+
+            replies = [reply.get("text") or "" for reply in self.connector.replies[conversation_id][seen:]]
+            if any(reply.startswith("Your flight is all set!") for reply in replies):
+                stage.conversations_completed += 1
+                break
+            text = self.pools.answer(replies[-1] if replies else "", state)
+
+        self.connector.replies.pop(conversation_id, None)
+
+    async def run_stage(self, session: aiohttp.ClientSession, concurrency: int, duration: float) -> Stage:
+        stage = Stage(concurrency)
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                await self.conversation(session, stage)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        stage.elapsed = time.perf_counter() - start
+        return stage
+
+
+async def run(args) -> List[dict]:
+    with open(args.corpus, encoding="utf-8") as corpus_file:
+        pools = UtterancePools(json.load(corpus_file)["utterances"])
+
+    connector = StubConnector()
+    runner = web.AppRunner(connector.create_app())
+    await runner.setup()
+    await web.TCPSite(runner, args.connector_host, args.connector_port).start()
+
+    load_test = LoadTest(
+        args.bot, f"http://{args.connector_host}:{args.connector_port}", connector, pools, args.timeout
+    )
+    reports = []
+    try:
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+            for concurrency in args.ramp:
+                stage = await load_test.run_stage(session, concurrency, args.stage_duration)
+                report = stage.report()
+                reports.append(report)
+                print(f"concurrency={concurrency} turns={report['turns']} "
+                      f"turns/sec={report['turns_per_sec']:.1f} error_rate={report['error_rate']:.4f} "
+                      f"completed={report['conversations_completed']}")
+                print(format_summary("  turn latency", report["latency"]))
+    finally:
+        await runner.cleanup()
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bot", default="http://localhost:3978/api/messages")
+    parser.add_argument("--corpus", default="cognitiveModels/FlightBooking.json")
+    parser.add_argument("--ramp", type=lambda value: [int(level) for level in value.split(",")],
+                        default=[10, 50, 100, 500, 1000], help="comma separated concurrency levels")
+    parser.add_argument("--stage-duration", type=float, default=30.0, help="seconds per concurrency level")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-turn timeout in seconds")
+    parser.add_argument("--connector-host", default="localhost")
+    parser.add_argument("--connector-port", type=int, default=3980)
+    parser.add_argument("--report", default=None, help="write the stage reports to this JSON file")
+    args = parser.parse_args()
+
+    reports = asyncio.get_event_loop().run_until_complete(run(args))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as report_file:
+            json.dump(reports, report_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""
+Local LUIS stand-in implementing the v2 and v3 prediction endpoints used by LuisRecognizer.
+
+Answers come from a response table derived from the labelled utterances of cognitiveModels/FlightBooking.json,
+with configurable latency, error rate and throttling (429). Point the bot at it with:
+
+    python -m benchmarks.luis_server --port 3979 --latency lognormal:120:0.4 --error-rate 0.01 --rate-limit 200
+    export LuisAppId=00000000-0000-0000-0000-000000000000 LuisAPIKey=00000000-0000-0000-0000-000000000000
+    LuisAPIHostName=http://localhost:3979 python app.py
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from http import HTTPStatus
+from typing import Callable, Dict, Optional, Tuple
+
+from aiohttp import web
+from aiohttp.web import Request, Response, json_response
+
+from helpers.recognition_cache import normalize_utterance
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+DATE_PATTERN = re.compile(r"\b(?:([a-z]{3})[a-z]*\.?\s+)?(\d{1,2})(?:st|nd|rd|th)?\b")
+AMOUNT_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+DATE_LABELS = ("str_date", "end_date")
+CITY_LABELS = ("dst_city", "or_city")
+
+
+def _timex(text: str) -> Optional[str]:
+    match = DATE_PATTERN.search(text.casefold())
+    if not match or int(match.group(2)) > 31:
+        return None
+    month = MONTHS.get(match.group(1) or "")
+    return f"XXXX-{month:02d}-{int(match.group(2)):02d}" if month else f"XXXX-XX-{int(match.group(2)):02d}"
+
+
+def _entity(text: str, start: int, end: int, entity_type: str, **extra) -> dict:
+    entity = {"entity": text[start:end].casefold(), "type": entity_type, "startIndex": start, "endIndex": end - 1}
+    entity.update(extra)
+    return entity
+
+
+def _v3_entity(entity: dict) -> Tuple[str, object]:
+    """Name and value of a v2 entity in the v3 prediction format."""
+    if entity["type"] == "builtin.geographyV2.city":
+        return "geographyV2", {"value": entity["entity"], "type": "city"}
+    if entity["type"] == "builtin.datetimeV2.date":
+        return "datetimeV2", {"type": "date", "values": entity["resolution"]["values"]}
+    if entity["type"] == "builtin.currency":
+        resolution = entity["resolution"]
+        return "money", {"number": float(resolution["value"]), "units": resolution["unit"]}
+    return entity["type"], entity["entity"]
+
+
+def build_response_table(utterances: list) -> Dict[str, dict]:
+    """Map normalized utterances to LUIS v2 results, adding the prebuilt entities the bot reads."""
+    table = {}
+    for utterance in utterances:
+        text = utterance["text"]
+        entities = []
+        for labelled in utterance["entities"]:
+            start, end = labelled["startPos"], labelled["endPos"] + 1
+            span = text[start:end]
+            entities.append(_entity(text, start, end, labelled["entity"], score=0.95))
+
+            if labelled["entity"] in CITY_LABELS:
+                entities.append(_entity(text, start, end, "builtin.geographyV2.city"))
+            elif labelled["entity"] == "budget" and AMOUNT_PATTERN.search(span):
+                amount = AMOUNT_PATTERN.search(span).group().replace(",", "")
+                entities.append(_entity(
+                    text, start, end, "builtin.currency", resolution={"unit": "Dollar", "value": amount}
+                ))
+            elif labelled["entity"] in DATE_LABELS and _timex(span):
+                timex = _timex(span)
+                entities.append(_entity(
+                    text, start, end, "builtin.datetimeV2.date",
+                    resolution={"values": [{"timex": timex, "type": "date"}]},
+                ))
+
+        intent = {"intent": utterance["intent"], "score": 0.95}
+        table[normalize_utterance(text)] = {"topScoringIntent": intent, "intents": [intent], "entities": entities}
+    return table
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """Parse `fixed:MS`, `uniform:LOW_MS:HIGH_MS`, `normal:MEAN_MS:STDDEV_MS` or `lognormal:MEDIAN_MS:SIGMA`."""
+    kind, *params = spec.split(":")
+    values = [float(param) for param in params]
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda: random.uniform(values[0], values[1]) / 1000
+    if kind == "normal" and len(values) == 2:
+        return lambda: max(0.0, random.gauss(values[0], values[1])) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        return lambda: values[0] * random.lognormvariate(0, values[1]) / 1000
+    raise ValueError(f"[luis_server]: invalid latency distribution '{spec}'")
+
+
+class FaultInjector:
+    """Latency, random errors and throttling applied to every prediction request."""
+
+    def __init__(
+            self,
+            latency: Callable[[], float] = lambda: 0.0,
+            error_rate: float = 0.0,
+            throttle_rate: float = 0.0,
+            rate_limit: float = 0.0,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        # Token bucket holding up to one second of requests.
+        self._tokens = rate_limit
+        self._refilled_at = time.monotonic()
+
+    def _take_token(self) -> bool:
+        if self.rate_limit <= 0:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled_at) * self.rate_limit)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    async def apply(self) -> Optional[Response]:
+        """Return an error response to send instead of the prediction, if any."""
+        if not self._take_token() or random.random() < self.throttle_rate:
+            return json_response(
+                {"error": {"code": "429", "message": "Rate limit is exceeded. Try again in 1 seconds."}},
+                status=HTTPStatus.TOO_MANY_REQUESTS,
+                headers={"Retry-After": "1"},
+            )
+
+        await asyncio.sleep(self.latency())
+
+        if random.random() < self.error_rate:
+            return json_response(
+                {"error": {"code": "InternalServerError", "message": "Injected failure."}},
+                status=HTTPStatus.INTERNAL_SERVER_ERROR,
+            )
+        return None
+
+
+class LuisStandIn:
+    def __init__(self, table: Dict[str, dict], faults: FaultInjector = None):
+        self.table = table
+        self.faults = faults or FaultInjector()
+        self.stats = {"requests": 0, "hits": 0, "misses": 0, "errors": 0, "throttled": 0}
+
+    def predict(self, query: str) -> dict:
+        result = self.table.get(normalize_utterance(query or ""))
+        if result is None:
+            self.stats["misses"] += 1
+            intent = {"intent": "None", "score": 0.5}
+            return {"query": query, "topScoringIntent": intent, "intents": [intent], "entities": []}
+
+        self.stats["hits"] += 1
+        return dict(result, query=query)
+
+    async def _faulted(self) -> Optional[Response]:
+        self.stats["requests"] += 1
+        response = await self.faults.apply()
+        if response is not None:
+            key = "throttled" if response.status == HTTPStatus.TOO_MANY_REQUESTS else "errors"
+            self.stats[key] += 1
+        return response
+
+    async def predict_v2(self, req: Request) -> Response:
+        # LUISRuntimeClient posts the utterance as a JSON string, GET passes it as `q`.
+        query = req.query.get("q") if req.method == "GET" else json.loads(await req.text())
+        response = await self._faulted()
+        if response is not None:
+            return response
+
+        result = self.predict(query)
+        if req.query.get("verbose", "").lower() != "true":
+            result = {key: value for key, value in result.items() if key != "intents"}
+        return json_response(result)
+
+    async def predict_v3(self, req: Request) -> Response:
+        body = await req.json()
+        response = await self._faulted()
+        if response is not None:
+            return response
+
+        result = self.predict(body.get("query"))
+        entities, instances = {}, {}
+        for entity in result["entities"]:
+            name, value = _v3_entity(entity)
+            entities.setdefault(name, []).append(value)
+            instances.setdefault(name, []).append({
+                "type": entity["type"],
+                "text": entity["entity"],
+                "startIndex": entity["startIndex"],
+                "length": entity["endIndex"] - entity["startIndex"] + 1,
+            })
+        entities["$instance"] = instances
+
+        top = result["topScoringIntent"]
+        return json_response({
+            "query": result["query"],
+            "prediction": {
+                "topIntent": top["intent"],
+                "intents": {top["intent"]: {"score": top["score"]}},
+                "entities": entities,
+            },
+        })
+
+    async def get_stats(self, req: Request) -> Response:
+        return json_response(self.stats)
+
+
+def create_app(stand_in: LuisStandIn) -> web.Application:
+    app = web.Application()
+    app.router.add_post("/luis/v2.0/apps/{app_id}", stand_in.predict_v2)
+    app.router.add_get("/luis/v2.0/apps/{app_id}", stand_in.predict_v2)
+    app.router.add_post("/luis/prediction/v3.0/apps/{app_id}/slots/{slot}/predict", stand_in.predict_v3)
+    app.router.add_post("/luis/prediction/v3.0/apps/{app_id}/versions/{version}/predict", stand_in.predict_v3)
+    app.router.add_get("/stats", stand_in.get_stats)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=3979)
+    parser.add_argument("--corpus", default="cognitiveModels/FlightBooking.json")
+    parser.add_argument("--latency", default="fixed:0", help="fixed:MS, uniform:LOW:HIGH, normal:MEAN:STD, "
+                                                             "lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with a 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered with a 429")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests/sec before 429s, 0 for unlimited")
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as corpus_file:
+        table = build_response_table(json.load(corpus_file)["utterances"])
+    faults = FaultInjector(parse_latency(args.latency), args.error_rate, args.throttle_rate, args.rate_limit)
+    web.run_app(create_app(LuisStandIn(table, faults)), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
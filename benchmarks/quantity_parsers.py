@@ -0,0 +1,78 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""
+Per-call latency of the local money and number parsers against recognizers-text.
+
+Runs every utterance of the LUIS app through parse_money/parse_number and through the recognizers-text currency
+and number models the current path relies on (the LUIS money entity is built on the former), and reports the hit
+rate of the local parsers and how often their hits agree with recognizers-text:
+
+    python -m benchmarks.quantity_parsers --number 3
+"""
+import argparse
+import json
+import time
+from typing import Callable, List
+
+from babel.numbers import parse_decimal
+from recognizers_number import recognize_number
+from recognizers_number_with_unit import NumberWithUnitRecognizer
+from recognizers_text import Culture
+
+from helpers.quantity_parser import parse_money, parse_number
+
+LUIS_APP = "cognitiveModels/FlightBooking.json"
+
+
+def recognizers_money(currency_model, text: str):
+    """First money entity of `text` as (number, units), like LUIS answers it."""
+    for result in currency_model.parse(text):
+        resolution = result.resolution or {}
+        if resolution.get("value") is not None and resolution.get("unit"):
+            number = float(resolution["value"])
+            return int(number) if number.is_integer() else number, resolution["unit"]
+    return None
+
+
+def recognizers_number(text: str):
+    """NumberPrompt.on_recognize."""
+    results = recognize_number(text, Culture.English)
+    return parse_decimal(results[0].resolution["value"], locale="en") if results else None
+
+
+def time_per_call(parse: Callable, texts: List[str], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        for text in texts:
+            parse(text)
+    return (time.perf_counter() - start) / (number * len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--luis-app", default=LUIS_APP, help="LUIS app export whose utterances are parsed")
+    parser.add_argument("--number", type=int, default=3, help="passes over the utterances")
+    args = parser.parse_args()
+
+    with open(args.luis_app, encoding="utf-8") as app_file:
+        texts = [utterance["text"] for utterance in json.load(app_file)["utterances"]]
+    currency_model = NumberWithUnitRecognizer(Culture.English).get_currency_model()
+
+    cases = {
+        "money": (parse_money, lambda text: recognizers_money(currency_model, text)),
+        "number": (parse_number, recognizers_number),
+    }
+    for name, (local, reference) in cases.items():
+        hits = [(text, local(text)) for text in texts]
+        hits = [(text, value) for text, value in hits if value is not None]
+        agree = sum(1 for text, value in hits if reference(text) == value)
+        local_time = time_per_call(local, texts, args.number)
+        reference_time = time_per_call(reference, texts, args.number)
+        print(
+            f"{name:<7} local {local_time * 1e6:8.1f} us/call, recognizers-text {reference_time * 1e6:8.1f} us/call, "
+            f"hits {len(hits)}/{len(texts)}, agreeing {agree}/{len(hits)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
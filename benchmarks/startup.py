@@ -0,0 +1,129 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""
+Cold start of the bot: import time of app.py, time until it listens and latency of the first conversation.
+
+Each run starts `python app.py` in a fresh process, connects as soon as the port accepts connections and walks a
+booking up to the date prompt (the turns building the dialogs and compiling the prompt models, unless a warm-up
+did it), then walks a second booking on the now warm process. Runs alternate LazyInit=true and LazyInit=false;
+other settings (LUIS, App Insights...) come from the environment:
+
+    python -m benchmarks.startup --runs 3
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from statistics import median
+from typing import Dict, List
+
+import aiohttp
+from aiohttp import web
+
+from benchmarks.load_test import LoadTest, StubConnector
+
+# Answers up to the travel date prompt when LUIS isn't configured: the booking asks each slot in turn.
+CONVERSATION = ["Hi!", "Paris", "Berlin", "10 February 2030"]
+
+
+def import_time(env: Dict[str, str]) -> float:
+    """Seconds to import app.py in a fresh interpreter."""
+    code = "import time; start = time.perf_counter(); import app; print(time.perf_counter() - start)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], env=env, check=True, stdout=subprocess.PIPE, universal_newlines=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def wait_for_port(host: str, port: int, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            socket.create_connection((host, port), timeout=0.1).close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise Exception(f"[startup]: the bot didn't listen on port {port} within {timeout}s")
+            time.sleep(0.005)
+
+
+async def conversation_turns(session: aiohttp.ClientSession, load_test: LoadTest) -> List[float]:
+    """Seconds taken by each turn of CONVERSATION, conversation update included."""
+    conversation_id = str(uuid.uuid4())
+    activities = [load_test._activity(conversation_id, "conversationUpdate")]
+    activities += [load_test._activity(conversation_id, "message", text) for text in CONVERSATION]
+    seconds = []
+    for activity in activities:
+        start = time.perf_counter()
+        async with session.post(load_test.bot_url, json=activity) as response:
+            await response.read()
+            if response.status >= 400:
+                raise Exception(f"[startup]: turn failed with status {response.status}")
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+async def cold_start(args, env: Dict[str, str], load_test: LoadTest) -> Dict[str, float]:
+    start = time.perf_counter()
+    bot = subprocess.Popen([sys.executable, "app.py"], env=env, stdout=subprocess.DEVNULL)
+    try:
+        await asyncio.get_event_loop().run_in_executor(None, wait_for_port, "localhost", args.port, args.timeout)
+        listening = time.perf_counter() - start
+        async with aiohttp.ClientSession() as session:
+            first = await conversation_turns(session, load_test)
+            second = await conversation_turns(session, load_test)
+    finally:
+        bot.send_signal(signal.SIGINT)
+        bot.wait()
+    return {
+        "listening": listening,
+        "first_turn": first[0],
+        "first_conversation": sum(first),
+        "second_conversation": sum(second),
+    }
+
+
+async def run(args) -> None:
+    connector = StubConnector()
+    runner = web.AppRunner(connector.create_app())
+    await runner.setup()
+    await web.TCPSite(runner, "localhost", args.connector_port).start()
+    load_test = LoadTest(
+        f"http://localhost:{args.port}/api/messages", f"http://localhost:{args.connector_port}", connector, None,
+        args.timeout,
+    )
+
+    try:
+        for lazy in ("true", "false"):
+            env = dict(os.environ, LazyInit=lazy)
+            results: Dict[str, List[float]] = {}
+            for _ in range(args.runs):
+                results.setdefault("import", []).append(import_time(env))
+                for name, seconds in (await cold_start(args, env, load_test)).items():
+                    results.setdefault(name, []).append(seconds)
+
+            print(f"LazyInit={lazy}")
+            for name, seconds in results.items():
+                print(f"  {name:<20} median {median(seconds) * 1000:8.1f} ms")
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="cold starts per mode")
+    parser.add_argument("--port", type=int, default=3978, help="port of the bot (DefaultConfig.PORT)")
+    parser.add_argument("--connector-port", type=int, default=3980)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for the bot")
+    args = parser.parse_args()
+
+    asyncio.get_event_loop().run_until_complete(run(args))
+
+
+if __name__ == "__main__":
+    main()
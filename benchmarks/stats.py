@@ -0,0 +1,56 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""Latency summaries shared by the benchmarks."""
+
+import math
+from typing import Dict, List, Sequence
+
+# Upper bounds of the latency histogram buckets, in milliseconds.
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, math.inf)
+
+
+def percentile(sorted_samples: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def summarize(samples_ms: Sequence[float]) -> Dict[str, object]:
+    ordered = sorted(samples_ms)
+    return {
+        "count": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) if ordered else 0.0,
+        "p50_ms": percentile(ordered, 0.50),
+        "p95_ms": percentile(ordered, 0.95),
+        "p99_ms": percentile(ordered, 0.99),
+        "max_ms": ordered[-1] if ordered else 0.0,
+        "histogram": histogram(ordered),
+    }
+
+
+def histogram(samples_ms: Sequence[float]) -> List[Dict[str, object]]:
+    counts = [0] * len(BUCKETS_MS)
+    for sample in samples_ms:
+        for index, bound in enumerate(BUCKETS_MS):
+            if sample <= bound:
+                counts[index] += 1
+                break
+    return [
+        {"le_ms": "+Inf" if math.isinf(bound) else bound, "count": count}
+        for bound, count in zip(BUCKETS_MS, counts)
+    ]
+
+
+def format_summary(title: str, summary: Dict[str, object], width: int = 40) -> str:
+    lines = [
+        f"{title}: n={summary['count']} mean={summary['mean_ms']:.3f}ms p50={summary['p50_ms']:.3f}ms "
+        f"p95={summary['p95_ms']:.3f}ms p99={summary['p99_ms']:.3f}ms max={summary['max_ms']:.3f}ms"
+    ]
+    peak = max((bucket["count"] for bucket in summary["histogram"]), default=0) or 1
+    for bucket in summary["histogram"]:
+        if bucket["count"]:
+            bar = "#" * max(1, round(width * bucket["count"] / peak))
+            lines.append(f"  <= {str(bucket['le_ms']):>6} ms {bucket['count']:>7} {bar}")
+    return "\n".join(lines)
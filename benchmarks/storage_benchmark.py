@@ -0,0 +1,122 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""
+Per-turn state read/write latency of SqliteStorage against MemoryStorage.
+
+Each simulated turn reads a conversation's state, updates the dialog stack and writes it back, as
+ConversationState.load and save_changes do. Concurrent conversations run against MemoryStorage,
+BoundedMemoryStorage holding half of them, SqliteStorage with write-behind and SqliteStorage waiting for every
+group commit:
+
+    python -m benchmarks.storage_benchmark --conversations 500 --turns 10 --concurrency 100
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from typing import Dict, List
+
+from botbuilder.core import MemoryStorage, MessageFactory, Storage
+from botbuilder.dialogs import DialogInstance, DialogState
+from botbuilder.dialogs.prompts import PromptOptions
+from botbuilder.schema import InputHints
+
+from benchmarks.stats import format_summary, summarize
+from booking_details import BookingDetails
+from storage import BoundedMemoryStorage, SqliteStorage
+
+
+def _dialog_instance(dialog_id: str, state: dict) -> DialogInstance:
+    instance = DialogInstance()
+    instance.id = dialog_id
+    instance.state = state
+    return instance
+
+
+def conversation_state(turn: int) -> Dict[str, object]:
+    """State shaped like the bot's while BookingDialog prompts for a slot."""
+    details = BookingDetails(dst_city="Paris", or_city="Berlin", str_date="2023-02-10", n_adults="2")
+    prompt = MessageFactory.text("From what city will you be travelling?", input_hint=InputHints.expecting_input)
+    dialog_state = DialogState([
+        _dialog_instance("TextPrompt", {"options": PromptOptions(prompt=prompt), "state": {}}),
+        _dialog_instance("WaterfallDialog", {"options": details, "values": {"instanceId": "id"}, "stepIndex": turn}),
+        _dialog_instance("BookingDialog", {"dialogs": {"dialogStack": []}}),
+        _dialog_instance("WFDialog", {"options": None, "values": {}, "stepIndex": 1}),
+        _dialog_instance("MainDialog", {"dialogs": {"dialogStack": []}}),
+    ])
+    return {"DialogState": dialog_state}
+
+
+async def run_conversations(storage: Storage, conversations: int, turns: int, concurrency: int) -> dict:
+    reads: List[float] = []
+    writes: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def conversation(index: int):
+        key = f"benchmark/conversations/{index}"
+        async with semaphore:
+            for turn in range(turns):
+                start = time.perf_counter()
+                await storage.read([key])
+                reads.append((time.perf_counter() - start) * 1000)
+
+                start = time.perf_counter()
+                await storage.write({key: conversation_state(turn)})
+                writes.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[conversation(index) for index in range(conversations)])
+    if isinstance(storage, SqliteStorage):
+        await storage.flush()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "turns_per_sec": conversations * turns / elapsed,
+        "read": summarize(reads),
+        "write": summarize(writes),
+    }
+
+
+async def run(args) -> Dict[str, dict]:
+    reports = {"MemoryStorage": await run_conversations(
+        MemoryStorage(), args.conversations, args.turns, args.concurrency
+    )}
+    reports["BoundedMemoryStorage"] = await run_conversations(
+        BoundedMemoryStorage(max_entries=max(1, args.conversations // 2)), args.conversations, args.turns,
+        args.concurrency
+    )
+    for name, write_behind in (("SqliteStorage (write-behind)", True), ("SqliteStorage (synchronous)", False)):
+        with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+            storage = SqliteStorage(
+                directory, shards=args.shards, flush_interval=args.flush_interval, write_behind=write_behind
+            )
+            reports[name] = await run_conversations(storage, args.conversations, args.turns, args.concurrency)
+            await storage.close()
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--flush-interval", type=float, default=0.01)
+    parser.add_argument("--directory", default=None, help="where to create the SQLite files (default: temp dir)")
+    parser.add_argument("--report", default=None, help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    reports = asyncio.get_event_loop().run_until_complete(run(args))
+    for name, report in reports.items():
+        print(f"{name}: {report['turns_per_sec']:.0f} turns/sec")
+        print(format_summary("  read", report["read"]))
+        print(format_summary("  write", report["write"]))
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as report_file:
+            json.dump(reports, report_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""
+Cost of the date checks of a booking, parsing every timex as before or through the TimexParser memo.
+
+A booking whose dates LUIS resolved checks each of them once (BookingDialog.is_ambiguous); an ambiguous one is then
+checked by DateResolverDialog.initial_step and, once re-prompted, by datetime_prompt_validator and initial_step again:
+
+    python -m benchmarks.timex_parsing --number 2000
+"""
+import argparse
+import datetime
+import timeit
+
+from datatypes_date_time.timex import Timex
+
+from helpers.timex_parser import TimexParser
+
+# Timex strings of one booking: a definite departure, an ambiguous return ("on the 15th") resolved by the prompt.
+BOOKING = ["2023-02-10", "XXXX-XX-15", "XXXX-XX-15", "2023-02-15", "2023-02-15", "2023-02-15"]
+
+
+def former_checks(timex: str):
+    """Timex and strptime, as the dialogs parsed every timex before."""
+    try:
+        date = datetime.datetime.strptime(timex.split("T")[0], "%Y-%m-%d").date()
+    except ValueError:
+        date = None
+    return "definite" in Timex(timex).types, date
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=2000, help="bookings per measurement")
+    args = parser.parse_args()
+
+    timex_parser = TimexParser()
+    cases = {
+        "Timex + strptime": lambda: [former_checks(timex) for timex in BOOKING],
+        "TimexParser": lambda: [timex_parser.parse(timex) for timex in BOOKING],
+    }
+    for name, check in cases.items():
+        seconds = timeit.timeit(check, number=args.number)
+        print(f"{name:<18} {seconds / args.number * 1e6:8.2f} us/booking")
+    print(f"memo: {timex_parser.stats()}")
+
+
+if __name__ == "__main__":
+    main()
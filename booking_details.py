@@ -1,8 +1,26 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License.
+import json
+from typing import List
+
+from jsonpickle.handlers import BaseHandler, register
 
 
 class BookingDetails:
+    """
+    Booking slots filled by the dialogs.
+
+    Saved with the dialog state on every booking step, so it serializes to a compact versioned list
+    (see to_compact) instead of a dict of attribute names, including through jsonpickle which the state
+    storages use.
+    """
+
+    VERSION = 1
+    FIELDS = (
+        "dst_city", "or_city", "str_date", "end_date", "budget", "n_adults", "n_children", "unsupported_airports",
+    )
+    __slots__ = FIELDS
+
     def __init__(
             self,
             dst_city: str = None,
@@ -24,3 +42,72 @@ class BookingDetails:
         self.n_adults = n_adults
         self.n_children = n_children
         self.unsupported_airports = unsupported_airports
+
+    def to_compact(self) -> list:
+        """[VERSION, dst_city, or_city, str_date, end_date, budget, n_adults, n_children, unsupported_airports]"""
+        return [
+            self.VERSION, self.dst_city, self.or_city, self.str_date, self.end_date, self.budget,
+            self.n_adults, self.n_children, list(self.unsupported_airports),
+        ]
+
+    @classmethod
+    def from_compact(cls, data: List[object]) -> "BookingDetails":
+        booking_details = cls.__new__(cls)
+        booking_details.__setstate__(data)
+        return booking_details
+
+    def encode(self) -> str:
+        # Slots are strings; numbers set by prompts (Decimal) are kept as their text.
+        return json.dumps(self.to_compact(), separators=(",", ":"), default=str)
+
+    @classmethod
+    def decode(cls, data: str) -> "BookingDetails":
+        return cls.from_compact(json.loads(data))
+
+    def __getstate__(self) -> list:
+        return self.to_compact()
+
+    def __setstate__(self, state) -> None:
+        if isinstance(state, dict):
+            # Saved before BookingDetails was versioned: the attributes themselves.
+            state = [0] + [state.get(field) for field in self.FIELDS]
+        if not state or state[0] > self.VERSION:
+            raise Exception(f"[BookingDetails]: unsupported serialized version {state[0] if state else None}")
+
+        values = list(state[1:len(self.FIELDS) + 1])
+        values += [None] * (len(self.FIELDS) - len(values))
+        for field, value in zip(self.FIELDS, values):
+            setattr(self, field, value)
+        if self.unsupported_airports is None:
+            self.unsupported_airports = []
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BookingDetails):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.FIELDS)
+
+    __hash__ = None
+
+
+class _BookingDetailsHandler(BaseHandler):
+    """Lets jsonpickle store the compact list as is instead of flattening the object."""
+
+    def flatten(self, obj: BookingDetails, data: dict) -> dict:
+        # Prompts fill some slots with numbers (e.g. Decimal from NumberPrompt): jsonpickle encodes those.
+        data["compact"] = [
+            value if value is None or isinstance(value, (str, int)) else self.context.flatten(value, reset=False)
+            for value in obj.to_compact()
+        ]
+        return data
+
+    def restore(self, data: dict) -> BookingDetails:
+        if "compact" not in data:
+            # Saved as a plain object before the handler was registered.
+            return BookingDetails.from_compact({key: value for key, value in data.items() if key != "py/object"})
+        return BookingDetails.from_compact([
+            value if value is None or isinstance(value, (str, int)) else self.context.restore(value, reset=False)
+            for value in data["compact"]
+        ])
+
+
+register(BookingDetails, _BookingDetailsHandler)
@@ -1,7 +1,6 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License.
 """Main dialog to welcome users."""
-import json
 import os.path
 from typing import List
 
@@ -15,6 +14,7 @@ from botbuilder.dialogs import Dialog
 from botbuilder.schema import Activity, Attachment, ChannelAccount
 
 from helpers.activity_helper import create_activity_reply
+from helpers.card_template import CardTemplate
 from .dialog_bot import DialogBot
 
 
@@ -51,14 +51,9 @@ class DialogAndWelcomeBot(DialogBot):
         response.attachments = [attachment]
         return response
 
-    # Load attachment from file.
+    # Load attachment from file, read once and shared by every welcome message.
     def create_adaptive_card_attachment(self):
         """Create an adaptive card."""
         relative_path = os.path.abspath(os.path.dirname(__file__))
         path = os.path.join(relative_path, "resources/welcomeCard.json")
-        with open(path, encoding="utf-8") as card_file:
-            card = json.load(card_file)
-
-        return Attachment(
-            content_type="application/vnd.microsoft.card.adaptive", content=card
-        )
+        return CardTemplate.load(path).create_attachment()
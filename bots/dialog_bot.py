@@ -12,6 +12,8 @@ from botbuilder.core import (
 )
 from botbuilder.dialogs import Dialog, DialogExtensions
 
+from helpers.metrics import METRICS, TurnMetrics
+
 
 class DialogBot(ActivityHandler):
     """Main activity handler for the bot."""
@@ -38,15 +40,21 @@ class DialogBot(ActivityHandler):
         self.telemetry_client = telemetry_client
 
     async def on_message_activity(self, turn_context: TurnContext):
-        await DialogExtensions.run_dialog(
-            self.dialog,
-            turn_context,
-            self.conversation_state.create_property("DialogState"),
-        )
+        # Loading up front times the storage read on its own; run_dialog then reuses the cached state.
+        with METRICS.time(TurnMetrics.STATE_LOAD):
+            await self.conversation_state.load(turn_context)
+
+        with METRICS.time(TurnMetrics.DIALOG):
+            await DialogExtensions.run_dialog(
+                self.dialog,
+                turn_context,
+                self.conversation_state.create_property("DialogState"),
+            )
 
         # Save any state changes that might have occured during the turn.
-        await self.conversation_state.save_changes(turn_context, False)
-        await self.user_state.save_changes(turn_context, False)
+        with METRICS.time(TurnMetrics.SAVE):
+            await self.conversation_state.save_changes(turn_context, False)
+            await self.user_state.save_changes(turn_context, False)
 
     @property
     def telemetry_client(self) -> BotTelemetryClient:
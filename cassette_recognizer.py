@@ -0,0 +1,134 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""
+Record/replay of recognizer results: RecordingRecognizer saves the results of a recognizer (LUIS, the offline
+recognizer) to a cassette file and ReplayRecognizer answers from it, without network or model.
+"""
+import copy
+import json
+import os
+from typing import Dict, Optional
+
+from botbuilder.core import IntentScore, Recognizer, RecognizerResult, TurnContext
+from botbuilder.schema import ActivityTypes
+
+from helpers.recognition_cache import normalize_utterance
+
+
+class CassetteMiss(Exception):
+    """Raised by ReplayRecognizer for an utterance that was never recorded."""
+
+
+class Cassette:
+    """
+    RecognizerResult payloads keyed by normalized utterance, stored in a JSON file.
+
+    Only the text, intents and entities are kept: the raw LUIS response in `properties` isn't read by the dialogs.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str, recordings: Dict[str, dict] = None):
+        self.path = path
+        self._recordings = recordings or {}
+
+    @staticmethod
+    def load(path: str) -> "Cassette":
+        """The cassette stored in `path`, an empty one if the file doesn't exist yet."""
+        if not os.path.exists(path):
+            return Cassette(path)
+
+        with open(path, encoding="utf-8") as file:
+            content = json.load(file)
+        if content.get("version") != Cassette.VERSION:
+            raise ValueError(f"[Cassette]: unsupported cassette version {content.get('version')!r} in {path}")
+        return Cassette(path, content["recordings"])
+
+    def __len__(self) -> int:
+        return len(self._recordings)
+
+    def __contains__(self, text: str) -> bool:
+        return normalize_utterance(text) in self._recordings
+
+    def get(self, text: str) -> Optional[RecognizerResult]:
+        """A copy of the result recorded for `text`, None if there is none."""
+        recording = self._recordings.get(normalize_utterance(text))
+        if recording is None:
+            return None
+
+        return RecognizerResult(
+            text=text,
+            altered_text=recording["alteredText"],
+            intents={name: IntentScore(score) for name, score in recording["intents"].items()},
+            entities=copy.deepcopy(recording["entities"]),
+        )
+
+    def put(self, text: str, recognizer_result: RecognizerResult) -> bool:
+        """Record the result for `text`, True if it changed the cassette."""
+        recording = {
+            "text": text,
+            "alteredText": recognizer_result.altered_text,
+            "intents": {name: intent.score for name, intent in (recognizer_result.intents or {}).items()},
+            "entities": copy.deepcopy(recognizer_result.entities or {}),
+        }
+        key = normalize_utterance(text)
+        if self._recordings.get(key) == recording:
+            return False
+        self._recordings[key] = recording
+        return True
+
+    def save(self) -> None:
+        # Written to a temporary file first so that an interrupted run doesn't leave a truncated cassette.
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"version": self.VERSION, "recordings": self._recordings},
+                file, indent=2, sort_keys=True, ensure_ascii=False,
+            )
+            file.write("\n")
+        os.replace(temporary_path, self.path)
+
+
+def _utterance(turn_context: TurnContext) -> Optional[str]:
+    activity = turn_context.activity
+    if activity is None or activity.type != ActivityTypes.message or not activity.text or activity.text.isspace():
+        return None
+    return activity.text
+
+
+class RecordingRecognizer(Recognizer):
+    """Forwards to `recognizer` and adds its results to the cassette, saved after each new recording."""
+
+    def __init__(self, recognizer: Recognizer, cassette: Cassette):
+        self._recognizer = recognizer
+        self.cassette = cassette
+
+    async def recognize(self, turn_context: TurnContext) -> RecognizerResult:
+        recognizer_result = await self._recognizer.recognize(turn_context)
+        text = _utterance(turn_context)
+        if text is not None and recognizer_result is not None and self.cassette.put(text, recognizer_result):
+            self.cassette.save()
+        return recognizer_result
+
+
+class ReplayRecognizer(Recognizer):
+    """Answers from a cassette, raising CassetteMiss for the utterances it doesn't contain."""
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    async def recognize(self, turn_context: TurnContext) -> RecognizerResult:
+        text = _utterance(turn_context)
+        if text is None:
+            return RecognizerResult(text=turn_context.activity.text, intents={}, entities={})
+
+        recognizer_result = self.cassette.get(text)
+        if recognizer_result is None:
+            raise CassetteMiss(
+                f"[ReplayRecognizer]: no recording of {text!r} in {self.cassette.path},"
+                " record it with LuisCassetteMode=record"
+            )
+        return recognizer_result
@@ -10,12 +10,106 @@ class DefaultConfig:
     """Configuration for the bot."""
 
     PORT = 3978
+    # Worker processes sharing the port (SO_REUSEPORT, Linux) under a supervisor restarting them, see workers.py.
+    # Workers get a WorkerId from the supervisor.
+    WORKERS = int(os.environ.get("Workers", 1))
+    WORKER_ID = os.environ.get("WorkerId", "")
+    # Build the dialogs, the recognizer and the gazetteer in a warm-up task once the app starts instead of on import
+    # (or on the first turn needing them, if it comes first).
+    LAZY_INIT = os.environ.get("LazyInit", "true").lower() == "true"
     APP_ID = os.environ.get("MicrosoftAppId", "")
     APP_PASSWORD = os.environ.get("MicrosoftAppPassword", "")
     LUIS_APP_ID = os.environ.get("LuisAppId", "")
     LUIS_API_KEY = os.environ.get("LuisAPIKey", "")
-    # LUIS endpoint host name, ie "westus.api.cognitive.microsoft.com"
+    # LUIS endpoint host name, ie "westus.api.cognitive.microsoft.com", or a full URL such as
+    # "http://localhost:3979" for the local stand-in server (benchmarks/luis_server.py)
     LUIS_API_HOST_NAME = os.environ.get("LuisAPIHostName", "")
+    # Published LUIS app version, part of the recognition cache key
+    LUIS_APP_VERSION = os.environ.get("LuisAppVersion", "0.1")
+    # Recognition cache: max entries (0 disables it), TTL and stale-while-revalidate window in seconds
+    LUIS_CACHE_SIZE = int(os.environ.get("LuisCacheSize", 1024))
+    LUIS_CACHE_TTL = float(os.environ.get("LuisCacheTtl", 3600))
+    LUIS_CACHE_STALE_TTL = float(os.environ.get("LuisCacheStaleTtl", 600))
+    # Seconds a turn waits for LUIS (0 for no deadline) and consecutive failures or timeouts opening the circuit
+    # breaker, which then skips LUIS for LuisBreakerResetTimeout seconds before letting a probe query through.
+    # Skipped or failed queries are answered by the offline recognizer's result if configured, and the main dialog
+    # asks for each booking slot in turn.
+    LUIS_DEADLINE = float(os.environ.get("LuisDeadline", 2.0))
+    LUIS_BREAKER_FAILURES = int(os.environ.get("LuisBreakerFailures", 5))
+    LUIS_BREAKER_RESET_TIMEOUT = float(os.environ.get("LuisBreakerResetTimeout", 30))
+    # Offline recognizer answering before LUIS: a LUIS app export (.json) or a prebuilt artifact (.npz),
+    # empty to disable. LUIS is only called when the top intent scores below the threshold, the offline result
+    # answering the turn if LUIS is degraded. A turn waits OfflineRecognizerDeadline seconds for it (0 for no
+    # deadline), then goes on without it.
+    OFFLINE_RECOGNIZER_MODEL = os.environ.get("OfflineRecognizerModel", "")
+    OFFLINE_RECOGNIZER_THRESHOLD = float(os.environ.get("OfflineRecognizerThreshold", 0.8))
+    OFFLINE_RECOGNIZER_DEADLINE = float(os.environ.get("OfflineRecognizerDeadline", 0.5))
+    # Processes parsing the datetime and money entities for the offline recognizer, each handling about 10 utterances
+    # with digits or date words a second (0 for a single thread of the bot's process, about 10 a second in all).
+    # By default the CPUs are shared between the Workers.
+    OFFLINE_RECOGNIZER_WORKERS = int(
+        os.environ.get("OfflineRecognizerWorkers", max(1, (os.cpu_count() or 1) // max(1, WORKERS)))
+    )
+    # Cassette of recognizer results (see cassette_recognizer.py), empty to disable. With "replay" the results come
+    # from the file instead of LUIS, with "record" the results of LUIS are added to it. The offline recognizer, if
+    # configured, answers before the cassette in both modes.
+    LUIS_CASSETTE = os.environ.get("LuisCassette", "")
+    LUIS_CASSETTE_MODE = os.environ.get("LuisCassetteMode", "replay")
+    # City names answering the origin/destination prompts without LUIS, a file of real city names, one per line
+    # (see helpers/gazetteer.py). Empty to turn the gazetteer off.
+    CITY_GAZETTEER = os.environ.get("CityGazetteer", "cognitiveModels/cities.txt")
+    # Conversation and user state backend: "memory", "sqlite" or "package.module:Class" (see storage/factory.py),
+    # by default sqlite when StateStoragePath (a directory of sharded SQLite files) is set, memory otherwise.
+    # Writes are committed in groups every StateStorageFlushInterval seconds, and with write-behind turns don't
+    # wait for the commit: disable it when several processes share the state.
+    STATE_STORAGE = os.environ.get("StateStorage", "")
+    STATE_STORAGE_PATH = os.environ.get("StateStoragePath", "")
+    STATE_STORAGE_SHARDS = int(os.environ.get("StateStorageShards", 8))
+    STATE_STORAGE_FLUSH_INTERVAL = float(os.environ.get("StateStorageFlushInterval", 0.01))
+    STATE_STORAGE_WRITE_BEHIND = os.environ.get("StateStorageWriteBehind", "true").lower() == "true"
+    # The "memory" state storage drops the items unused for StateMemoryIdleTtl seconds (0 to keep them), checked every
+    # StateMemorySweepInterval seconds, and the least recently used ones beyond StateMemoryMaxEntries items or
+    # StateMemoryMaxBytes bytes of pickled items (0 for no bound; the heap use is a few times larger). A conversation
+    # dropped mid-booking starts over.
+    STATE_MEMORY_IDLE_TTL = float(os.environ.get("StateMemoryIdleTtl", 86400))
+    STATE_MEMORY_SWEEP_INTERVAL = float(os.environ.get("StateMemorySweepInterval", 60))
+    STATE_MEMORY_MAX_ENTRIES = int(os.environ.get("StateMemoryMaxEntries", 0))
+    STATE_MEMORY_MAX_BYTES = int(os.environ.get("StateMemoryMaxBytes", 0))
+    # Telemetry records (dialog step logs, waterfall events) are buffered, dropping the oldest beyond
+    # TelemetryBufferSize, and sent in batches of TelemetryBatchSize every TelemetryFlushInterval seconds.
+    TELEMETRY_BUFFER_SIZE = int(os.environ.get("TelemetryBufferSize", 4096))
+    TELEMETRY_BATCH_SIZE = int(os.environ.get("TelemetryBatchSize", 100))
+    TELEMETRY_FLUSH_INTERVAL = float(os.environ.get("TelemetryFlushInterval", 1.0))
+    # Hold the activities sent during a turn and send them in one batch at the end of the turn, once the state
+    # is saved. helpers.outbound_buffer.send_immediately() bypasses it. Off by default: the Bot Connector has no
+    # batch endpoint, so the replies still take one call each and are only delayed until the state is saved.
+    OUTBOUND_BATCHING = os.environ.get("OutboundBatching", "false").lower() == "true"
+    # Admission control of /api/messages: turns processed at once (0 for no limit), requests waiting for one of
+    # them, and seconds they may wait. Requests finding the queue full get a 429, those waiting too long a 503, both
+    # with a Retry-After of AdmissionRetryAfter seconds.
+    MAX_CONCURRENT_TURNS = int(os.environ.get("MaxConcurrentTurns", 64))
+    ADMISSION_QUEUE_SIZE = int(os.environ.get("AdmissionQueueSize", 256))
+    ADMISSION_QUEUE_TIMEOUT = float(os.environ.get("AdmissionQueueTimeout", 2.0))
+    ADMISSION_RETRY_AFTER = int(os.environ.get("AdmissionRetryAfter", 1))
+    # Turns of a conversation waiting for its running turn (0 for no limit): the next ones get a 429 with the same
+    # Retry-After. Turns only take an admission slot once the previous turns of their conversation are done.
+    CONVERSATION_QUEUE_SIZE = int(os.environ.get("ConversationQueueSize", 4))
+    # CPU profiles of 1 in ProfileSampleRate turns (0 for none) and of the turns of the conversations flagged through
+    # /admin/profiling, sampling the stack every ProfileInterval seconds of CPU time (see helpers/turn_profiler.py).
+    # The ProfileMaxFiles latest profiles are kept in ProfileDirectory.
+    PROFILE_SAMPLE_RATE = int(os.environ.get("ProfileSampleRate", 0))
+    PROFILE_INTERVAL = float(os.environ.get("ProfileInterval", 0.005))
+    PROFILE_DIRECTORY = os.environ.get("ProfileDirectory", "profiles")
+    PROFILE_MAX_FILES = int(os.environ.get("ProfileMaxFiles", 200))
+    # Bearer token of the /admin endpoints, which are only served when it is set.
+    ADMIN_TOKEN = os.environ.get("AdminToken", "")
+    # Pool of keep-alive connections shared by the LUIS and Bot Connector calls: max open connections (in total
+    # and per host, 0 for no bound), idle connection lifetime and DNS cache TTL in seconds, request timeout.
+    HTTP_POOL_SIZE = int(os.environ.get("HttpPoolSize", 100))
+    HTTP_POOL_SIZE_PER_HOST = int(os.environ.get("HttpPoolSizePerHost", 0))
+    HTTP_KEEPALIVE_TIMEOUT = float(os.environ.get("HttpKeepAliveTimeout", 30))
+    HTTP_DNS_CACHE_TTL = int(os.environ.get("HttpDnsCacheTtl", 300))
+    HTTP_TIMEOUT = float(os.environ.get("HttpTimeout", 100))
     APPINSIGHTS_INSTRUMENTATION_KEY = os.environ.get(
         "AppInsightsInstrumentationKey", ""
     )
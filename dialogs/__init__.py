@@ -4,7 +4,15 @@
 from .booking_dialog import BookingDialog
 from .cancel_and_help_dialog import CancelAndHelpDialog
 from .date_resolver_dialog import DateResolverDialog
+from .local_number_prompt import LocalNumberPrompt
 from .main_dialog import MainDialog
 from .texttoluisprompt import TextToLuisPrompt
 
-__all__ = ["BookingDialog", "CancelAndHelpDialog", "DateResolverDialog", "MainDialog", "TextToLuisPrompt"]
+__all__ = [
+    "BookingDialog",
+    "CancelAndHelpDialog",
+    "DateResolverDialog",
+    "LocalNumberPrompt",
+    "MainDialog",
+    "TextToLuisPrompt",
+]
@@ -1,14 +1,18 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License.
 """Flight booking dialog."""
+from typing import Dict
 
-from botbuilder.core import MessageFactory, BotTelemetryClient, NullTelemetryClient
+from botbuilder.core import MessageFactory, BotTelemetryClient, NullTelemetryClient, Recognizer
 from botbuilder.dialogs import WaterfallDialog, WaterfallStepContext, DialogTurnResult
 from botbuilder.dialogs.prompts import ConfirmPrompt, TextPrompt, PromptOptions, NumberPrompt
-from datatypes_date_time.timex import Timex
+
+from helpers.gazetteer import Gazetteer
+from helpers.timex_parser import parse_timex
 
 from .cancel_and_help_dialog import CancelAndHelpDialog
 from .date_resolver_dialog import DateResolverDialog
+from .local_number_prompt import LocalNumberPrompt
 from .texttoluisprompt import TextToLuisPrompt
 
 
@@ -19,13 +23,16 @@ class BookingDialog(CancelAndHelpDialog):
             self,
             dialog_id: str = None,
             telemetry_client: BotTelemetryClient = NullTelemetryClient(),
+            gazetteer: Gazetteer = None,
+            luis_recognizer: Recognizer = None,
     ):
         super(BookingDialog, self).__init__(
             dialog_id or BookingDialog.__name__, telemetry_client
         )
         self.telemetry_client = telemetry_client
 
-        number_prompt = NumberPrompt(NumberPrompt.__name__)
+        # Traveller counts are mostly plain numbers, parsed locally before recognizers-text.
+        number_prompt = LocalNumberPrompt(NumberPrompt.__name__)
         number_prompt.telemetry_client = telemetry_client
 
         text_prompt = TextPrompt(TextPrompt.__name__)
@@ -49,9 +56,10 @@ class BookingDialog(CancelAndHelpDialog):
 
         self.add_dialog(number_prompt)
         self.add_dialog(text_prompt)
-        self.add_dialog(TextToLuisPrompt("dst_city"))
-        self.add_dialog(TextToLuisPrompt("or_city"))
-        self.add_dialog(TextToLuisPrompt("budget"))
+        # City answers found in the gazetteer and plain amounts of money don't need LUIS.
+        self.add_dialog(TextToLuisPrompt("dst_city", luis_recognizer, gazetteer=gazetteer))
+        self.add_dialog(TextToLuisPrompt("or_city", luis_recognizer, gazetteer=gazetteer))
+        self.add_dialog(TextToLuisPrompt("budget", luis_recognizer))
         self.add_dialog(ConfirmPrompt(ConfirmPrompt.__name__, default_locale="en-us"))
         self.add_dialog(
             DateResolverDialog("str_date", self.telemetry_client)
@@ -69,11 +77,10 @@ class BookingDialog(CancelAndHelpDialog):
         self.n_adults_step_message = "For how many adult(s)?"
         self.n_children_step_message = "And how many child(ren)?"
 
-    def generate_step_log(
-            self, bot_prompt: str, user_input: str, step_name: str
-    ):
-        bot_log = {"bot": bot_prompt, "user": user_input, "step": step_name}
-        return bot_log
+    @staticmethod
+    def generate_step_log(bot_prompt: str, user_input: str, step_name: str) -> Dict[str, str]:
+        """Properties of the trace logged for a completed step."""
+        return {"bot": bot_prompt, "user": user_input, "step": step_name}
 
     async def dst_city_step(
             self, step_context: WaterfallStepContext
@@ -101,7 +108,7 @@ class BookingDialog(CancelAndHelpDialog):
         booking_details.dst_city = step_context.result
 
         # Sending the previous step log to the telemetry
-        bot_log = BookingDialog().generate_step_log(
+        bot_log = self.generate_step_log(
             self.dst_city_step_message,
             booking_details.dst_city,
             "dst_city_step"
@@ -132,7 +139,7 @@ class BookingDialog(CancelAndHelpDialog):
         booking_details.or_city = step_context.result
 
         # Sending the previous step log to the telemetry
-        bot_log = BookingDialog().generate_step_log(
+        bot_log = self.generate_step_log(
             self.or_city_step_message,
             booking_details.or_city,
             "origin_step"
@@ -161,7 +168,7 @@ class BookingDialog(CancelAndHelpDialog):
 
         # Sending the previous step log to the telemetry
         str_date_message = "On what date would you like to travel?"
-        bot_log = BookingDialog().generate_step_log(
+        bot_log = self.generate_step_log(
             str_date_message,
             booking_details.str_date,
             "str_date_step"
@@ -187,7 +194,7 @@ class BookingDialog(CancelAndHelpDialog):
 
         # Sending the previous step log to the telemetry
         end_date_message = "On what date would you like to come back?"
-        bot_log = BookingDialog().generate_step_log(
+        bot_log = self.generate_step_log(
             end_date_message,
             booking_details.end_date,
             "travel_end_date_step"
@@ -215,7 +222,7 @@ class BookingDialog(CancelAndHelpDialog):
         booking_details.budget = step_context.result
 
         # Sending the previous step log to the telemetry
-        bot_log = BookingDialog().generate_step_log(
+        bot_log = self.generate_step_log(
             self.budget_step_message,
             booking_details.budget,
             "budget_step"
@@ -245,7 +252,7 @@ class BookingDialog(CancelAndHelpDialog):
         booking_details.n_adults = step_context.result
 
         # Sending the previous step log to the telemetry
-        bot_log = BookingDialog().generate_step_log(
+        bot_log = self.generate_step_log(
             self.n_adults_step_message,
             str(booking_details.n_adults),
             "n_adults_step"
@@ -277,7 +284,7 @@ class BookingDialog(CancelAndHelpDialog):
         booking_details.n_children = step_context.result
 
         # Sending the previous step log to the telemetry
-        bot_log = BookingDialog().generate_step_log(
+        bot_log = self.generate_step_log(
             self.n_children_step_message,
             str(booking_details.n_children),
             "n_children_step"
@@ -321,5 +328,4 @@ class BookingDialog(CancelAndHelpDialog):
     def is_ambiguous(self, timex: str) -> bool:
         """Ensure time is correct."""
 
-        timex_property = Timex(timex)
-        return "definite" not in timex_property.types
+        return not parse_timex(timex).definite
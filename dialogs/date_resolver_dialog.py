@@ -12,7 +12,8 @@ from botbuilder.dialogs.prompts import (
     PromptOptions,
     DateTimeResolution,
 )
-from datatypes_date_time.timex import Timex
+
+from helpers.timex_parser import parse_timex
 
 from .cancel_and_help_dialog import CancelAndHelpDialog
 
@@ -63,9 +64,9 @@ class DateResolverDialog(CancelAndHelpDialog):
                 PromptOptions(prompt=MessageFactory.text(prompt), retry_prompt=MessageFactory.text(prompt)),
             )
 
-        try:
-            date = datetime.datetime.strptime(timex.split("T")[0], '%Y-%m-%d').date()
-        except ValueError:
+        parsed = parse_timex(timex)
+        date = parsed.date
+        if date is None:
             return await step_context.prompt(DateTimePrompt.__name__,
                                              PromptOptions(prompt=MessageFactory.text(invalid_date_msg)))
 
@@ -79,7 +80,7 @@ class DateResolverDialog(CancelAndHelpDialog):
             return await step_context.prompt(DateTimePrompt.__name__,
                                              PromptOptions(prompt=MessageFactory.text(invalid_return_date_msg)))
 
-        if "definite" not in Timex(timex).types:
+        if not parsed.definite:
             return await step_context.prompt(DateTimePrompt.__name__, PromptOptions(prompt=MessageFactory.text(prompt)))
 
         return await step_context.next(DateTimeResolution(timex=timex))
@@ -96,6 +97,6 @@ class DateResolverDialog(CancelAndHelpDialog):
             timex = prompt_context.recognized.value[0].timex.split("T")[0]
 
             # TODO: Needs TimexProperty
-            return "definite" in Timex(timex).types
+            return parse_timex(timex).definite
 
         return False
@@ -0,0 +1,31 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""Number prompt answering the common replies locally."""
+from typing import Dict
+
+from botbuilder.core.turn_context import TurnContext
+from botbuilder.dialogs.prompts import NumberPrompt, PromptOptions, PromptRecognizerResult
+from botbuilder.schema import ActivityTypes
+
+from helpers.quantity_parser import parse_number
+
+
+class LocalNumberPrompt(NumberPrompt):
+    """NumberPrompt trying the local English parser before the recognizers-text number model."""
+
+    async def on_recognize(
+            self,
+            turn_context: TurnContext,
+            state: Dict[str, object],
+            options: PromptOptions,
+    ) -> PromptRecognizerResult:
+        if not turn_context:
+            raise TypeError("LocalNumberPrompt.on_recognize(): turn_context cannot be None.")
+
+        activity = turn_context.activity
+        if activity.type == ActivityTypes.message and self._get_culture(turn_context).lower().startswith("en"):
+            number = parse_number(activity.text)
+            if number is not None:
+                return PromptRecognizerResult(succeeded=True, value=number)
+
+        return await super().on_recognize(turn_context, state, options)
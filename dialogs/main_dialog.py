@@ -19,6 +19,7 @@ from botbuilder.schema import InputHints
 from booking_details import BookingDetails
 from flight_booking_recognizer import FlightBookingRecognizer
 from helpers.luis_helper import LuisHelper, Intent
+from helpers.metrics import METRICS
 from .booking_dialog import BookingDialog
 from .flight_itinerary_card import FlightItineraryCard
 
@@ -88,6 +89,13 @@ class MainDialog(ComponentDialog):
         intent, luis_result = await LuisHelper.execute_luis_query(
             self._luis_recognizer, step_context.context
         )
+        METRICS.intents.inc(intent or "unknown")
+
+        if intent is None and FlightBookingRecognizer.is_degraded(step_context.context):
+            # LUIS is slow or down and nothing answered locally: ask for each booking slot instead.
+            return await step_context.begin_dialog(
+                self._booking_dialog_id, BookingDetails()
+            )
 
         bot_log = {
             "bot": "Hello! What can I help you with today?",
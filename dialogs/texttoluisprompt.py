@@ -1,24 +1,38 @@
 from typing import Dict
 
+from botbuilder.core import Recognizer
 from botbuilder.core.turn_context import TurnContext
 from botbuilder.dialogs.prompts import Prompt, PromptOptions, PromptRecognizerResult
 from botbuilder.schema import ActivityTypes
 
 from config import DefaultConfig
 from flight_booking_recognizer import FlightBookingRecognizer
+from helpers.gazetteer import Gazetteer
+from helpers.lazy import Lazy
+from helpers.quantity_parser import format_money, parse_money
+
+# Shared by the prompts not given a recognizer, built when one of them first needs LUIS.
+DEFAULT_RECOGNIZER = Lazy("text_to_luis_recognizer", lambda: FlightBookingRecognizer(DefaultConfig))
 
 
 class TextToLuisPrompt(Prompt):
     def __init__(
             self,
             dialog_id: str,
-            luis_recognizer: FlightBookingRecognizer = FlightBookingRecognizer(DefaultConfig),
+            luis_recognizer: Recognizer = None,
             validator=None,
+            gazetteer: Gazetteer = None,
     ):
         self.dialog_id = dialog_id
-        self.luis_recognizer = luis_recognizer
+        self._luis_recognizer = luis_recognizer
+        self.gazetteer = gazetteer
         super().__init__(dialog_id, validator=validator)
 
+    async def get_luis_recognizer(self) -> Recognizer:
+        if self._luis_recognizer is not None:
+            return self._luis_recognizer
+        return await DEFAULT_RECOGNIZER.get_async()
+
     async def on_prompt(
             self,
             turn_context: TurnContext,
@@ -49,7 +63,20 @@ class TextToLuisPrompt(Prompt):
             return PromptRecognizerResult(succeeded=False)
 
         user_text = turn_context.activity.text
-        luis_result = await self.luis_recognizer.recognize(turn_context)
+        if self.dialog_id in ["or_city", "dst_city"] and self.gazetteer is not None and user_text:
+            # Replies to these prompts are usually just a city name: only ask LUIS when it's not a known one.
+            match = self.gazetteer.match(user_text)
+            if match:
+                return PromptRecognizerResult(succeeded=True, value=match.text.title())
+
+        if self.dialog_id == "budget" and user_text:
+            # Same for amounts with an explicit currency ("300 euros", "$1,500").
+            money = parse_money(user_text)
+            if money:
+                return PromptRecognizerResult(succeeded=True, value=format_money(*money))
+
+        luis_recognizer = await self.get_luis_recognizer()
+        luis_result = await luis_recognizer.recognize(turn_context)
         entities = luis_result.entities.get("$instance", {})
 
         entity = None
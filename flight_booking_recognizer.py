@@ -1,49 +1,297 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License.
 
+import asyncio
+import copy
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
 from botbuilder.ai.luis import LuisApplication, LuisRecognizer, LuisPredictionOptions
 from botbuilder.core import (
+    BotAdapter,
     Recognizer,
     RecognizerResult,
     TurnContext,
     BotTelemetryClient,
     NullTelemetryClient,
 )
+from botbuilder.schema import Activity, ActivityTypes, ResourceResponse
 
+from cassette_recognizer import Cassette, CassetteMiss, RecordingRecognizer, ReplayRecognizer
 from config import DefaultConfig
+from helpers.circuit_breaker import CircuitBreaker
+from helpers.http_pool import HttpPool
+from helpers.metrics import METRICS, Counter, TurnMetrics
+from helpers.recognition_cache import RecognitionCache, normalize_utterance
+from helpers.single_flight import SingleFlight
+from pooled_luis_recognizer import PooledLuisRecognizer
+
+
+class _DetachedAdapter(BotAdapter):
+    """Adapter that drops outgoing activities, used for background cache refreshes."""
+
+    async def send_activities(
+            self, context: TurnContext, activities: List[Activity]
+    ) -> List[ResourceResponse]:
+        return [ResourceResponse() for _ in activities]
+
+    async def update_activity(self, context: TurnContext, activity: Activity):
+        return None
+
+    async def delete_activity(self, context: TurnContext, reference):
+        return None
 
 
 class FlightBookingRecognizer(Recognizer):
+    # turn_state key set when the turn's recognition was degraded (see is_degraded).
+    DEGRADED = "FlightBookingRecognizer.degraded"
+
     def __init__(
-            self, configuration: DefaultConfig, telemetry_client: BotTelemetryClient = NullTelemetryClient()
+            self,
+            configuration: DefaultConfig,
+            telemetry_client: BotTelemetryClient = NullTelemetryClient(),
+            recognizer: Recognizer = None,
+            http_pool: HttpPool = None,
+            local_recognizer: Recognizer = None,
     ):
-        self._recognizer = None
+        self._recognizer = recognizer
+        self._cache = None
+        self._in_flight = SingleFlight()
+        # Background refreshes of stale cache entries, cancelled by close().
+        self._refreshes: Set[asyncio.Future] = set()
+        self._app_key = (configuration.LUIS_APP_ID, configuration.LUIS_APP_VERSION)
+        # LUIS queries taking longer than the deadline, failing or skipped while the breaker is open are answered by
+        # the local recognizer's result, when there is one, or by an empty result.
+        self._deadline = configuration.LUIS_DEADLINE or None
+        self._local_deadline = configuration.OFFLINE_RECOGNIZER_DEADLINE or None
+        self.breaker = CircuitBreaker(
+            "luis",
+            failure_threshold=configuration.LUIS_BREAKER_FAILURES,
+            reset_timeout=configuration.LUIS_BREAKER_RESET_TIMEOUT,
+        )
+        # Offline recognizer answering first, LUIS only being queried when it isn't confident enough.
+        self._local_recognizer = local_recognizer
+        self.degraded_recognitions = Counter(
+            "bot_degraded_recognitions_total",
+            "Recognitions answered without LUIS or the offline recognizer (deadline, error or open circuit).",
+        )
 
         luis_is_configured = (
                 configuration.LUIS_APP_ID
                 and configuration.LUIS_API_KEY
                 and configuration.LUIS_API_HOST_NAME
         )
-        if luis_is_configured:
+        if luis_is_configured and self._recognizer is None:
             # Set the recognizer options depending on which endpoint version you want to use e.g v2 or v3.
             # More details can be found in https://docs.microsoft.com/azure/cognitive-services/luis/luis-migration-api-v3
+            # A host name with an explicit scheme (e.g. the local stand-in server) is used as is.
+            endpoint = configuration.LUIS_API_HOST_NAME
+            if not endpoint.startswith(("http://", "https://")):
+                endpoint = "https://" + endpoint
             luis_application = LuisApplication(
                 configuration.LUIS_APP_ID,
                 configuration.LUIS_API_KEY,
-                "https://" + configuration.LUIS_API_HOST_NAME,
+                endpoint,
             )
 
             options = LuisPredictionOptions()
             options.telemetry_client = telemetry_client or NullTelemetryClient()
 
-            self._recognizer = LuisRecognizer(
-                luis_application, prediction_options=options
+            if http_pool is not None:
+                # Predictions reuse the keep-alive connections of the bot's pool.
+                self._recognizer = PooledLuisRecognizer(luis_application, http_pool, prediction_options=options)
+            else:
+                self._recognizer = LuisRecognizer(
+                    luis_application, prediction_options=options
+                )
+
+        if configuration.OFFLINE_RECOGNIZER_MODEL and recognizer is None and local_recognizer is None:
+            # Imported on demand: the model needs numpy, which is slow to import and unused otherwise.
+            from offline_recognizer import (  # pylint: disable=import-outside-toplevel
+                IntentModel,
+                OfflineFlightBookingRecognizer,
+            )
+
+            self._local_recognizer = OfflineFlightBookingRecognizer(
+                IntentModel.load(configuration.OFFLINE_RECOGNIZER_MODEL),
+                configuration.OFFLINE_RECOGNIZER_THRESHOLD,
+                workers=configuration.OFFLINE_RECOGNIZER_WORKERS,
+            )
+
+        if configuration.LUIS_CASSETTE and recognizer is None:
+            cassette = Cassette.load(configuration.LUIS_CASSETTE)
+            if configuration.LUIS_CASSETTE_MODE == "replay":
+                self._recognizer = ReplayRecognizer(cassette)
+            elif configuration.LUIS_CASSETTE_MODE == "record":
+                if self._recognizer is None:
+                    raise Exception("[FlightBookingRecognizer]: recording a cassette needs LUIS")
+                self._recognizer = RecordingRecognizer(self._recognizer, cassette)
+            else:
+                raise ValueError("[FlightBookingRecognizer]: LuisCassetteMode must be \"replay\" or \"record\"")
+
+        if configuration.LUIS_CACHE_SIZE > 0:
+            self._cache = RecognitionCache(
+                max_entries=configuration.LUIS_CACHE_SIZE,
+                ttl=configuration.LUIS_CACHE_TTL,
+                stale_ttl=configuration.LUIS_CACHE_STALE_TTL,
             )
 
     @property
     def is_configured(self) -> bool:
-        # Returns true if luis is configured in the config.py and initialized.
-        return self._recognizer is not None
+        # Returns true if luis or the offline recognizer is configured in the config.py and initialized.
+        return self._recognizer is not None or self._local_recognizer is not None
+
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters of the recognition cache (empty when caching is disabled)."""
+        return self._cache.stats() if self._cache is not None else {}
+
+    @property
+    def in_flight_stats(self) -> Dict[str, int]:
+        """Counters of the table coalescing concurrent identical queries."""
+        return self._in_flight.stats()
+
+    def metrics(self) -> List[object]:
+        """Degraded mode counters, to register with TurnMetrics."""
+        return [self.degraded_recognitions, *self.breaker.metrics()]
+
+    @staticmethod
+    def is_degraded(turn_context: TurnContext) -> bool:
+        """Whether a recognition of this turn fell back to the degraded mode."""
+        return bool(turn_context.turn_state.get(FlightBookingRecognizer.DEGRADED))
 
     async def recognize(self, turn_context: TurnContext) -> RecognizerResult:
-        return await self._recognizer.recognize(turn_context)
+        with METRICS.time(TurnMetrics.RECOGNIZE):
+            return await self._recognize(turn_context)
+
+    async def _recognize(self, turn_context: TurnContext) -> RecognizerResult:
+        key = self._query_key(turn_context)
+        if key is None:
+            return await (self._recognizer or self._local_recognizer).recognize(turn_context)
+
+        if self._cache is not None:
+            cached = self._cache.get(key)
+            if cached is not None:
+                recognizer_result, is_stale = cached
+                if is_stale:
+                    self._schedule_refresh(key, turn_context)
+                return self._copy_result(recognizer_result, turn_context.activity.text)
+
+        local_result = None
+        if self._local_recognizer is not None:
+            local_result, answered = await self._answer_locally(key, turn_context.activity.text)
+            if answered:
+                return self._copy_result(local_result, turn_context.activity.text)
+        if self._recognizer is None:
+            return self._degrade(turn_context, None)
+
+        # The deadline and the breaker only apply to LUIS: a slow offline recognizer isn't a LUIS outage.
+        if not self.breaker.allow():
+            return self._degrade(turn_context, local_result)
+        try:
+            # Concurrent callers with the same query share a single LUIS request, which outlives the turn that
+            # started it when that turn gives up first.
+            detached_context = self._detached_context(turn_context)
+            recognizer_result = await asyncio.wait_for(
+                self._in_flight.do(key, lambda: self._query(key, detached_context)), self._deadline
+            )
+        except (asyncio.CancelledError, CassetteMiss):
+            # A missing recording is a test to re-record, not an outage.
+            raise
+        except Exception as exception:
+            # Includes asyncio.TimeoutError when the deadline passed.
+            print(f"[FlightBookingRecognizer]: degraded recognition, {exception!r}")
+            self.breaker.record_failure()
+            return self._degrade(turn_context, local_result)
+        self.breaker.record_success()
+
+        if recognizer_result is None:
+            return None
+        return self._copy_result(recognizer_result, turn_context.activity.text)
+
+    async def _query(self, key: Hashable, turn_context: TurnContext) -> RecognizerResult:
+        recognizer_result = await self._recognizer.recognize(turn_context)
+        if recognizer_result is not None and self._cache is not None:
+            self._cache.put(key, recognizer_result)
+        return recognizer_result
+
+    async def _answer_locally(self, key: Hashable, text: str) -> Tuple[Optional[RecognizerResult], bool]:
+        """
+        The offline recognizer's result, None when it missed its deadline or failed, and whether it answers the
+        query without LUIS (it is then cached).
+        """
+        try:
+            local_result = await asyncio.wait_for(
+                self._local_recognizer.recognize_text_async(text), self._local_deadline
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as exception:
+            # Includes asyncio.TimeoutError when the recognizer's queue is too long.
+            print(f"[FlightBookingRecognizer]: offline recognition skipped, {exception!r}")
+            return None, False
+
+        answered = self._recognizer is None or self._local_recognizer.is_confident(local_result)
+        if answered and self._cache is not None:
+            self._cache.put(key, local_result)
+        return local_result, answered
+
+    def _degrade(self, turn_context: TurnContext, local_result: Optional[RecognizerResult]) -> RecognizerResult:
+        """The offline recognizer's result if there is one (even with a low confidence), an empty one otherwise."""
+        turn_context.turn_state[FlightBookingRecognizer.DEGRADED] = True
+        self.degraded_recognitions.inc()
+        if local_result is not None:
+            return local_result
+        return RecognizerResult(text=turn_context.activity.text, intents={}, entities={})
+
+    def _query_key(self, turn_context: TurnContext) -> Optional[Hashable]:
+        activity = turn_context.activity
+        if activity is None or activity.type != ActivityTypes.message:
+            return None
+        if not activity.text or activity.text.isspace():
+            return None
+
+        culture = (activity.locale or "").lower()
+        return (normalize_utterance(activity.text), culture) + self._app_key
+
+    @staticmethod
+    def _copy_result(recognizer_result: RecognizerResult, text: str) -> RecognizerResult:
+        # Callers get their own copy so that cached or shared results can't be mutated.
+        result = copy.deepcopy(recognizer_result)
+        result.text = text
+        return result
+
+    @staticmethod
+    def _detached_context(turn_context: TurnContext) -> TurnContext:
+        """Context of a query not tied to a turn, swallowing the recognizer's trace activity."""
+        return TurnContext(_DetachedAdapter(), copy.copy(turn_context.activity))
+
+    def _schedule_refresh(self, key: Hashable, turn_context: TurnContext) -> None:
+        """Revalidate a stale entry in the background while the stale value is served."""
+        if key in self._in_flight:
+            return
+
+        # The turn may be over by the time LUIS answers.
+        detached_context = self._detached_context(turn_context)
+
+        async def refresh():
+            try:
+                if self._local_recognizer is not None:
+                    _, answered = await self._answer_locally(key, detached_context.activity.text)
+                    if answered or self._recognizer is None:
+                        return
+                await self._in_flight.do(key, lambda: self._query(key, detached_context))
+            except Exception as exception:
+                print(f"[FlightBookingRecognizer]: cache refresh failed, {exception!r}")
+
+        refresh_task = asyncio.ensure_future(refresh())
+        self._refreshes.add(refresh_task)
+        refresh_task.add_done_callback(self._refreshes.discard)
+
+    async def close(self) -> None:
+        """Cancel the cache refreshes still running and stop the offline recognizer."""
+        refreshes = list(self._refreshes)
+        for refresh_task in refreshes:
+            refresh_task.cancel()
+        await asyncio.gather(*refreshes, return_exceptions=True)
+        if self._local_recognizer is not None:
+            self._local_recognizer.close()
@@ -2,6 +2,44 @@
 # Licensed under the MIT License.
 """Helpers module."""
 
-from . import activity_helper, luis_helper, dialog_helper
+from . import (
+    activity_helper,
+    admission,
+    card_template,
+    circuit_breaker,
+    dialog_helper,
+    gazetteer,
+    http_pool,
+    lazy,
+    luis_helper,
+    mailbox,
+    metrics,
+    outbound_buffer,
+    quantity_parser,
+    recognition_cache,
+    single_flight,
+    telemetry_sink,
+    timex_parser,
+    turn_profiler,
+)
 
-__all__ = ["activity_helper", "dialog_helper", "luis_helper"]
+__all__ = [
+    "activity_helper",
+    "admission",
+    "card_template",
+    "circuit_breaker",
+    "dialog_helper",
+    "gazetteer",
+    "http_pool",
+    "lazy",
+    "luis_helper",
+    "mailbox",
+    "metrics",
+    "outbound_buffer",
+    "quantity_parser",
+    "recognition_cache",
+    "single_flight",
+    "telemetry_sink",
+    "timex_parser",
+    "turn_profiler",
+]
@@ -0,0 +1,109 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""Admission control bounding the turns processed concurrently, shedding the excess load early."""
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from http import HTTPStatus
+from typing import Deque, List
+
+from .metrics import Counter, Gauge
+
+
+class AdmissionRejected(Exception):
+    """A request shed by the AdmissionController, to answer with `status` and a Retry-After header."""
+
+    def __init__(self, status: HTTPStatus, reason: str):
+        super().__init__(f"[AdmissionController]: request shed, {reason}")
+        self.status = status
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    Up to `max_concurrency` requests run at once, the next ones wait in FIFO order.
+
+    A request finding `max_queue` requests already waiting is rejected right away with a 429, and one still
+    waiting after `queue_timeout` seconds with a 503: channels retry them later instead of every turn slowing down
+    until they all time out.
+    """
+
+    QUEUE_FULL = "queue_full"
+    QUEUE_TIMEOUT = "queue_timeout"
+
+    def __init__(self, max_concurrency: int = 64, max_queue: int = 256, queue_timeout: float = 2.0):
+        if max_concurrency < 1 or max_queue < 0:
+            raise ValueError("[AdmissionController]: max_concurrency must be at least 1 and max_queue non-negative")
+
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.shed = Counter("bot_admission_shed_total", "Requests rejected by admission control.", ["reason"])
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def admit(self):
+        """Hold one of the `max_concurrency` slots for the enclosed block, raising AdmissionRejected when shed."""
+        await self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self) -> None:
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.shed.inc(self.QUEUE_FULL)
+            raise AdmissionRejected(HTTPStatus.TOO_MANY_REQUESTS, f"{self.max_queue} requests already waiting")
+
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if self._discard(waiter):
+                self.shed.inc(self.QUEUE_TIMEOUT)
+                raise AdmissionRejected(
+                    HTTPStatus.SERVICE_UNAVAILABLE, f"waited more than {self.queue_timeout}s"
+                ) from None
+        except asyncio.CancelledError:
+            # The client went away; give the slot back if it was handed over meanwhile.
+            if not self._discard(waiter):
+                self._release()
+            raise
+
+    def _discard(self, waiter: asyncio.Future) -> bool:
+        """Stop waiting, False when a slot was handed to the waiter already."""
+        if waiter.done():
+            return False
+        waiter.cancel()
+        self._waiters.remove(waiter)
+        return True
+
+    def _release(self) -> None:
+        # Hand the slot over to the longest waiting request, if any.
+        if self._waiters:
+            self._waiters.popleft().set_result(None)
+        else:
+            self._active -= 1
+
+    def metrics(self) -> List[object]:
+        """Concurrency and queue depth, to register with TurnMetrics."""
+        return [
+            Gauge("bot_admission_active", "Requests being processed.", lambda: self.active),
+            Gauge("bot_admission_limit", "Maximum requests processed at once.", lambda: self.max_concurrency),
+            Gauge("bot_admission_queue_depth", "Requests waiting for a processing slot.", lambda: self.queue_depth),
+            self.shed,
+        ]
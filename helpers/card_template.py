@@ -0,0 +1,105 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""Adaptive card templates loaded once and rendered without JSON round trips."""
+import json
+import os
+import re
+from typing import Callable, Dict, FrozenSet, Optional
+
+from botbuilder.schema import Attachment
+
+ADAPTIVE_CARD_CONTENT_TYPE = "application/vnd.microsoft.card.adaptive"
+SLOT_PATTERN = re.compile(r"\$\{([^{}]+)\}")
+
+# Renders a compiled node of the card for the given slot values.
+_Renderer = Callable[[Dict[str, object]], object]
+
+
+def _compile_text(text: str) -> Optional[_Renderer]:
+    pieces = SLOT_PATTERN.split(text)
+    if len(pieces) == 1:
+        return None
+
+    # split() alternates literal text and slot names: literals at even indexes, slots at odd ones.
+    literals = pieces[0::2]
+    slots = pieces[1::2]
+
+    def render(data: Dict[str, object]) -> str:
+        parts = [literals[0]]
+        for slot, literal in zip(slots, literals[1:]):
+            # Unknown slots are left as written, like the former string replacement did.
+            parts.append(str(data[slot]) if slot in data else "${" + slot + "}")
+            parts.append(literal)
+        return "".join(parts)
+
+    return render
+
+
+def _compile(node: object) -> Optional[_Renderer]:
+    """Renderer of `node`, or None when it holds no slot and can be shared as is."""
+    if isinstance(node, str):
+        return _compile_text(node)
+
+    if isinstance(node, dict):
+        renderers = {key: renderer for key, renderer in ((k, _compile(v)) for k, v in node.items()) if renderer}
+        if not renderers:
+            return None
+
+        def render_dict(data: Dict[str, object]) -> dict:
+            rendered = dict(node)
+            for key, renderer in renderers.items():
+                rendered[key] = renderer(data)
+            return rendered
+
+        return render_dict
+
+    if isinstance(node, list):
+        renderers = [(index, _compile(item)) for index, item in enumerate(node)]
+        renderers = [(index, renderer) for index, renderer in renderers if renderer]
+        if not renderers:
+            return None
+
+        def render_list(data: Dict[str, object]) -> list:
+            rendered = list(node)
+            for index, renderer in renderers:
+                rendered[index] = renderer(data)
+            return rendered
+
+        return render_list
+
+    return None
+
+
+class CardTemplate:
+    """
+    Adaptive card with `${slot}` placeholders, compiled once into a render plan.
+
+    Rendering only copies the containers on the path to a slot; static parts of the card are shared between
+    renders, so rendered cards must be treated as read-only. Values are inserted into the card's strings,
+    not into JSON text, so quotes, backslashes or newlines in them need no escaping.
+    """
+
+    _cache: Dict[str, "CardTemplate"] = {}
+
+    def __init__(self, card: dict):
+        self.card = card
+        self.slots: FrozenSet[str] = frozenset(SLOT_PATTERN.findall(json.dumps(card)))
+        self._render = _compile(card)
+
+    @classmethod
+    def load(cls, path: str) -> "CardTemplate":
+        """Template of the card file at `path`, read and compiled on first use only."""
+        path = os.path.abspath(path)
+        template = cls._cache.get(path)
+        if template is None:
+            with open(path, encoding="utf-8") as card_file:
+                template = cls._cache[path] = cls(json.load(card_file))
+        return template
+
+    def render(self, data: Dict[str, object] = None) -> dict:
+        if self._render is None:
+            return self.card
+        return self._render(data or {})
+
+    def create_attachment(self, data: Dict[str, object] = None) -> Attachment:
+        return Attachment(content_type=ADAPTIVE_CARD_CONTENT_TYPE, content=self.render(data))
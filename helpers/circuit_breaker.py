@@ -0,0 +1,96 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""Circuit breaker skipping a failing dependency for a while instead of waiting on it every turn."""
+import time
+from typing import Callable, Dict, List, Optional
+
+from .metrics import Counter, Gauge
+
+
+class CircuitBreaker:
+    """
+    Consecutive failure counter of calls to a dependency.
+
+    The circuit opens after `failure_threshold` consecutive failures: allow() then refuses calls for `reset_timeout`
+    seconds. After that a single probe call is allowed (half-open), and one more every `reset_timeout` seconds
+    while no probe succeeded. A success closes the circuit, a failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+            self,
+            name: str,
+            failure_threshold: int = 5,
+            reset_timeout: float = 30.0,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        if failure_threshold < 1:
+            raise ValueError("[CircuitBreaker]: failure_threshold must be at least 1")
+
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+        self.rejected = 0
+        self.transitions = Counter(
+            f"bot_{name}_circuit_transitions_total", f"State changes of the {name} circuit breaker.", ["state"]
+        )
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        return self.HALF_OPEN if self._probing else self.OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go to the dependency now."""
+        if self._opened_at is None:
+            return True
+
+        now = self._clock()
+        if now - self._opened_at >= self.reset_timeout:
+            # Probe, and allow the next one only after another reset_timeout if this one never reports back.
+            self._opened_at = now
+            self._probing = True
+            self.transitions.inc(self.HALF_OPEN)
+            return True
+
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self._opened_at is not None:
+            self._opened_at = None
+            self._probing = False
+            self.transitions.inc(self.CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probing or (self._opened_at is None and self._failures >= self.failure_threshold):
+            self._opened_at = self._clock()
+            self._probing = False
+            self.transitions.inc(self.OPEN)
+
+    def stats(self) -> Dict[str, object]:
+        return {"state": self.state, "consecutive_failures": self._failures, "rejected": self.rejected}
+
+    def metrics(self) -> List[object]:
+        """Breaker state, to register with TurnMetrics."""
+        return [
+            Gauge(
+                f"bot_{self.name}_circuit_open",
+                f"1 while calls to {self.name} are skipped (circuit open or half-open), 0 otherwise.",
+                lambda: 0 if self.state == self.CLOSED else 1,
+            ),
+            Gauge(f"bot_{self.name}_circuit_rejected", f"Calls to {self.name} skipped by the breaker.",
+                  lambda: self.rejected),
+            self.transitions,
+        ]
@@ -0,0 +1,123 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""City names matched locally, to answer the origin/destination prompts without a LUIS round trip."""
+import re
+import unicodedata
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+# Words before an ambiguous name ("nice", "phoenix") telling it is a place.
+PLACE_CUES = frozenset(["to", "from", "in", "at", "via", "visit", "visiting", "leaving", "fly", "flying"])
+SENTENCE_ENDS = frozenset([".", "!", "?"])
+# Prefix of the ambiguous names in a names file.
+AMBIGUOUS_MARK = "~"
+# Trie node key marking the end of a name.
+_END = ""
+
+
+def fold(text: str) -> str:
+    """Case and diacritic insensitive form of `text`: "Zürich" and "ZURICH" both give "zurich"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+class GazetteerMatch(NamedTuple):
+    start: int
+    end: int
+    text: str
+    name: str
+
+
+class Gazetteer:
+    """
+    Trie of folded name tokens, scanned leftmost-longest over the tokens of a text.
+
+    Names are matched on token boundaries only ("rome" is found in "to Rome!", not in "romeo"), in time linear in
+    the length of the text for names of a few tokens. Ambiguous names, also common words, are only matched after
+    a word such as "to" or "from" ("fly to nice") or capitalized within a sentence ("we love Nice in May").
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._root: Dict[str, dict] = {}
+        self._size = 0
+        for name in names:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, name: str) -> bool:
+        node = self._root
+        for token in self._tokens(name):
+            node = node.get(token)
+            if node is None:
+                return False
+        return _END in node
+
+    @staticmethod
+    def _tokens(text: str) -> List[str]:
+        return [fold(token) for token in TOKEN_PATTERN.findall(text)]
+
+    def add(self, name: str, ambiguous: bool = False) -> None:
+        tokens = self._tokens(name)
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        if _END not in node:
+            self._size += 1
+            node[_END] = (name.strip(), ambiguous)
+
+    def load(self, path: str) -> "Gazetteer":
+        """
+        Add the names of a text file, one per line, blank lines and # comments ignored. Ambiguous names are
+        marked with a leading ~.
+        """
+        with open(path, encoding="utf-8") as names_file:
+            for line in names_file:
+                name = line.split("#", 1)[0].strip()
+                if name.startswith(AMBIGUOUS_MARK):
+                    self.add(name[len(AMBIGUOUS_MARK):], ambiguous=True)
+                elif name:
+                    self.add(name)
+        return self
+
+    @staticmethod
+    def _in_context(text: str, tokens: List[Tuple[str, int, int]], position: int) -> bool:
+        """Whether the ambiguous name starting at tokens[position] is used as a place name."""
+        previous = tokens[position - 1][0] if position > 0 else None
+        if previous in PLACE_CUES:
+            return True
+        starts_sentence = previous is None or previous in SENTENCE_ENDS
+        return text[tokens[position][1]].isupper() and not starts_sentence
+
+    def find_all(self, text: str) -> List[GazetteerMatch]:
+        tokens = [(fold(match.group()), match.start(), match.end()) for match in TOKEN_PATTERN.finditer(text)]
+        matches = []
+        position = 0
+        while position < len(tokens):
+            node = self._root
+            longest = None
+            for index in range(position, len(tokens)):
+                node = node.get(tokens[index][0])
+                if node is None:
+                    break
+                if _END in node:
+                    name, ambiguous = node[_END]
+                    if not ambiguous or self._in_context(text, tokens, position):
+                        longest = (index, name)
+
+            if longest is None:
+                position += 1
+                continue
+            last, name = longest
+            start, end = tokens[position][1], tokens[last][2]
+            matches.append(GazetteerMatch(start, end, text[start:end], name))
+            position = last + 1
+        return matches
+
+    def match(self, text: str) -> Optional[GazetteerMatch]:
+        """First name found in `text`, if any."""
+        matches = self.find_all(text)
+        return matches[0] if matches else None
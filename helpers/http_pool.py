@@ -0,0 +1,150 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""Connection pool shared by the outbound HTTP traffic of the bot (LUIS predictions, Bot Connector replies)."""
+from contextlib import asynccontextmanager
+from typing import Any, List, Optional
+
+import aiohttp
+import requests
+from msrest.pipeline import AsyncPipeline, SansIOHTTPPolicy
+from msrest.pipeline.aiohttp import AioHTTPSender
+from msrest.pipeline.universal import RawDeserializer
+from msrest.universal_http import AsyncHTTPSender, ClientRequest
+from msrest.universal_http.aiohttp import AioHttpClientResponse
+
+from .metrics import Counter, Gauge
+
+
+class HttpPool:
+    """
+    One long-lived aiohttp session whose keep-alive connections are reused across turns.
+
+    `limit` bounds the open connections (`limit_per_host` per host, 0 for no bound), idle connections are kept
+    `keepalive_timeout` seconds and host names resolved once every `dns_cache_ttl` seconds. The session is opened
+    by start(), or on first use, and must be closed with close().
+    """
+
+    def __init__(
+            self,
+            limit: int = 100,
+            limit_per_host: int = 0,
+            keepalive_timeout: float = 30.0,
+            dns_cache_ttl: int = 300,
+            timeout: float = 100.0,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Requests sent with request() and not released yet, each holding (or waiting for) a connection.
+        self._in_use = 0
+        self.requests = Counter(
+            "bot_http_requests_total", "Outbound HTTP requests, by connection reuse.", ["connection"]
+        )
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[trace_config],
+        )
+
+    async def _on_connection_created(self, session, context, params) -> None:
+        self.requests.inc("new")
+
+    async def _on_connection_reused(self, session, context, params) -> None:
+        self.requests.inc("reused")
+
+    async def start(self) -> None:
+        self.session  # pylint: disable=pointless-statement
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs: Any):
+        """session.request(), counted in in_use() until the response is released."""
+        self._in_use += 1
+        try:
+            async with self.session.request(method, url, **kwargs) as response:
+                yield response
+        finally:
+            self._in_use -= 1
+
+    def in_use(self) -> int:
+        return self._in_use
+
+    def metrics(self) -> List[object]:
+        """Pool utilisation, to register with TurnMetrics."""
+        return [
+            Gauge("bot_http_pool_limit", "Maximum open outbound HTTP connections, 0 for no bound.", lambda: self.limit),
+            Gauge(
+                "bot_http_pool_in_use", "Outbound HTTP requests holding or waiting for a connection.", self.in_use
+            ),
+            self.requests,
+        ]
+
+    def create_pipeline(self, config: Any) -> AsyncPipeline:
+        """msrest pipeline sending the requests of an async client (e.g. ConnectorClient) through the pool."""
+        policies = [config.user_agent_policy, RawDeserializer(), config.http_logger_policy]
+        if config.credentials:
+            policies.insert(1, _CredentialsPolicy(config.credentials))
+        return PooledPipeline(policies, AioHTTPSender(_PooledDriver(self)))
+
+
+class PooledPipeline(AsyncPipeline):
+    """Pipeline of a client whose requests go through an HttpPool."""
+
+
+class _CredentialsPolicy(SansIOHTTPPolicy):
+    """Authorization header of msrest credentials, which only know how to sign a requests.Session."""
+
+    def __init__(self, credentials):
+        self._credentials = credentials
+        # Without the default headers of requests: only the ones set by the credentials are copied.
+        self._session = requests.Session()
+        self._session.headers.clear()
+
+    def on_request(self, request, **kwargs) -> None:
+        request.http_request.headers.update(self._credentials.signed_session(self._session).headers)
+
+
+class _PooledDriver(AsyncHTTPSender):
+    def __init__(self, pool: HttpPool):
+        self._pool = pool
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_details):
+        # The pool outlives the clients, see HttpPool.close().
+        pass
+
+    async def send(self, request: ClientRequest, **config: Any) -> AioHttpClientResponse:
+        async with self._pool.request(
+                request.method, request.url, headers=request.headers, data=request.data
+        ) as pooled_response:
+            response = AioHttpClientResponse(request, pooled_response)
+            await response.load_body()
+        return response
@@ -0,0 +1,75 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""Components built on first use, or ahead of it by a warm-up once the app serves."""
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Generic, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+_UNSET = object()
+
+
+class Lazy(Generic[T]):
+    """
+    Value of `factory`, built on the first get().
+
+    Factories get() the components they depend on, so these are built first. Builds are serialized per component:
+    a caller asking for a component the warm-up thread is building waits for it instead of building it again.
+    Coroutines use get_async(), which waits off the event loop.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        self.name = name
+        self._factory = factory
+        self._lock = threading.RLock()
+        self._value = _UNSET
+        self._pending: Optional[asyncio.Future] = None
+        # Seconds spent in get() building the value, the dependencies it built included.
+        self.build_time: Optional[float] = None
+
+    @property
+    def is_built(self) -> bool:
+        return self._value is not _UNSET
+
+    def get(self) -> T:
+        if self._value is _UNSET:
+            with self._lock:
+                if self._value is _UNSET:
+                    start = time.perf_counter()
+                    value = self._factory()
+                    self.build_time = time.perf_counter() - start
+                    self._value = value
+        return self._value
+
+    async def get_async(self) -> T:
+        """get() from the default executor: the event loop keeps serving while the value is being built."""
+        if self._value is not _UNSET:
+            return self._value
+
+        # Concurrent callers share one executor thread, blocked on the lock if the warm-up is building the value.
+        if self._pending is None:
+            self._pending = asyncio.ensure_future(asyncio.get_event_loop().run_in_executor(None, self.get))
+            self._pending.add_done_callback(self._build_done)
+        return await asyncio.shield(self._pending)
+
+    def _build_done(self, future: asyncio.Future) -> None:
+        # A failed build is retried by the next caller.
+        self._pending = None
+        if not future.cancelled():
+            future.exception()
+
+
+def build_all(components: Iterable[Lazy]) -> Dict[str, float]:
+    """Build `components` in order, returning the build time of each."""
+    times = {}
+    for component in components:
+        already_built = component.is_built
+        component.get()
+        times[component.name] = 0.0 if already_built else component.build_time
+    return times
+
+
+async def warm_up(components: Iterable[Lazy]) -> Dict[str, float]:
+    """build_all in the default executor, leaving the event loop free to accept and serve requests meanwhile."""
+    return await asyncio.get_event_loop().run_in_executor(None, build_all, list(components))
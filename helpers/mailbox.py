@@ -0,0 +1,82 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""Per-conversation mailboxes running the turns of a conversation one at a time."""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Hashable, List
+
+from .metrics import Counter, Gauge
+
+
+class MailboxFull(Exception):
+    """Raised by ConversationMailboxes.turn when too many turns of the conversation are waiting already."""
+
+
+class _Mailbox:
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        # Turns running or waiting in this mailbox.
+        self.users = 0
+
+
+class ConversationMailboxes:
+    """
+    A FIFO lock per conversation: turns of the same conversation run in arrival order, one at a time, so that each
+    one loads the state the previous one saved. Turns of different conversations don't wait for each other.
+
+    A turn finding `max_waiting` turns of its conversation already waiting (0 for no limit) is rejected with
+    MailboxFull, so that a conversation retrying or flooding the bot only queues behind itself.
+
+    A mailbox only exists while a turn of its conversation is running or waiting. Mailboxes are per process: with
+    several workers (see workers.py), turns of a conversation handled by different workers aren't ordered.
+    """
+
+    def __init__(self, max_waiting: int = 0):
+        if max_waiting < 0:
+            raise ValueError("[ConversationMailboxes]: max_waiting must be non-negative")
+
+        self.max_waiting = max_waiting
+        self._mailboxes: Dict[Hashable, _Mailbox] = {}
+        self.waited = Counter(
+            "bot_conversation_turns_waited_total", "Turns that waited for a previous turn of their conversation."
+        )
+        self.rejected = Counter(
+            "bot_conversation_turns_rejected_total", "Turns rejected because their conversation's mailbox was full."
+        )
+
+    def __len__(self) -> int:
+        return len(self._mailboxes)
+
+    @asynccontextmanager
+    async def turn(self, conversation_key: Hashable):
+        """Run the enclosed block after the blocks entered before for the same conversation."""
+        mailbox = self._mailboxes.get(conversation_key)
+        if mailbox is None:
+            mailbox = self._mailboxes[conversation_key] = _Mailbox()
+        else:
+            # One of the users is running, the others are waiting.
+            if self.max_waiting and mailbox.users - 1 >= self.max_waiting:
+                self.rejected.inc()
+                raise MailboxFull(
+                    f"[ConversationMailboxes]: {mailbox.users - 1} turns of {conversation_key!r} already waiting"
+                )
+            self.waited.inc()
+        mailbox.users += 1
+
+        try:
+            async with mailbox.lock:
+                yield
+        finally:
+            mailbox.users -= 1
+            if mailbox.users == 0:
+                del self._mailboxes[conversation_key]
+
+    def metrics(self) -> List[object]:
+        """Mailbox counters, to register with TurnMetrics."""
+        return [
+            Gauge("bot_conversation_mailboxes", "Conversations with a turn running or waiting.", lambda: len(self)),
+            self.waited,
+            self.rejected,
+        ]
@@ -0,0 +1,204 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""In-process metrics rendered in the Prometheus text exposition format."""
+import bisect
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+# Seconds; turn phases range from sub-millisecond state reads to multi-second LUIS calls.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ACTIVE_CONVERSATION_WINDOW = 300.0
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally split by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def samples(self) -> Iterator[str]:
+        for label_values, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}"
+
+
+class Gauge:
+    """Value sampled when the metrics are rendered."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self._read = read
+
+    def samples(self) -> Iterator[str]:
+        yield f"{self.name} {_format_value(self._read())}"
+
+
+class SampledCounter(Gauge):
+    """Counter kept by someone else (e.g. functools.lru_cache statistics), read when the metrics are rendered."""
+
+    kind = "counter"
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets, optionally split by label values."""
+
+    kind = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            label_names: Sequence[str] = (),
+            buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: [bucket counts (non-cumulative, last one is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> Iterator[str]:
+        for label_values, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.label_names, label_values, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.label_names, label_values)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class ActiveConversations:
+    """
+    Conversations that had a turn within the last `window` seconds.
+
+    Expired conversations are dropped on every touch and count, so memory stays bounded by the conversations of the
+    window even when /metrics is never scraped.
+    """
+
+    def __init__(self, window: float = ACTIVE_CONVERSATION_WINDOW, clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self._clock = clock
+        # Ordered by last activity, oldest first: the expired conversations are at the head.
+        self._last_seen: Dict[str, float] = OrderedDict()
+
+    def touch(self, conversation_id: str) -> None:
+        now = self._clock()
+        self._last_seen[conversation_id] = now
+        self._last_seen.move_to_end(conversation_id)
+        self._prune(now)
+
+    def count(self) -> int:
+        self._prune(self._clock())
+        return len(self._last_seen)
+
+    def _prune(self, now: float) -> None:
+        expired_before = now - self.window
+        while self._last_seen and next(iter(self._last_seen.values())) < expired_before:
+            self._last_seen.popitem(last=False)
+
+
+class TurnMetrics:
+    """Per-phase turn timings, intent counters and active conversations of the bot."""
+
+    PARSE = "request_parse"
+    DESERIALIZE = "deserialize"
+    STATE_LOAD = "state_load"
+    RECOGNIZE = "recognize"
+    DIALOG = "dialog"
+    SEND = "send_activities"
+    SAVE = "save_changes"
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self.phase_seconds = Histogram(
+            "bot_turn_phase_seconds", "Time spent in each phase of a turn.", ["phase"]
+        )
+        self.intents = Counter("bot_intents_total", "Recognized top intents.", ["intent"])
+        self.turns = Counter("bot_turns_total", "Activities processed, by activity type.", ["type"])
+        self.active_conversations = ActiveConversations()
+        self._metrics: List[object] = [
+            self.phase_seconds,
+            self.intents,
+            self.turns,
+            Gauge(
+                "bot_active_conversations",
+                f"Conversations with a turn in the last {ACTIVE_CONVERSATION_WINDOW:g} seconds.",
+                self.active_conversations.count,
+            ),
+        ]
+
+    @contextmanager
+    def time(self, phase: str):
+        """Record the duration of the enclosed block under `phase`, exceptions included."""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.phase_seconds.observe(self._clock() - start, phase)
+
+    def register(self, *metrics: object) -> None:
+        """Render other components' metrics (e.g. the HTTP pool's) along with the turn metrics."""
+        self._metrics.extend(metrics)
+
+    def track_activity(self, activity_type: str, conversation_id: str) -> None:
+        self.turns.inc(activity_type or "unknown")
+        if conversation_id:
+            self.active_conversations.touch(conversation_id)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Shared by the app, the bot, the adapter and the recognizer.
+METRICS = TurnMetrics()
@@ -0,0 +1,63 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""Turn-scoped buffer holding the activities sent during a turn until the turn ends."""
+from contextlib import contextmanager
+from typing import List, Optional, Union
+
+from botbuilder.core import TurnContext
+from botbuilder.schema import Activity, ResourceResponse
+
+
+class OutboundBuffer:
+    """
+    Activities sent during a turn, in order, held by the adapter until the end of the turn and then sent in a
+    single `send_activities` batch (see AdapterWithErrorHandler).
+
+    Held activities are answered with empty ResourceResponses: their ids are only known once they are sent.
+    Use send_immediately() for the messages that can't wait for the end of the turn.
+    """
+
+    KEY = "OutboundBuffer"
+
+    def __init__(self):
+        self.activities: List[Activity] = []
+        self._immediate = 0
+
+    @staticmethod
+    def get(turn_context: TurnContext) -> Optional["OutboundBuffer"]:
+        return turn_context.turn_state.get(OutboundBuffer.KEY)
+
+    @property
+    def is_holding(self) -> bool:
+        return self._immediate == 0
+
+    def hold(self, activities: List[Activity]) -> List[ResourceResponse]:
+        self.activities.extend(activities)
+        return [ResourceResponse() for _ in activities]
+
+    def take(self) -> List[Activity]:
+        activities, self.activities = self.activities, []
+        return activities
+
+    @contextmanager
+    def immediate(self):
+        """Send the activities of the enclosed block right away, after the ones held so far."""
+        self._immediate += 1
+        try:
+            yield self
+        finally:
+            self._immediate -= 1
+
+
+async def send_immediately(
+        turn_context: TurnContext,
+        activity_or_text: Union[Activity, str],
+        speak: str = None,
+        input_hint: str = None,
+) -> ResourceResponse:
+    """TurnContext.send_activity bypassing the turn's OutboundBuffer, if any."""
+    buffer = OutboundBuffer.get(turn_context)
+    if buffer is None:
+        return await turn_context.send_activity(activity_or_text, speak, input_hint)
+    with buffer.immediate():
+        return await turn_context.send_activity(activity_or_text, speak, input_hint)
@@ -0,0 +1,155 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""
+Local parsers for the budget and traveller count prompts.
+
+They only recognize the unambiguous forms ("100€", "$1,500", "500 dollars", "one bitcoin", "2", "twenty one") and
+answer like the current path (LUIS money entities, recognizers-text numbers); anything else is a miss and is left to
+LUIS or recognizers-text.
+"""
+import re
+from decimal import Decimal
+from typing import Optional, Tuple, Union
+
+SMALL_NUMBERS = {
+    word: value for value, word in enumerate(
+        "zero one two three four five six seven eight nine ten eleven twelve thirteen fourteen fifteen sixteen "
+        "seventeen eighteen nineteen".split()
+    )
+}
+TENS = {word: value * 10 for value, word in enumerate("twenty thirty forty fifty sixty seventy eighty ninety".split(), 2)}
+SCALES = {"thousand": 10 ** 3, "million": 10 ** 6, "billion": 10 ** 9}
+HUNDRED = "hundred"
+
+# Unit names as resolved by LUIS (and the recognizers-text currency model it is built on).
+CURRENCIES = {
+    "Euro": ["€", "eur", "euro", "euros"],
+    "Dollar": ["$", "dollar", "dollars", "buck", "bucks"],
+    "United States dollar": ["usd", "us dollar", "us dollars"],
+    "Pound": ["£", "pound", "pounds", "quid"],
+    "British pound": ["gbp", "british pound", "british pounds"],
+    "Japanese yen": ["¥", "yen", "jpy"],
+    "Canadian dollar": ["cad", "canadian dollar", "canadian dollars"],
+    "Australian dollar": ["aud", "australian dollar", "australian dollars"],
+    "Swiss franc": ["chf", "swiss franc", "swiss francs"],
+    "Franc": ["franc", "francs"],
+    "Bitcoin": ["₿", "btc", "bitcoin", "bitcoins"],
+    "Indian rupee": ["inr"],
+    "Rupee": ["rupee", "rupees"],
+    "Chinese yuan": ["yuan", "rmb", "cny"],
+    "Mexican peso": ["mxn"],
+    "Peso": ["peso", "pesos"],
+    "Brazilian real": ["brl"],
+    "Ruble": ["ruble", "rubles"],
+}
+CURRENCY_UNITS = {name: unit for unit, names in CURRENCIES.items() for name in names}
+CURRENCY_SYMBOLS = [name for name in CURRENCY_UNITS if not name[0].isalpha()]
+
+
+def _alternation(words) -> str:
+    # Longest first, so that "us dollars" wins over "dollars".
+    return "|".join(re.escape(word).replace(r"\ ", r"\s+") for word in sorted(words, key=len, reverse=True))
+
+
+_NUMBER_WORD = _alternation(list(SMALL_NUMBERS) + list(TENS) + list(SCALES) + [HUNDRED])
+_DIGITS = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+_MORE_WORDS = rf"(?:(?:\s+and\s+|[\s-]+)(?:{_NUMBER_WORD}))*\b"
+_SCALE_WORDS = rf"\b(?:{_alternation(list(SCALES) + [HUNDRED])}){_MORE_WORDS}"
+# Word runs start below a hundred or with "a" ("a hundred and five"): a bare "thousand" is "another thousand" or "the
+# million dollar question". A lone
+# "one" is a pronoun after a determiner ("this one", "which one") or before "last"/"more" ("one last try"), and a run
+# followed by an ordinal ("twenty fourth") is a date.
+_ONE = r"(?<!this\s)(?<!that\s)(?<!which\s)(?<!the\s)(?<!any\s)(?<!each\s)one(?!\s+(?:last|more|of)\b)"
+_WORDS = (
+    rf"\b(?:a\s+{_SCALE_WORDS}|{_ONE}|(?!one\b)(?:{_alternation(list(SMALL_NUMBERS) + list(TENS))})){_MORE_WORDS}"
+    r"(?![\s-]+(?:first|second|third|\w+th)\b)"
+)
+# A whole number: digits, words or both ("2k", "23 hundred", "1.5 million"). Digits must stand alone: not part of
+# "2nd", "v2" or "8/31".
+NUMBER_PATTERN = re.compile(
+    rf"(?<![\w/])(?<!\d[.,])(?:(?P<digits>{_DIGITS})(?:(?P<k>k)\b|(?![\w/]|[.,]\d)(?:[\s-]+(?P<scale_words>"
+    rf"{_SCALE_WORDS}))?)|(?P<words>{_WORDS}))",
+    re.I,
+)
+# Currency right before ("$300", "€ 75") or after ("100€", "500 dollars", "2k usd") a number. Amounts followed by
+# more digits ("10 euros 50") are left to LUIS.
+# Fractions ("two and a half weeks", "half dozen") are left to recognizers-text.
+FRACTION_PATTERN = re.compile(r"\b(?:half|halves|quarters?|dozens?)\b", re.I)
+CURRENCY_BEFORE_PATTERN = re.compile(rf"(?:^|[^\w])(?P<currency>{_alternation(CURRENCY_SYMBOLS)})\s*$")
+CURRENCY_AFTER_PATTERN = re.compile(
+    rf"\s*(?P<currency>{_alternation(CURRENCY_UNITS)})(?!\w)(?!\s*[.,]?\d)", re.I
+)
+
+
+def _words_value(words: str, current: Decimal = Decimal(0)) -> Optional[Decimal]:
+    """Value of a run of number words, after `current` if digits came first; None when they don't form one number."""
+    total = Decimal(0)
+    previous = "digits" if current else None
+    for word in re.split(r"\s+and\s+|[\s-]+", words.lower()):
+        if word in SMALL_NUMBERS:
+            value = SMALL_NUMBERS[word]
+            if previous in ("digits", "small", "teen") or (previous == "tens" and value >= 10):
+                return None
+            current += value
+            previous = "teen" if value >= 10 else "small"
+        elif word in TENS:
+            if previous in ("digits", "small", "teen", "tens"):
+                return None
+            current += TENS[word]
+            previous = "tens"
+        elif word == HUNDRED:
+            if previous == HUNDRED or current >= 100:
+                return None
+            current = (current or 1) * 100
+            previous = HUNDRED
+        else:
+            total += (current or 1) * SCALES[word]
+            current = Decimal(0)
+            previous = "scale"
+    return total + current
+
+
+def _number_value(match) -> Optional[Decimal]:
+    if match.group("digits"):
+        value = Decimal(match.group("digits").replace(",", ""))
+        if match.group("k"):
+            return value * 1000
+        scale_words = match.group("scale_words")
+        return _words_value(scale_words, value) if scale_words else value
+    return _words_value(re.sub(r"^a\s+", "", match.group("words"), flags=re.I))
+
+
+def parse_number(text: str) -> Optional[Decimal]:
+    """First cardinal number of `text`, as NumberPrompt resolves it."""
+    text = text or ""
+    if FRACTION_PATTERN.search(text):
+        return None
+    match = NUMBER_PATTERN.search(text)
+    return _number_value(match) if match is not None else None
+
+
+def parse_money(text: str) -> Optional[Tuple[Union[int, float], str]]:
+    """First amount of money of `text` as a LUIS money entity: (number, units)."""
+    text = text or ""
+    if FRACTION_PATTERN.search(text):
+        return None
+    for match in NUMBER_PATTERN.finditer(text):
+        amount = _number_value(match)
+        if amount is None:
+            continue
+
+        after = CURRENCY_AFTER_PATTERN.match(text, match.end())
+        before = CURRENCY_BEFORE_PATTERN.search(text, 0, match.start()) if after is None else None
+        if after is None and before is None:
+            continue
+        currency = (after or before).group("currency")
+
+        # LUIS answers integral amounts as JSON integers.
+        number = int(amount) if amount == amount.to_integral_value() else float(amount)
+        return number, CURRENCY_UNITS[" ".join(currency.lower().split())]
+    return None
+
+
+def format_money(number: Union[int, float], units: str) -> str:
+    """Budget as stored in BookingDetails, like LuisHelper formats LUIS money entities."""
+    return f"{number} {units}"
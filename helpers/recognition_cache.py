@@ -0,0 +1,87 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""In-process LRU + TTL cache for recognizer results."""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+
+def normalize_utterance(text: str) -> str:
+    """Normalize an utterance so that trivially different inputs share a cache entry."""
+    return " ".join(text.split()).casefold()
+
+
+class RecognitionCache:
+    """Bounded LRU cache with time-to-live and stale-while-revalidate windows.
+
+    An entry is fresh for `ttl` seconds after it was stored. For the following
+    `stale_ttl` seconds it is still served, but flagged as stale so the caller
+    can refresh it in the background. After that it is dropped.
+    """
+
+    def __init__(
+            self,
+            max_entries: int = 1024,
+            ttl: float = 3600.0,
+            stale_ttl: float = 0.0,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries <= 0:
+            raise ValueError("[RecognitionCache]: max_entries must be positive")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Tuple[object, bool]]:
+        """Return `(value, is_stale)` for a cached key, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        stored_at, value = entry
+        age = self._clock() - stored_at
+        if age > self.ttl + self.stale_ttl:
+            del self._entries[key]
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if age > self.ttl:
+            self.stale_hits += 1
+            return value, True
+
+        self.hits += 1
+        return value, False
+
+    def put(self, key: Hashable, value: object) -> None:
+        self._entries[key] = (self._clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
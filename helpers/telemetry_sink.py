@@ -0,0 +1,155 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""Telemetry client buffering records and delivering them in batches off the event loop."""
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, List, Optional
+
+from botbuilder.core import BotTelemetryClient, NullTelemetryClient
+
+from .metrics import Counter, Gauge
+
+
+class TelemetryRecord:
+    """One deferred call to the telemetry backend, e.g. a dialog step log sent with track_trace."""
+
+    __slots__ = ("method", "args", "kwargs", "timestamp")
+
+    def __init__(self, method: str, args: tuple, kwargs: dict):
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.timestamp = time.time()
+
+
+class BufferedTelemetryClient(BotTelemetryClient):
+    """
+    BotTelemetryClient recording calls in a bounded ring buffer instead of sending them inline.
+
+    A background task hands batches of up to `batch_size` records to `telemetry_client` every `flush_interval`
+    seconds (or as soon as a batch is full) on a dedicated thread, so slow or synchronous backends never block
+    a turn. When the buffer is full the oldest records are dropped.
+    """
+
+    def __init__(
+            self,
+            telemetry_client: BotTelemetryClient,
+            capacity: int = 1024,
+            batch_size: int = 100,
+            flush_interval: float = 1.0,
+    ):
+        if capacity < 1 or batch_size < 1:
+            raise Exception("[BufferedTelemetryClient]: capacity and batch_size must be at least 1")
+
+        self.telemetry_client = telemetry_client or NullTelemetryClient()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: Deque[TelemetryRecord] = deque(maxlen=capacity)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="telemetry-sink")
+        self._flush_task: Optional[asyncio.Future] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.records = Counter(
+            "bot_telemetry_records_total", "Telemetry records, by outcome (delivered, dropped, failed).", ["outcome"]
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buffered": len(self._buffer),
+            **{outcome: int(self.records.value(outcome)) for outcome in ("delivered", "dropped", "failed")},
+        }
+
+    def metrics(self) -> List[object]:
+        """Buffer occupancy and delivery outcomes, to register with TurnMetrics."""
+        return [
+            Gauge(
+                "bot_telemetry_records_buffered", "Telemetry records waiting for delivery.", lambda: len(self._buffer)
+            ),
+            self.records,
+        ]
+
+    def _record(self, method: str, args: tuple, kwargs: dict) -> None:
+        if len(self._buffer) == self._buffer.maxlen:
+            self.records.inc("dropped")
+        self._buffer.append(TelemetryRecord(method, args, kwargs))
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, synchronous tests): deliver right away.
+            self._deliver(self._take_batch())
+            return
+
+        if self._flush_task is None:
+            self._wake = asyncio.Event()
+            self._flush_task = asyncio.ensure_future(self._run_flusher())
+        elif len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    def _take_batch(self) -> List[TelemetryRecord]:
+        count = min(self.batch_size, len(self._buffer))
+        return [self._buffer.popleft() for _ in range(count)]
+
+    def _deliver(self, batch: List[TelemetryRecord]) -> None:
+        for record in batch:
+            try:
+                getattr(self.telemetry_client, record.method)(*record.args, **record.kwargs)
+                self.records.inc("delivered")
+            except Exception as exception:
+                self.records.inc("failed")
+                print(f"[BufferedTelemetryClient]: {record.method} not delivered, {exception!r}")
+
+    async def _run_flusher(self) -> None:
+        loop = asyncio.get_event_loop()
+        try:
+            while self._buffer:
+                if len(self._buffer) < self.batch_size:
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wake.clear()
+
+                while self._buffer:
+                    await loop.run_in_executor(self._executor, self._deliver, self._take_batch())
+        finally:
+            self._flush_task = None
+
+    async def drain(self) -> None:
+        """Deliver every buffered record and flush the underlying client."""
+        if self._flush_task is not None:
+            self._wake.set()
+            await asyncio.shield(self._flush_task)
+        await asyncio.get_event_loop().run_in_executor(self._executor, self._flush_client)
+
+    def _flush_client(self) -> None:
+        # BotTelemetryClient doesn't declare flush, only some implementations (Application Insights) have it.
+        flush = getattr(self.telemetry_client, "flush", None)
+        if flush is not None:
+            flush()
+
+    def track_pageview(self, *args, **kwargs) -> None:
+        self._record("track_pageview", args, kwargs)
+
+    def track_exception(self, *args, **kwargs) -> None:
+        self._record("track_exception", args, kwargs)
+
+    def track_event(self, *args, **kwargs) -> None:
+        self._record("track_event", args, kwargs)
+
+    def track_metric(self, *args, **kwargs) -> None:
+        self._record("track_metric", args, kwargs)
+
+    def track_trace(self, *args, **kwargs) -> None:
+        self._record("track_trace", args, kwargs)
+
+    def track_request(self, *args, **kwargs) -> None:
+        self._record("track_request", args, kwargs)
+
+    def track_dependency(self, *args, **kwargs) -> None:
+        self._record("track_dependency", args, kwargs)
+
+    def flush(self) -> None:
+        # Records still buffered are delivered by the background task, see drain().
+        self._executor.submit(self._flush_client)
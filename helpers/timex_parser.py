@@ -0,0 +1,77 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""Memoized parsing of the timex strings checked by the date steps."""
+import datetime
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, NamedTuple, Optional
+
+from datatypes_date_time.timex import Timex
+
+from .metrics import Gauge, SampledCounter
+
+
+class ParsedTimex(NamedTuple):
+    """What the booking steps need to know about a timex, parsed once."""
+
+    timex: str
+    types: FrozenSet[str]
+    # Date part ("2023-02-10" of "2023-02-10T08"), None when it isn't a full calendar date.
+    date: Optional[datetime.date]
+
+    @property
+    def definite(self) -> bool:
+        return "definite" in self.types
+
+
+def _parse(timex: str) -> ParsedTimex:
+    try:
+        date = datetime.datetime.strptime(timex.split("T")[0], "%Y-%m-%d").date()
+    except ValueError:
+        date = None
+    return ParsedTimex(timex, frozenset(Timex(timex).types), date)
+
+
+class TimexParser:
+    """Bounded LRU memo of ParsedTimex records, keyed by timex string."""
+
+    def __init__(self, max_entries: int = 1024):
+        if max_entries <= 0:
+            raise ValueError("[TimexParser]: max_entries must be positive")
+
+        self.max_entries = max_entries
+        self.parse = lru_cache(maxsize=max_entries)(_parse)
+        # Hits and misses counted before the last clear(), which resets the ones of lru_cache.
+        self._cleared_hits = 0
+        self._cleared_misses = 0
+
+    def clear(self) -> None:
+        info = self.parse.cache_info()
+        self._cleared_hits += info.hits
+        self._cleared_misses += info.misses
+        self.parse.cache_clear()
+
+    def stats(self) -> Dict[str, int]:
+        info = self.parse.cache_info()
+        return {
+            "entries": info.currsize,
+            "hits": self._cleared_hits + info.hits,
+            "misses": self._cleared_misses + info.misses,
+        }
+
+    def metrics(self) -> List[object]:
+        """Memo counters, to register with TurnMetrics."""
+        return [
+            Gauge("bot_timex_cache_entries", "Parsed timex strings held in memory.", lambda: self.stats()["entries"]),
+            SampledCounter(
+                "bot_timex_cache_hits_total", "Timex parses answered from memory.", lambda: self.stats()["hits"]
+            ),
+            SampledCounter("bot_timex_cache_misses_total", "Timex strings parsed.", lambda: self.stats()["misses"]),
+        ]
+
+
+# Shared by BookingDialog and DateResolverDialog.
+TIMEX_PARSER = TimexParser()
+
+
+def parse_timex(timex: str) -> ParsedTimex:
+    return TIMEX_PARSER.parse(timex)
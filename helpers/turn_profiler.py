@@ -0,0 +1,180 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""Sampling CPU profiler of selected turns, writing flame graph stacks."""
+import asyncio
+import itertools
+import os
+import re
+import signal
+import sysconfig
+import time
+from contextlib import asynccontextmanager
+from types import CodeType, FrameType
+from typing import Dict, Iterable, List, Optional, Set
+
+from .metrics import Counter, Gauge
+
+# SIGPROF and setitimer are Unix only: elsewhere no turn is profiled.
+PROFILING_SUPPORTED = hasattr(signal, "setitimer")
+
+UNSAFE_FILE_CHARACTERS = re.compile(r"[^A-Za-z0-9_.-]+")
+SITE_PACKAGES = "site-packages" + os.sep
+STDLIB = sysconfig.get_paths()["stdlib"] + os.sep
+
+
+def _short_path(filename: str) -> str:
+    index = filename.rfind(SITE_PACKAGES)
+    if index >= 0:
+        return filename[index + len(SITE_PACKAGES):]
+    if filename.startswith(STDLIB):
+        return filename[len(STDLIB):]
+    return os.path.relpath(filename) if os.path.isabs(filename) else filename
+
+
+class TurnProfiler:
+    """
+    Profiles 1 in `sample_rate` turns (0 for none) and every turn of the flagged conversations.
+
+    While a profiled turn is in progress, a SIGPROF timer interrupts the process every `interval` seconds of CPU time
+    and the interrupted stack is counted for the turn whose task is running, if any. Work a turn hands over to other
+    tasks or threads (a LUIS query shared with concurrent turns, storage commits) isn't attributed to it.
+
+    Each profile is a file of `directory` in the collapsed stack format read by flamegraph.pl, inferno or speedscope,
+    named after its start time and conversation; only the `max_files` latest ones are kept.
+    """
+
+    def __init__(self, directory: str, sample_rate: int = 0, interval: float = 0.005, max_files: int = 200):
+        if interval <= 0 or max_files < 1:
+            raise ValueError("[TurnProfiler]: interval must be positive and max_files at least 1")
+
+        self.directory = directory
+        self.sample_rate = 0
+        self.interval = interval
+        self.max_files = max_files
+        self.flagged: Set[str] = set()
+        self.update(sample_rate=sample_rate)
+
+        self._turns = 0
+        self._sequence = itertools.count()
+        self._active: Dict[asyncio.Task, Dict[str, int]] = {}
+        self._labels: Dict[CodeType, str] = {}
+        self._handler_installed = False
+        self._writes: Set[asyncio.Future] = set()
+        self.profiles = Counter("bot_turn_profiles_total", "Turn CPU profiles written.")
+
+    def update(self, sample_rate: int = None, flag: Iterable[str] = (), unflag: Iterable[str] = ()) -> None:
+        """Change the sampling at runtime: the turn sampling rate and the flagged conversation ids."""
+        if isinstance(flag, str) or isinstance(unflag, str):
+            raise ValueError("[TurnProfiler]: flag and unflag are lists of conversation ids")
+        if sample_rate is not None:
+            if not isinstance(sample_rate, int) or sample_rate < 0:
+                raise ValueError("[TurnProfiler]: sample_rate must be a non-negative integer")
+            self.sample_rate = sample_rate
+        self.flagged.update(flag)
+        self.flagged.difference_update(unflag)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "supported": PROFILING_SUPPORTED,
+            "sample_rate": self.sample_rate,
+            "interval": self.interval,
+            "flagged": sorted(self.flagged),
+            "active": len(self._active),
+            "profiles": int(self.profiles.value()),
+            "directory": os.path.abspath(self.directory),
+        }
+
+    def metrics(self) -> List[object]:
+        """Profiler counters, to register with TurnMetrics."""
+        return [
+            self.profiles,
+            Gauge("bot_turn_profiles_active", "Turns being profiled.", lambda: len(self._active)),
+        ]
+
+    def _selected(self, conversation_id: Optional[str]) -> bool:
+        if conversation_id is not None and conversation_id in self.flagged:
+            return True
+        if not self.sample_rate:
+            return False
+        self._turns += 1
+        return self._turns % self.sample_rate == 0
+
+    @asynccontextmanager
+    async def profile(self, conversation_id: Optional[str]):
+        """Profile the enclosed block of the current task if the turn is selected."""
+        task = asyncio.current_task() if PROFILING_SUPPORTED else None
+        if task is None or task in self._active or not self._selected(conversation_id):
+            yield
+            return
+
+        started_at = time.time()
+        stacks = self._active[task] = {}
+        if len(self._active) == 1:
+            self._start()
+        try:
+            yield
+        finally:
+            del self._active[task]
+            if not self._active:
+                signal.setitimer(signal.ITIMER_PROF, 0)
+            if stacks:
+                # Off the event loop, the turn doesn't wait for the file.
+                write = asyncio.get_event_loop().run_in_executor(
+                    None, self._write, started_at, conversation_id, stacks
+                )
+                self._writes.add(write)
+                write.add_done_callback(self._writes.discard)
+
+    async def drain(self) -> None:
+        """Wait for the profiles still being written."""
+        if self._writes:
+            await asyncio.gather(*self._writes)
+
+    def _start(self) -> None:
+        if not self._handler_installed:
+            # Kept once installed: a signal already raised when the timer stops must still find a handler.
+            signal.signal(signal.SIGPROF, self._sample)
+            self._handler_installed = True
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def _sample(self, signum: int, frame: Optional[FrameType]) -> None:
+        # Runs on the main thread, between two bytecodes of the interrupted frame.
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            return
+        stacks = self._active.get(task)
+        if stacks is None or frame is None:
+            return
+        stack = self._fold(frame)
+        stacks[stack] = stacks.get(stack, 0) + 1
+
+    def _fold(self, frame: FrameType) -> str:
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            labels.append(label)
+            frame = frame.f_back
+        return ";".join(reversed(labels))
+
+    def _write(self, started_at: float, conversation_id: Optional[str], stacks: Dict[str, int]) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            conversation = UNSAFE_FILE_CHARACTERS.sub("_", conversation_id or "none")[:40]
+            name = (
+                f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(started_at))}-{next(self._sequence):06d}"
+                f"-{conversation}.folded"
+            )
+            with open(os.path.join(self.directory, name), "w", encoding="utf-8") as file:
+                file.writelines(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+            self.profiles.inc()
+
+            # Names start with the time, so sorting them sorts the profiles by age.
+            profiles = sorted(name for name in os.listdir(self.directory) if name.endswith(".folded"))
+            for name in profiles[:-self.max_files]:
+                os.remove(os.path.join(self.directory, name))
+        except OSError as exception:
+            print(f"[TurnProfiler]: profile not written, {exception!r}")
@@ -0,0 +1,373 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""
+Offline intent/entity recognizer trained from the LUIS app export in cognitiveModels/FlightBooking.json.
+
+Intents are scored with a TF-IDF n-gram centroid model, cities are looked up in the spans labelled in the
+corpus and prebuilt entities (money, datetime) come from the recognizers-text models. Results are shaped like
+LuisRecognizer output so that LuisHelper and TextToLuisPrompt can consume them unchanged.
+
+Build a prebuilt artifact with:
+    python offline_recognizer.py cognitiveModels/FlightBooking.json cognitiveModels/FlightBooking.npz
+"""
+import asyncio
+import json
+import math
+import re
+import sys
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Tuple
+
+import numpy as np
+from botbuilder.core import IntentScore, Recognizer, RecognizerResult, TurnContext
+from botbuilder.schema import ActivityTypes
+from recognizers_date_time import DateTimeRecognizer
+from recognizers_number_with_unit import NumberWithUnitRecognizer
+from recognizers_text import Culture
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+DIGIT_PATTERN = re.compile(r"\d")
+DATE_WORDS = frozenset(
+    "jan january feb february mar march apr april may jun june jul july aug august sep sept september oct "
+    "october nov november dec december monday tuesday wednesday thursday friday saturday sunday today "
+    "tomorrow tonight week weekend month".split()
+)
+NUMBER_WORDS = frozenset(
+    "zero one two three four five six seven eight nine ten eleven twelve thirteen fourteen fifteen sixteen "
+    "seventeen eighteen nineteen twenty".split()
+)
+ADULT_WORDS = frozenset(["adult", "adults", "people", "persons", "passengers"])
+CHILD_WORDS = frozenset(["child", "children", "kid", "kids", "son", "sons", "daughter", "daughters"])
+ORIGIN_CUES = frozenset(["from", "leaving", "departing", "depart", "live", "living"])
+DESTINATION_CUES = frozenset(["to", "visit", "visiting", "into", "destination", "towards"])
+CITY_LABELS = ("dst_city", "or_city")
+MAX_CITY_TOKENS = 4
+WARM_UP_UTTERANCE = "Paris to Rome on the 2nd of August for 100 dollars, 2 adults and 1 child"
+
+# recognizers-text datetime and currency models of this process, see entity_models().
+_ENTITY_MODELS = None
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """Split text into lowercase tokens with their [start, end) character offsets."""
+    return [(match.group().casefold(), match.start(), match.end()) for match in TOKEN_PATTERN.finditer(text)]
+
+
+def normalized_intent(intent: str) -> str:
+    # Same normalization LuisUtil applies to intent names returned by LUIS.
+    return intent.replace(".", "_").replace(" ", "_")
+
+
+class IntentModel:
+    """TF-IDF word/character n-gram model scoring intents by cosine similarity to class centroids."""
+
+    def __init__(
+            self,
+            vocabulary: Dict[str, int],
+            idf: np.ndarray,
+            centroids: np.ndarray,
+            labels: List[str],
+            cities: Dict[str, Tuple[int, int]],
+            temperature: float = 30.0,
+    ):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.centroids = centroids
+        self.labels = labels
+        self.cities = cities
+        self.temperature = temperature
+
+    @staticmethod
+    def features(tokens: List[str]) -> List[str]:
+        words = [token for token in tokens if token.isalnum()]
+        features = ["w:" + word for word in words]
+        features += ["b:" + first + " " + second for first, second in zip(words, words[1:])]
+        for word in words:
+            padded = " " + word + " "
+            features += ["c:" + padded[i:i + 3] for i in range(len(padded) - 2)]
+        return features
+
+    @classmethod
+    def train(cls, utterances: List[dict]) -> "IntentModel":
+        documents = [Counter(cls.features([t for t, _, _ in tokenize(u["text"])])) for u in utterances]
+        labels = sorted({u["intent"] for u in utterances})
+
+        document_frequency = Counter()
+        for document in documents:
+            document_frequency.update(document.keys())
+        vocabulary = {term: index for index, term in enumerate(sorted(document_frequency))}
+        idf = np.empty(len(vocabulary), dtype=np.float32)
+        for term, index in vocabulary.items():
+            idf[index] = math.log((1 + len(documents)) / (1 + document_frequency[term])) + 1
+
+        model = cls(vocabulary, idf, np.zeros((len(labels), len(vocabulary)), dtype=np.float32), labels, {})
+        label_index = {label: index for index, label in enumerate(labels)}
+        for document, utterance in zip(documents, utterances):
+            indices, weights = model._weigh(document)
+            np.add.at(model.centroids[label_index[utterance["intent"]]], indices, weights)
+        model.centroids /= np.linalg.norm(model.centroids, axis=1, keepdims=True)
+
+        city_counts = defaultdict(lambda: [0, 0])
+        for utterance in utterances:
+            for entity in utterance.get("entities", []):
+                if entity["entity"] in CITY_LABELS:
+                    span = utterance["text"][entity["startPos"]:entity["endPos"] + 1]
+                    key = " ".join(t for t, _, _ in tokenize(span))
+                    city_counts[key][CITY_LABELS.index(entity["entity"])] += 1
+        model.cities = {city: tuple(counts) for city, counts in city_counts.items()}
+
+        return model
+
+    @classmethod
+    def from_luis_app(cls, path: str) -> "IntentModel":
+        with open(path, encoding="utf-8") as app_file:
+            return cls.train(json.load(app_file)["utterances"])
+
+    @classmethod
+    def load(cls, path: str) -> "IntentModel":
+        """Load a model from a LUIS app export (.json) or a prebuilt artifact (.npz)."""
+        if path.endswith(".json"):
+            return cls.from_luis_app(path)
+
+        with np.load(path) as artifact:
+            terms = artifact["vocabulary"].tolist()
+            cities = dict(zip(artifact["city_names"].tolist(), map(tuple, artifact["city_counts"].tolist())))
+            return cls(
+                {term: index for index, term in enumerate(terms)},
+                artifact["idf"],
+                artifact["centroids"],
+                artifact["labels"].tolist(),
+                cities,
+                float(artifact["temperature"]),
+            )
+
+    def save(self, path: str) -> None:
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        np.savez_compressed(
+            path,
+            vocabulary=np.array(terms),
+            idf=self.idf,
+            centroids=self.centroids,
+            labels=np.array(self.labels),
+            city_names=np.array(list(self.cities)),
+            city_counts=np.array(list(self.cities.values()), dtype=np.int32).reshape(-1, 2),
+            temperature=np.float32(self.temperature),
+        )
+
+    def _weigh(self, document: Counter) -> Tuple[np.ndarray, np.ndarray]:
+        known = [(self.vocabulary[term], count) for term, count in document.items() if term in self.vocabulary]
+        if not known:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        indices = np.fromiter((index for index, _ in known), dtype=np.int64, count=len(known))
+        counts = np.fromiter((count for _, count in known), dtype=np.float32, count=len(known))
+        weights = (1 + np.log(counts)) * self.idf[indices]
+        return indices, weights / np.linalg.norm(weights)
+
+    def score(self, tokens: List[str]) -> np.ndarray:
+        """Return the probability of each label for an already tokenized utterance."""
+        indices, weights = self._weigh(Counter(self.features(tokens)))
+        similarities = self.centroids[:, indices] @ weights
+        exponentials = np.exp(self.temperature * (similarities - similarities.max()))
+        return exponentials / exponentials.sum()
+
+
+def entity_models() -> tuple:
+    """The datetime and currency models, built and warmed up on first use in each process."""
+    global _ENTITY_MODELS  # pylint: disable=global-statement
+    if _ENTITY_MODELS is None:
+        _ENTITY_MODELS = (
+            DateTimeRecognizer(Culture.English).get_datetime_model(),
+            NumberWithUnitRecognizer(Culture.English).get_currency_model(),
+        )
+        # recognizers-text compiles its patterns lazily, pay that cost now instead of on the first utterance.
+        parse_entities(WARM_UP_UTTERANCE, True, True)
+    return _ENTITY_MODELS
+
+
+def parse_entities(utterance: str, datetimes: bool, money: bool) -> List[Tuple[str, object, int, int]]:
+    """The datetime and/or money entities of an utterance, as (name, value, start, end)."""
+    datetime_model, currency_model = entity_models()
+    entities = []
+    if datetimes:
+        for model_result in datetime_model.parse(utterance):
+            values = model_result.resolution.get("values") if model_result.resolution else None
+            if not values:
+                continue
+            timexes = list(OrderedDict.fromkeys(value["timex"] for value in values))
+            entities.append(
+                ("datetime", {"type": values[0]["type"], "timex": timexes}, model_result.start, model_result.end + 1)
+            )
+    if money:
+        for model_result in currency_model.parse(utterance):
+            resolution = model_result.resolution or {}
+            if resolution.get("value") is None or not resolution.get("unit"):
+                continue
+            number = float(resolution["value"])
+            entities.append((
+                "money",
+                {"number": int(number) if number.is_integer() else number, "units": resolution["unit"]},
+                model_result.start,
+                model_result.end + 1,
+            ))
+    return entities
+
+
+class OfflineFlightBookingRecognizer(Recognizer):
+    """
+    Local recognizer producing LUIS-shaped results, falling back to another recognizer on low confidence.
+
+    Intents, cities and traveller counts take about 100us per utterance. The datetime and money entities of
+    utterances with digits, number or date words take 70 to 120ms in the recognizers-text models, pure Python
+    holding the GIL: they are parsed in `workers` processes, about 10 utterances a second each, or with `workers=0`
+    in a single thread of this process, about 10 utterances a second in all.
+    """
+
+    def __init__(self, model: IntentModel, threshold: float = 0.8, fallback: Recognizer = None, workers: int = 0):
+        self.model = model
+        self.threshold = threshold
+        self.fallback = fallback
+        self.workers = workers
+        self._executor = self._create_executor()
+        if not workers:
+            entity_models()
+
+    def _create_executor(self) -> Executor:
+        if self.workers > 0:
+            # Each process builds and warms up its own models when it starts.
+            return ProcessPoolExecutor(max_workers=self.workers, initializer=entity_models)
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="offline-recognizer")
+
+    def close(self) -> None:
+        """Stop the entity parsing thread or processes, without waiting for the utterances they are parsing."""
+        self._executor.shutdown(wait=False)
+
+    def is_confident(self, recognizer_result: RecognizerResult) -> bool:
+        """Whether the top intent of one of this recognizer's results scores at least the threshold."""
+        return next(iter(recognizer_result.intents.values())).score >= self.threshold
+
+    async def recognize(self, turn_context: TurnContext) -> RecognizerResult:
+        activity = turn_context.activity
+        if activity.type != ActivityTypes.message:
+            return None
+
+        utterance = activity.text
+        if not utterance or utterance.isspace():
+            return RecognizerResult(text=utterance, intents={"": IntentScore(score=1.0)}, entities={})
+
+        recognizer_result = await self.recognize_text_async(utterance)
+        if self.fallback is not None and not self.is_confident(recognizer_result):
+            return await self.fallback.recognize(turn_context)
+        return recognizer_result
+
+    async def recognize_text_async(self, utterance: str) -> RecognizerResult:
+        """recognize_text with the entity models run in the recognizer's thread or processes, off the event loop."""
+        recognizer_result, tokens = self._recognize_tokens(utterance)
+        parse = self._entities_to_parse(utterance, tokens)
+        if any(parse):
+            try:
+                entities = await asyncio.get_event_loop().run_in_executor(
+                    self._executor, parse_entities, utterance, *parse
+                )
+            except BrokenProcessPool:
+                # A worker process died (e.g. killed for its memory): the next utterances get a new pool.
+                self._executor = self._create_executor()
+                raise
+            self._add_parsed(recognizer_result.entities, utterance, entities)
+        return recognizer_result
+
+    def recognize_text(self, utterance: str) -> RecognizerResult:
+        recognizer_result, tokens = self._recognize_tokens(utterance)
+        parse = self._entities_to_parse(utterance, tokens)
+        if any(parse):
+            self._add_parsed(recognizer_result.entities, utterance, parse_entities(utterance, *parse))
+        return recognizer_result
+
+    def _recognize_tokens(self, utterance: str) -> Tuple[RecognizerResult, List[Tuple[str, int, int]]]:
+        """The intent, cities and traveller counts of an utterance, with its tokens."""
+        tokens = tokenize(utterance)
+        probabilities = self.model.score([token for token, _, _ in tokens])
+        best = int(np.argmax(probabilities))
+
+        entities = {"$instance": {}}
+        self._add_cities(entities, utterance, tokens)
+        self._add_travellers(entities, utterance, tokens)
+
+        recognizer_result = RecognizerResult(
+            text=utterance,
+            altered_text=None,
+            intents={normalized_intent(self.model.labels[best]): IntentScore(float(probabilities[best]))},
+            entities=entities,
+        )
+        return recognizer_result, tokens
+
+    @staticmethod
+    def _entities_to_parse(utterance: str, tokens: List[Tuple[str, int, int]]) -> Tuple[bool, bool]:
+        """Whether the utterance may hold datetimes and money, the recognizers-text models being slow."""
+        has_digit = DIGIT_PATTERN.search(utterance) is not None
+        return (
+            has_digit or any(token in DATE_WORDS for token, _, _ in tokens),
+            has_digit or any(token in NUMBER_WORDS for token, _, _ in tokens),
+        )
+
+    def _add_parsed(self, entities: dict, utterance: str, parsed: List[Tuple[str, object, int, int]]) -> None:
+        for name, value, start, end in parsed:
+            self._add_entity(entities, name, value, utterance, start, end)
+
+    @staticmethod
+    def _add_entity(entities: dict, name: str, value: object, utterance: str, start: int, end: int) -> None:
+        entities.setdefault(name, []).append(value)
+        entities["$instance"].setdefault(name, []).append(
+            {"startIndex": start, "endIndex": end, "text": utterance[start:end], "type": name}
+        )
+
+    def _add_cities(self, entities: dict, utterance: str, tokens: List[Tuple[str, int, int]]) -> None:
+        matches = []
+        position = 0
+        while position < len(tokens):
+            for length in range(min(MAX_CITY_TOKENS, len(tokens) - position), 0, -1):
+                key = " ".join(token for token, _, _ in tokens[position:position + length])
+                if key in self.model.cities:
+                    matches.append((position, length, key))
+                    position += length
+                    break
+            else:
+                position += 1
+
+        roles = []
+        for position, _, key in matches:
+            roles.append(self._city_role(tokens, position, key))
+        if len(roles) == 2 and roles[0] == roles[1]:
+            # "Paris to Rome": the city without a cue takes the other role.
+            roles[0] = CITY_LABELS[1] if roles[1] == CITY_LABELS[0] else CITY_LABELS[0]
+
+        for (position, length, _), role in zip(matches, roles):
+            start, end = tokens[position][1], tokens[position + length - 1][2]
+            self._add_entity(entities, "geographyV2_city", utterance[start:end], utterance, start, end)
+            self._add_entity(entities, role, utterance[start:end], utterance, start, end)
+
+    def _city_role(self, tokens: List[Tuple[str, int, int]], position: int, key: str) -> str:
+        # The nearest cue word in the three preceding tokens decides, then the corpus majority label.
+        for token, _, _ in reversed(tokens[max(0, position - 3):position]):
+            if token in DESTINATION_CUES:
+                return CITY_LABELS[0]
+            if token in ORIGIN_CUES:
+                return CITY_LABELS[1]
+        destination, origin = self.model.cities[key]
+        return CITY_LABELS[0] if destination >= origin else CITY_LABELS[1]
+
+    def _add_travellers(self, entities: dict, utterance: str, tokens: List[Tuple[str, int, int]]) -> None:
+        for position, (token, start, end) in enumerate(tokens):
+            if not (token.isdigit() or token in NUMBER_WORDS):
+                continue
+            following = {word for word, _, _ in tokens[position + 1:position + 3]}
+            if following & ADULT_WORDS:
+                self._add_entity(entities, "n_adults", utterance[start:end], utterance, start, end)
+            elif following & CHILD_WORDS:
+                self._add_entity(entities, "n_children", utterance[start:end], utterance, start, end)
+
+
+if __name__ == "__main__":
+    IntentModel.from_luis_app(sys.argv[1]).save(sys.argv[2])
@@ -0,0 +1,164 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+import json
+from typing import Dict
+
+import aiohttp
+from azure.cognitiveservices.language.luis.runtime import models
+from azure.cognitiveservices.language.luis.runtime.models import LuisResult
+from botbuilder.ai.luis import LuisApplication, LuisPredictionOptions, LuisRecognizer
+from botbuilder.ai.luis.activity_util import ActivityUtil
+from botbuilder.ai.luis.luis_recognizer_options_v2 import LuisRecognizerOptionsV2
+from botbuilder.ai.luis.luis_recognizer_options_v3 import LuisRecognizerOptionsV3
+from botbuilder.ai.luis.luis_util import LuisUtil
+from botbuilder.core import RecognizerResult, TurnContext
+from botbuilder.schema import ActivityTypes
+from msrest import Deserializer
+
+from helpers.http_pool import HttpPool
+
+
+class _PooledLuisPrediction:
+    """
+    The v2 prediction of LuisRecognizerV2, sent through an HttpPool.
+
+    The library's LUISRuntimeClient sends a blocking `requests` call from the event loop, on a new connection.
+    """
+
+    _deserialize = Deserializer({k: v for k, v in models.__dict__.items() if isinstance(v, type)})
+
+    def __init__(self, application: LuisApplication, options: LuisRecognizerOptionsV2, http_pool: HttpPool):
+        self._application = application
+        self.options = options
+        self._http_pool = http_pool
+        self._url = f"{application.endpoint}/luis/v2.0/apps/{application.application_id}"
+        self._headers = {
+            "Accept": "application/json",
+            "Content-Type": "application/json; charset=utf-8",
+            "Ocp-Apim-Subscription-Key": application.endpoint_key,
+            "User-Agent": LuisUtil.get_user_agent(),
+        }
+
+    def _query_parameters(self) -> dict:
+        # Same parameters as LUISRuntimeClient.prediction.resolve in LuisRecognizerV2.
+        options = self.options
+        parameters = {
+            "timezoneOffset": options.timezone_offset,
+            "verbose": options.include_all_intents,
+            "staging": options.staging,
+            "spellCheck": options.spell_check,
+            "bing-spell-check-subscription-key": options.bing_spell_check_subscription_key,
+            "log": options.log if options.log is not None else True,
+        }
+        return {
+            name: (str(value).lower() if isinstance(value, bool) else str(value))
+            for name, value in parameters.items()
+            if value is not None
+        }
+
+    async def _resolve(self, utterance: str) -> LuisResult:
+        async with self._http_pool.request(
+                "POST",
+                self._url,
+                params=self._query_parameters(),
+                data=json.dumps(utterance),
+                headers=self._headers,
+                timeout=aiohttp.ClientTimeout(total=self.options.timeout / 1000),
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"[PooledLuisRecognizer]: LUIS answered {response.status} {response.reason}")
+            return self._deserialize("LuisResult", await response.json(content_type=None))
+
+    async def recognize(self, turn_context: TurnContext) -> RecognizerResult:
+        utterance: str = turn_context.activity.text
+        luis_result = await self._resolve(utterance)
+
+        options = self.options
+        recognizer_result = RecognizerResult(
+            text=utterance,
+            altered_text=luis_result.altered_query,
+            intents=LuisUtil.get_intents(luis_result),
+            entities=LuisUtil.extract_entities_and_metadata(
+                luis_result.entities,
+                luis_result.composite_entities,
+                options.include_instance_data if options.include_instance_data is not None else True,
+            ),
+        )
+
+        LuisUtil.add_properties(luis_result, recognizer_result)
+        if options.include_api_results:
+            recognizer_result.properties["luisResult"] = luis_result
+
+        # The trace activity LuisRecognizerV2 sends.
+        trace_info = {
+            "recognizerResult": LuisUtil.recognizer_result_as_dict(recognizer_result),
+            "luisModel": {"ModelID": self._application.application_id},
+            "luisOptions": {"Staging": options.staging},
+            "luisResult": LuisUtil.luis_result_as_dict(luis_result),
+        }
+        await turn_context.send_activity(ActivityUtil.create_trace(
+            turn_context.activity,
+            "LuisRecognizer",
+            trace_info,
+            LuisRecognizer.luis_trace_type,
+            LuisRecognizer.luis_trace_label,
+        ))
+        return recognizer_result
+
+
+class PooledLuisRecognizer(LuisRecognizer):
+    """
+    LuisRecognizer sending its v2 predictions through a shared HttpPool.
+
+    The library builds a new LuisRecognizerV2, and HTTP client, for every call: recognitions with the recognizer's
+    own LuisPredictionOptions are answered by one pooled prediction client instead. Per-call options and v2/v3
+    options are left to the library.
+    """
+
+    def __init__(
+            self,
+            application: LuisApplication,
+            http_pool: HttpPool,
+            prediction_options: LuisPredictionOptions = None,
+    ):
+        super().__init__(application, prediction_options)
+        self._prediction = None
+        if not isinstance(prediction_options, (LuisRecognizerOptionsV2, LuisRecognizerOptionsV3)):
+            # The v2 options LuisRecognizer derives from LuisPredictionOptions.
+            options = prediction_options or LuisPredictionOptions()
+            self._prediction = _PooledLuisPrediction(application, LuisRecognizerOptionsV2(
+                options.bing_spell_check_subscription_key,
+                options.include_all_intents,
+                options.include_instance_data,
+                options.log,
+                options.spell_check,
+                options.staging,
+                options.timeout,
+                options.timezone_offset,
+                False,
+                options.telemetry_client,
+                options.log_personal_information,
+            ), http_pool)
+
+    async def recognize(  # pylint: disable=arguments-differ
+            self,
+            turn_context: TurnContext,
+            telemetry_properties: Dict[str, str] = None,
+            telemetry_metrics: Dict[str, float] = None,
+            luis_prediction_options: LuisPredictionOptions = None,
+    ) -> RecognizerResult:
+        activity = turn_context.activity
+        if (
+                self._prediction is None
+                or luis_prediction_options is not None
+                or activity.type != ActivityTypes.message
+                or not activity.text
+                or activity.text.isspace()
+        ):
+            return await super().recognize(
+                turn_context, telemetry_properties, telemetry_metrics, luis_prediction_options
+            )
+
+        recognizer_result = await self._prediction.recognize(turn_context)
+        self.on_recognizer_result(recognizer_result, turn_context, telemetry_properties, telemetry_metrics)
+        return recognizer_result
@@ -0,0 +1,18 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""Storage module."""
+
+from .bounded_memory_storage import BoundedMemoryStorage
+from .factory import create_storage
+from .partial_storage import PartialStorage
+from .sqlite_storage import SqliteStorage
+from .tracked_state import TrackedConversationState, TrackedUserState
+
+__all__ = [
+    "BoundedMemoryStorage",
+    "create_storage",
+    "PartialStorage",
+    "SqliteStorage",
+    "TrackedConversationState",
+    "TrackedUserState",
+]
@@ -0,0 +1,168 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""In-process bot state storage bounded by idle time, item count and size."""
+import asyncio
+import pickle
+import sys
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from botbuilder.core import MemoryStorage, StoreItem
+
+from helpers.metrics import Counter, Gauge
+
+
+def _size(item: object) -> int:
+    try:
+        return len(pickle.dumps(item, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(item)
+
+
+class BoundedMemoryStorage(MemoryStorage):
+    """
+    MemoryStorage dropping the items not read nor written for `idle_ttl` seconds, and the least recently used ones
+    beyond `max_entries` items or `max_bytes` bytes (0 for no bound).
+
+    Idle items are dropped when read and by a sweeper task started with the first write, every `sweep_interval`
+    seconds. Sizes are those of the pickled items: an approximation of the memory they hold.
+    """
+
+    IDLE = "idle"
+    ENTRIES = "entries"
+    BYTES = "bytes"
+
+    def __init__(
+            self,
+            max_entries: int = 0,
+            max_bytes: int = 0,
+            idle_ttl: float = 0,
+            sweep_interval: float = 60,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        # Least recently used first.
+        super(BoundedMemoryStorage, self).__init__(OrderedDict())
+        if max_entries < 0 or max_bytes < 0 or idle_ttl < 0 or sweep_interval <= 0:
+            raise ValueError("[BoundedMemoryStorage]: bounds must be non-negative and sweep_interval positive")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._used_at: Dict[str, float] = {}
+        self._sizes: Dict[str, int] = {}
+        self.bytes = 0
+        self._sweeper: Optional[asyncio.Future] = None
+        self.evictions = Counter("bot_state_evictions_total", "State items dropped from memory.", ["reason"])
+
+    def __len__(self) -> int:
+        return len(self.memory)
+
+    async def read(self, keys: List[str]):
+        now = self._clock()
+        for key in keys or ():
+            if key not in self.memory:
+                continue
+            if self.idle_ttl and now - self._used_at[key] >= self.idle_ttl:
+                # Expired but not swept yet.
+                self._evict(key, self.IDLE)
+            else:
+                self._touch(key, now)
+        return await super(BoundedMemoryStorage, self).read(keys)
+
+    async def write(self, changes: Dict[str, StoreItem]):
+        try:
+            await super(BoundedMemoryStorage, self).write(changes)
+        finally:
+            # Also accounts for the items written before an e_tag conflict.
+            now = self._clock()
+            for key in changes or ():
+                if key in self.memory:
+                    self._touch(key, now)
+                    size = _size(self.memory[key])
+                    self.bytes += size - self._sizes.get(key, 0)
+                    self._sizes[key] = size
+            self._enforce_bounds()
+
+        if self.idle_ttl and self._sweeper is None:
+            self._sweeper = asyncio.ensure_future(self._sweep_periodically())
+
+    async def delete(self, keys: List[str]):
+        await super(BoundedMemoryStorage, self).delete(keys)
+        for key in keys:
+            self._forget(key)
+
+    def _touch(self, key: str, now: float) -> None:
+        self.memory.move_to_end(key)
+        self._used_at[key] = now
+
+    def _forget(self, key: str) -> None:
+        self._used_at.pop(key, None)
+        self.bytes -= self._sizes.pop(key, 0)
+
+    def _evict(self, key: str, reason: str) -> None:
+        del self.memory[key]
+        self._forget(key)
+        self.evictions.inc(reason)
+
+    def _enforce_bounds(self) -> None:
+        # The most recently used item is kept even when it alone exceeds max_bytes.
+        while len(self.memory) > 1:
+            if self.max_entries and len(self.memory) > self.max_entries:
+                reason = self.ENTRIES
+            elif self.max_bytes and self.bytes > self.max_bytes:
+                reason = self.BYTES
+            else:
+                return
+            self._evict(next(iter(self.memory)), reason)
+
+    def sweep(self) -> int:
+        """Drop the idle items, returning how many were dropped."""
+        if not self.idle_ttl:
+            return 0
+
+        # Items are ordered by last use: the idle ones come first.
+        deadline = self._clock() - self.idle_ttl
+        expired = []
+        for key in self.memory:
+            if self._used_at[key] > deadline:
+                break
+            expired.append(key)
+        for key in expired:
+            self._evict(key, self.IDLE)
+        return len(expired)
+
+    async def _sweep_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception as exception:
+                print(f"[BoundedMemoryStorage]: sweep failed, {exception!r}", file=sys.stderr)
+
+    async def close(self) -> None:
+        """Stop the sweeper."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "entries": len(self.memory),
+            "bytes": self.bytes,
+            "evicted": {reason: int(self.evictions.value(reason)) for reason in (self.IDLE, self.ENTRIES, self.BYTES)},
+        }
+
+    def metrics(self) -> List[object]:
+        """Resident state and evictions, to register with TurnMetrics."""
+        return [
+            Gauge("bot_state_memory_entries", "State items held in memory.", lambda: len(self.memory)),
+            Gauge("bot_state_memory_bytes", "Approximate size of the state items held in memory.", lambda: self.bytes),
+            self.evictions,
+        ]
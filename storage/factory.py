@@ -0,0 +1,47 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+import importlib
+
+from botbuilder.core import Storage
+
+from config import DefaultConfig
+from .bounded_memory_storage import BoundedMemoryStorage
+from .sqlite_storage import SqliteStorage
+
+
+def create_storage(configuration: DefaultConfig) -> Storage:
+    """
+    Storage for the conversation and user states, picked by StateStorage:
+
+    - "memory": BoundedMemoryStorage, state is lost on restart, private to the process and dropped when idle or
+      beyond the StateMemory* bounds.
+    - "sqlite": SqliteStorage in StateStoragePath, shared by every worker process on the machine.
+    - "package.module:Class": any other Storage, constructed with the configuration.
+
+    Defaults to "sqlite" when StateStoragePath is set, "memory" otherwise.
+    """
+    backend = configuration.STATE_STORAGE or ("sqlite" if configuration.STATE_STORAGE_PATH else "memory")
+
+    if backend == "memory":
+        return BoundedMemoryStorage(
+            max_entries=configuration.STATE_MEMORY_MAX_ENTRIES,
+            max_bytes=configuration.STATE_MEMORY_MAX_BYTES,
+            idle_ttl=configuration.STATE_MEMORY_IDLE_TTL,
+            sweep_interval=configuration.STATE_MEMORY_SWEEP_INTERVAL,
+        )
+
+    if backend == "sqlite":
+        if not configuration.STATE_STORAGE_PATH:
+            raise Exception("[create_storage]: StateStoragePath is required by the sqlite state storage")
+        return SqliteStorage(
+            configuration.STATE_STORAGE_PATH,
+            shards=configuration.STATE_STORAGE_SHARDS,
+            flush_interval=configuration.STATE_STORAGE_FLUSH_INTERVAL,
+            write_behind=configuration.STATE_STORAGE_WRITE_BEHIND,
+        )
+
+    module_name, _, class_name = backend.partition(":")
+    if not class_name:
+        raise Exception(f"[create_storage]: unknown state storage '{backend}'")
+    storage_class = getattr(importlib.import_module(module_name), class_name)
+    return storage_class(configuration)
@@ -0,0 +1,44 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable
+
+# Separates a document key from its part names in the underlying keys.
+PART_SEPARATOR = "\x1f"
+
+
+class PartialStorage(ABC):
+    """
+    Storage able to persist a document as independently written, already serialized parts.
+
+    Lets the tracked bot states write only the sub-documents that changed during a turn.
+    """
+
+    @abstractmethod
+    async def read_parts(self, key: str) -> Dict[str, str]:
+        """
+        Loads every part of a document.
+        :param key:
+        :return: serialized parts by name, empty if the document doesn't exist
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def write_parts(self, key: str, changed: Dict[str, str], removed: Iterable[str] = ()):
+        """
+        Saves the changed parts of a document and removes the deleted ones.
+        :param key:
+        :param changed: serialized parts by name
+        :param removed: names of the parts to remove
+        :return:
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def delete_parts(self, key: str):
+        """
+        Removes a document and all of its parts.
+        :param key:
+        :return:
+        """
+        raise NotImplementedError()
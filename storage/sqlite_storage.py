@@ -0,0 +1,411 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""Bot state storage persisted to sharded SQLite files in WAL mode."""
+import asyncio
+import copy
+import os
+import sqlite3
+import sys
+import threading
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import jsonpickle
+from botbuilder.core import Storage, StoreItem
+
+from .partial_storage import PART_SEPARATOR, PartialStorage
+
+SCHEMA = "CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, e_tag TEXT, data TEXT NOT NULL) WITHOUT ROWID"
+
+# Pending entry: (e_tag, serialized item), or None for a deletion.
+_Entry = Optional[Tuple[Optional[str], str]]
+
+# Precondition of the writes committed whatever the stored item.
+UNCONDITIONAL = object()
+
+# A failed commit is retried with an exponential backoff, then left for the next write or flush.
+MAX_COMMIT_RETRIES = 5
+MAX_COMMIT_BACKOFF = 1.0
+
+
+def _get_e_tag(item) -> Optional[str]:
+    if isinstance(item, dict):
+        return item.get("e_tag")
+    return getattr(item, "e_tag", None)
+
+
+def _set_e_tag(item, e_tag: str) -> None:
+    if isinstance(item, dict):
+        item["e_tag"] = e_tag
+    else:
+        item.e_tag = e_tag
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # WAL + NORMAL only syncs at checkpoints: a power loss may drop the last commits but never corrupts.
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("PRAGMA busy_timeout=5000")
+    return connection
+
+
+class _Shard:
+    """One SQLite file with a single writer thread and a write-behind buffer."""
+
+    def __init__(self, path: str, readers: ThreadPoolExecutor, flush_interval: float, max_batch: int):
+        self.path = path
+        self._readers = readers
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-storage-writer")
+        self._flush_interval = flush_interval
+        self._max_batch = max_batch
+        self._local = threading.local()
+
+        self._write_connection = _connect(path)
+        self._write_connection.execute(SCHEMA)
+
+        # Entries not yet committed, and the batch being committed: both are visible to reads.
+        self.pending: Dict[str, _Entry] = {}
+        self.committing: Dict[str, _Entry] = {}
+        # Stored e_tag each pending write expects, for the writes made with a precondition.
+        self.pending_expected: Dict[str, Optional[str]] = {}
+        self._waiters: List[Tuple[asyncio.Future, str]] = []
+        self._flush_task: Optional[asyncio.Future] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def _read_connection(self) -> sqlite3.Connection:
+        # One connection per reader thread: WAL readers don't block each other nor the writer.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = _connect(self.path)
+        return connection
+
+    def _select(self, keys: List[str]) -> Dict[str, Tuple[Optional[str], str]]:
+        placeholders = ",".join("?" * len(keys))
+        rows = self._read_connection().execute(
+            f"SELECT key, e_tag, data FROM state WHERE key IN ({placeholders})", keys
+        )
+        return {key: (e_tag, data) for key, e_tag, data in rows}
+
+    def _select_prefix(self, prefix: str) -> Dict[str, Tuple[Optional[str], str]]:
+        # Part keys end with the separator then the part name: they all sort below the next code point.
+        end = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        rows = self._read_connection().execute(
+            "SELECT key, e_tag, data FROM state WHERE key >= ? AND key < ?", (prefix, end)
+        )
+        return {key: (e_tag, data) for key, e_tag, data in rows}
+
+    def _buffered_with_prefix(self, prefix: str) -> Dict[str, _Entry]:
+        buffered = {}
+        for buffer in (self.committing, self.pending):
+            for key, entry in buffer.items():
+                if key.startswith(prefix):
+                    buffered[key] = entry
+        return buffered
+
+    def _lookup(self, key: str) -> Tuple[bool, _Entry]:
+        """Uncommitted entry for `key`, if any."""
+        for buffer in (self.pending, self.committing):
+            if key in buffer:
+                return True, buffer[key]
+        return False, None
+
+    async def read(self, keys: List[str]) -> Dict[str, Tuple[Optional[str], str]]:
+        found, missing = {}, []
+        for key in keys:
+            buffered, entry = self._lookup(key)
+            if not buffered:
+                missing.append(key)
+            elif entry is not None:
+                found[key] = entry
+
+        if missing:
+            loop = asyncio.get_event_loop()
+            rows = await loop.run_in_executor(self._readers, self._select, missing)
+            for key in missing:
+                # A write may have been buffered while the rows were being read.
+                buffered, newer = self._lookup(key)
+                if buffered:
+                    if newer is not None:
+                        found[key] = newer
+                elif key in rows:
+                    found[key] = rows[key]
+        return found
+
+    async def read_prefix(self, prefix: str) -> Dict[str, Tuple[Optional[str], str]]:
+        # Buffered entries are taken before and after the query: a batch may commit while it runs.
+        before = self._buffered_with_prefix(prefix)
+        loop = asyncio.get_event_loop()
+        found = await loop.run_in_executor(self._readers, self._select_prefix, prefix)
+        for buffered in (before, self._buffered_with_prefix(prefix)):
+            for key, entry in buffered.items():
+                if entry is None:
+                    found.pop(key, None)
+                else:
+                    found[key] = entry
+        return found
+
+    async def current_e_tag(self, key: str) -> Optional[str]:
+        entry = (await self.read([key])).get(key)
+        return entry[0] if entry else None
+
+    def put(self, key: str, entry: _Entry, expected=UNCONDITIONAL, wait: bool = False) -> Optional[asyncio.Future]:
+        """
+        Buffer `entry`, committed only if the stored e_tag of `key` is still `expected` (None: no item), unless
+        UNCONDITIONAL. With `wait`, returns a future resolved once the entry is committed.
+        """
+        if key in self.pending:
+            # The buffered write comes first: its precondition is the one checked against the stored item.
+            if expected is UNCONDITIONAL:
+                self.pending_expected.pop(key, None)
+        elif expected is not UNCONDITIONAL:
+            self.pending_expected[key] = expected
+        self.pending[key] = entry
+
+        waiter = None
+        if wait:
+            # Registered with the entry, so the batch committing the entry resolves it.
+            waiter = asyncio.get_event_loop().create_future()
+            self._waiters.append((waiter, key))
+        if self._flush_task is None:
+            self._start_flusher()
+        if len(self.pending) >= self._max_batch:
+            self._wake.set()
+        return waiter
+
+    def _start_flusher(self) -> None:
+        self._wake = asyncio.Event()
+        self._flush_task = asyncio.ensure_future(self._run_flusher())
+
+    async def flush(self) -> None:
+        if self._flush_task is None and self.pending:
+            # The last flusher gave up on a failed commit.
+            self._start_flusher()
+        if self._flush_task is not None:
+            self._wake.set()
+            await asyncio.shield(self._flush_task)
+        if self.pending:
+            raise Exception(f"[SqliteStorage]: {len(self.pending)} writes to {self.path} could not be committed")
+
+    async def _run_flusher(self) -> None:
+        try:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            # Writes arriving while a batch commits form the next batch: group commit under load.
+            loop = asyncio.get_event_loop()
+            failures = 0
+            while self.pending:
+                batch, self.pending = self.pending, {}
+                expected, self.pending_expected = self.pending_expected, {}
+                waiters, self._waiters = self._waiters, []
+                self.committing = batch
+                try:
+                    conflicts = await loop.run_in_executor(self._writer, self._commit, batch, expected)
+                except Exception as exception:
+                    self._requeue(batch, expected, waiters)
+                    failures += 1
+                    if failures > MAX_COMMIT_RETRIES:
+                        # Kept in pending: the next write or flush() starts a new flusher.
+                        print(f"[SqliteStorage]: commit to {self.path} failed, {exception!r}", file=sys.stderr)
+                        waiters, self._waiters = self._waiters, []
+                        for waiter, _ in waiters:
+                            if not waiter.done():
+                                waiter.set_exception(exception)
+                        return
+                    delay = min(max(self._flush_interval, 0.01) * 2 ** failures, MAX_COMMIT_BACKOFF)
+                    print(
+                        f"[SqliteStorage]: commit to {self.path} failed, retrying in {delay:.2f}s, {exception!r}",
+                        file=sys.stderr,
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+                finally:
+                    self.committing = {}
+
+                failures = 0
+                waited = {key for _, key in waiters}
+                for key in conflicts - waited:
+                    print(f"[SqliteStorage]: e_tag conflict, write of {key!r} dropped", file=sys.stderr)
+                for waiter, key in waiters:
+                    if waiter.done():
+                        continue
+                    if key in conflicts:
+                        waiter.set_exception(KeyError(f"Etag conflict on {key!r} at commit"))
+                    else:
+                        waiter.set_result(None)
+        finally:
+            self._flush_task = None
+
+    def _requeue(self, batch: Dict[str, _Entry], expected: Dict[str, Optional[str]], waiters: list) -> None:
+        # Newer writes win, with the precondition of the earliest write of their key.
+        for key, e_tag in expected.items():
+            if key not in self.pending or key in self.pending_expected:
+                self.pending_expected[key] = e_tag
+        self.pending = {**batch, **self.pending}
+        self._waiters = waiters + self._waiters
+
+    def _commit(self, batch: Dict[str, _Entry], expected: Dict[str, Optional[str]]) -> Set[str]:
+        """Commit the batch but the entries whose precondition fails, returning their keys."""
+        connection = self._write_connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Checked in the transaction: no other process can write the items until it ends.
+            conflicts = set()
+            for key, e_tag in expected.items():
+                row = connection.execute("SELECT e_tag FROM state WHERE key = ?", (key,)).fetchone()
+                if (row[0] if row else None) != e_tag:
+                    conflicts.add(key)
+
+            deleted = [(key,) for key, entry in batch.items() if entry is None and key not in conflicts]
+            written = [
+                (key, entry[0], entry[1]) for key, entry in batch.items() if entry is not None and key not in conflicts
+            ]
+            if deleted:
+                connection.executemany("DELETE FROM state WHERE key = ?", deleted)
+            if written:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO state (key, e_tag, data) VALUES (?, ?, ?)", written
+                )
+            connection.execute("COMMIT")
+            return conflicts
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def close(self) -> None:
+        self._writer.submit(self._write_connection.close).result()
+        self._writer.shutdown()
+
+
+class SqliteStorage(Storage, PartialStorage):
+    """
+    Storage persisting items in SQLite files, sharded by key.
+
+    Bot state keys embed the conversation (or user) id, so all the state of a conversation lives in one
+    shard. Writes are buffered and committed per shard in one transaction every `flush_interval` seconds or
+    `max_batch` items (write-behind with group commit); reads see buffered writes and run concurrently.
+    With `write_behind=False`, `write` returns only once its batch is committed.
+
+    Items are serialized with jsonpickle. Like MemoryStorage, optimistic concurrency only applies to items
+    carrying an e_tag: a stale e_tag raises KeyError, "*" overwrites unconditionally. The e_tag is checked again
+    when the batch commits, a write conflicting then being dropped (raising KeyError with `write_behind=False`). Documents written as
+    parts (see PartialStorage) are stored one row per part, without e_tags.
+    """
+
+    def __init__(
+            self,
+            directory: str,
+            shards: int = 8,
+            flush_interval: float = 0.01,
+            max_batch: int = 256,
+            write_behind: bool = True,
+            read_threads: int = 4,
+    ):
+        super(SqliteStorage, self).__init__()
+        if shards < 1:
+            raise Exception("[SqliteStorage]: shards must be at least 1")
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.write_behind = write_behind
+        self._readers = ThreadPoolExecutor(max_workers=read_threads, thread_name_prefix="sqlite-storage-reader")
+        self._shards = [
+            _Shard(os.path.join(directory, f"state-{index:03d}.sqlite3"), self._readers, flush_interval, max_batch)
+            for index in range(shards)
+        ]
+
+    def _shard(self, key: str) -> _Shard:
+        # The parts of a document live in the shard of the document key.
+        document_key = key.split(PART_SEPARATOR, 1)[0]
+        return self._shards[zlib.crc32(document_key.encode("utf-8")) % len(self._shards)]
+
+    async def read(self, keys: List[str]) -> Dict[str, object]:
+        if not keys:
+            return {}
+
+        by_shard: Dict[_Shard, List[str]] = {}
+        for key in keys:
+            by_shard.setdefault(self._shard(key), []).append(key)
+        results = await asyncio.gather(*[shard.read(shard_keys) for shard, shard_keys in by_shard.items()])
+
+        data = {}
+        for entries in results:
+            for key, (_, serialized) in entries.items():
+                data[key] = jsonpickle.decode(serialized)
+        return data
+
+    async def write(self, changes: Dict[str, StoreItem]):
+        if changes is None:
+            raise Exception("Changes are required when writing")
+        if not changes:
+            return
+
+        waiters = []
+        for key, change in changes.items():
+            shard = self._shard(key)
+            new_e_tag = _get_e_tag(change)
+            if new_e_tag == "":
+                raise Exception("sqlite_storage.write(): etag missing")
+
+            expected = UNCONDITIONAL
+            if new_e_tag is not None:
+                old_e_tag = await shard.current_e_tag(key)
+                if old_e_tag is not None and new_e_tag not in ("*", old_e_tag):
+                    raise KeyError(
+                        "Etag conflict.\nOriginal: %s\r\nCurrent: %s" % (new_e_tag, old_e_tag)
+                    )
+                # Checked again at commit: another writer may commit in between.
+                if new_e_tag != "*":
+                    expected = old_e_tag
+                new_e_tag = uuid.uuid4().hex
+                change = copy.copy(change)
+                _set_e_tag(change, new_e_tag)
+
+            # Serializing now snapshots the item, later changes by the caller are not persisted.
+            entry = (new_e_tag, jsonpickle.encode(change, make_refs=False))
+            waiters.append(shard.put(key, entry, expected, wait=not self.write_behind))
+
+        if not self.write_behind:
+            await asyncio.gather(*waiters)
+
+    async def delete(self, keys: List[str]):
+        waiters = [self._shard(key).put(key, None, wait=not self.write_behind) for key in keys]
+        if not self.write_behind:
+            await asyncio.gather(*waiters)
+
+    async def read_parts(self, key: str) -> Dict[str, str]:
+        prefix = key + PART_SEPARATOR
+        entries = await self._shard(key).read_prefix(prefix)
+        return {row_key[len(prefix):]: serialized for row_key, (_, serialized) in entries.items()}
+
+    async def write_parts(self, key: str, changed: Dict[str, str], removed: Iterable[str] = ()):
+        shard = self._shard(key)
+        prefix = key + PART_SEPARATOR
+        updates = [(prefix + part, (None, serialized)) for part, serialized in changed.items()]
+        updates.extend((prefix + part, None) for part in removed)
+        if not updates:
+            return
+
+        waiters = [shard.put(row_key, entry, wait=not self.write_behind) for row_key, entry in updates]
+        if not self.write_behind:
+            await asyncio.gather(*waiters)
+
+    async def delete_parts(self, key: str):
+        await self.write_parts(key, {}, await self.read_parts(key))
+
+    async def flush(self) -> None:
+        """Commit every buffered write."""
+        await asyncio.gather(*[shard.flush() for shard in self._shards])
+
+    async def close(self) -> None:
+        try:
+            await self.flush()
+        finally:
+            for shard in self._shards:
+                shard.close()
+            self._readers.shutdown()
@@ -0,0 +1,139 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""Bot states tracking changes per sub-document and writing only what changed."""
+from typing import Dict, Optional
+
+import jsonpickle
+from botbuilder.core import ConversationState, Storage, TurnContext, UserState
+from botbuilder.core.bot_state import CachedBotState
+from botbuilder.dialogs import DialogState
+
+from .partial_storage import PartialStorage
+
+# Part names: "p:<property>" holds a property value, or the empty shell of a DialogState whose frames
+# are stored as "s:<property>:<depth>", depth counted from the bottom of the stack. Pushing or popping the
+# active dialog therefore leaves the parts of the dialogs below it untouched.
+PROPERTY_PART = "p:"
+STACK_PART = "s:"
+
+
+def _encode(value: object) -> str:
+    return jsonpickle.encode(value, make_refs=False)
+
+
+def split_state(state: Dict[str, object]) -> Dict[str, str]:
+    """Serialize a bot state into independently comparable parts."""
+    parts = {}
+    for name, value in (state or {}).items():
+        if isinstance(value, DialogState):
+            parts[PROPERTY_PART + name] = _encode(DialogState())
+            stack = value.dialog_stack
+            for depth, instance in enumerate(reversed(stack)):
+                parts[f"{STACK_PART}{name}:{depth:04d}"] = _encode(instance)
+        else:
+            parts[PROPERTY_PART + name] = _encode(value)
+    return parts
+
+
+def join_state(parts: Dict[str, str]) -> Dict[str, object]:
+    """Rebuild a bot state from the parts produced by split_state."""
+    state = {}
+    frames: Dict[str, list] = {}
+    for part, serialized in sorted(parts.items()):
+        if part.startswith(PROPERTY_PART):
+            state[part[len(PROPERTY_PART):]] = jsonpickle.decode(serialized)
+        elif part.startswith(STACK_PART):
+            name, _ = part[len(STACK_PART):].rsplit(":", 1)
+            frames.setdefault(name, []).append(jsonpickle.decode(serialized))
+
+    for name, instances in frames.items():
+        dialog_state = state.get(name)
+        if isinstance(dialog_state, DialogState):
+            # Sorted bottom first, the active dialog goes back to the front of the stack.
+            dialog_state.dialog_stack.extend(reversed(instances))
+    return state
+
+
+class TrackedCachedState(CachedBotState):
+    """Cached state whose hash is the serialized parts, so changes are known per part."""
+
+    def __init__(self, state: Dict[str, object] = None, parts: Optional[Dict[str, str]] = None):
+        # pylint: disable=super-init-not-called
+        self.state = state if state is not None else {}
+        # Parts just read from storage are the serialized state already: no need to serialize it again.
+        self.hash = parts if parts is not None else self.compute_hash(self.state)
+
+    def compute_hash(self, obj: object) -> Dict[str, str]:
+        return split_state(obj)
+
+
+class DirtyTrackingStateMixin:
+    """
+    BotState behaviour writing nothing when no part changed, and only the changed parts (e.g. the dialog
+    stack frames that moved) when the storage is a PartialStorage. Other storages get the whole state.
+    """
+
+    async def load(self, turn_context: TurnContext, force: bool = False) -> None:
+        cached_state = self.get_cached_state(turn_context)
+        if not force and cached_state and cached_state.state:
+            return
+
+        storage_key = self.get_storage_key(turn_context)
+        if isinstance(self._storage, PartialStorage):
+            parts = await self._storage.read_parts(storage_key)
+            cached_state = TrackedCachedState(join_state(parts), parts)
+        else:
+            items = await self._storage.read([storage_key])
+            cached_state = TrackedCachedState(items.get(storage_key))
+        turn_context.turn_state[self._context_service_key] = cached_state
+
+    async def save_changes(self, turn_context: TurnContext, force: bool = False) -> None:
+        cached_state = self.get_cached_state(turn_context)
+        if cached_state is None:
+            # Never loaded during the turn (e.g. user state no dialog reads): nothing to write.
+            return
+
+        parts = split_state(cached_state.state)
+        stored = cached_state.hash if isinstance(cached_state.hash, dict) else None
+        if not force and parts == stored:
+            return
+
+        storage_key = self.get_storage_key(turn_context)
+        if not isinstance(self._storage, PartialStorage):
+            await self._storage.write({storage_key: cached_state.state})
+        elif stored is None:
+            # Cleared state: the stored parts are unknown, replace the whole document.
+            await self._storage.delete_parts(storage_key)
+            await self._storage.write_parts(storage_key, parts)
+        else:
+            changed = {
+                part: serialized for part, serialized in parts.items()
+                if force or stored.get(part) != serialized
+            }
+            removed = [part for part in stored if part not in parts]
+            await self._storage.write_parts(storage_key, changed, removed)
+        cached_state.hash = parts
+
+    async def clear_state(self, turn_context: TurnContext):
+        # Same as BotState.clear_state: a hash that matches no state forces the next save.
+        cache_value = TrackedCachedState()
+        cache_value.hash = None
+        turn_context.turn_state[self._context_service_key] = cache_value
+
+    async def delete(self, turn_context: TurnContext) -> None:
+        if not isinstance(self._storage, PartialStorage):
+            await super().delete(turn_context)
+            return
+
+        turn_context.turn_state.pop(self._context_service_key, None)
+        await self._storage.delete_parts(self.get_storage_key(turn_context))
+
+
+class TrackedConversationState(DirtyTrackingStateMixin, ConversationState):
+    def __init__(self, storage: Storage):
+        super(TrackedConversationState, self).__init__(storage)
+
+
+class TrackedUserState(DirtyTrackingStateMixin, UserState):
+    def __init__(self, storage: Storage, namespace=""):
+        super(TrackedUserState, self).__init__(storage, namespace)
@@ -0,0 +1,53 @@
+import asyncio
+from http import HTTPStatus
+
+import aiounittest
+
+from helpers.admission import AdmissionController, AdmissionRejected
+
+
+class AdmissionTest(aiounittest.AsyncTestCase):
+    async def test_excess_requests_wait_in_order_then_are_shed(self):
+        admission = AdmissionController(max_concurrency=1, max_queue=2, queue_timeout=0.2)
+        release = asyncio.Event()
+        order = []
+
+        async def turn(name: str):
+            async with admission.admit():
+                order.append(name)
+                await release.wait()
+
+        first = asyncio.ensure_future(turn("first"))
+        second = asyncio.ensure_future(turn("second"))
+        third = asyncio.ensure_future(turn("third"))
+        await asyncio.sleep(0)
+        self.assertEqual((admission.active, admission.queue_depth), (1, 2))
+
+        with self.assertRaises(AdmissionRejected) as rejected:
+            await turn("fourth")
+        self.assertEqual(rejected.exception.status, HTTPStatus.TOO_MANY_REQUESTS)
+
+        release.set()
+        await asyncio.gather(first, second, third)
+        self.assertEqual(order, ["first", "second", "third"])
+        self.assertEqual((admission.active, admission.queue_depth), (0, 0))
+        self.assertEqual(admission.shed.value(AdmissionController.QUEUE_FULL), 1)
+
+    async def test_requests_waiting_past_the_deadline_get_a_503(self):
+        admission = AdmissionController(max_concurrency=1, max_queue=10, queue_timeout=0.05)
+        release = asyncio.Event()
+
+        async def turn():
+            async with admission.admit():
+                await release.wait()
+
+        running = asyncio.ensure_future(turn())
+        await asyncio.sleep(0)
+        with self.assertRaises(AdmissionRejected) as rejected:
+            await turn()
+        self.assertEqual(rejected.exception.status, HTTPStatus.SERVICE_UNAVAILABLE)
+
+        release.set()
+        await running
+        self.assertEqual((admission.active, admission.queue_depth), (0, 0))
+        self.assertEqual(admission.shed.value(AdmissionController.QUEUE_TIMEOUT), 1)
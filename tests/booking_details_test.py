@@ -0,0 +1,44 @@
+import copy
+from decimal import Decimal
+
+import aiounittest
+import jsonpickle
+
+from booking_details import BookingDetails
+
+DETAILS = BookingDetails(dst_city="Paris", or_city="Berlin", str_date="2023-02-10", n_adults="2")
+
+
+class BookingDetailsTest(aiounittest.AsyncTestCase):
+    def test_compact_codec_round_trip(self):
+        self.assertEqual(DETAILS.encode(), '[1,"Paris","Berlin","2023-02-10",null,null,"2",null,[]]')
+        self.assertEqual(BookingDetails.decode(DETAILS.encode()), DETAILS)
+
+    def test_jsonpickle_and_copy_round_trip(self):
+        self.assertEqual(jsonpickle.decode(jsonpickle.encode(DETAILS, make_refs=False)), DETAILS)
+        self.assertEqual(copy.deepcopy(DETAILS), DETAILS)
+
+    def test_jsonpickle_keeps_prompt_numbers(self):
+        details = BookingDetails(dst_city="Paris", n_adults=Decimal("2"), n_children=1.5)
+        encoded = jsonpickle.encode(details, make_refs=False)
+
+        self.assertEqual(jsonpickle.backend.json.backend_decode("json", encoded)["py/object"],
+                         "booking_details.BookingDetails")
+        self.assertEqual(jsonpickle.decode(encoded), details)
+        self.assertIsInstance(jsonpickle.decode(encoded).n_adults, Decimal)
+
+    def test_reads_state_saved_as_plain_object(self):
+        legacy = (
+            '{"py/object": "booking_details.BookingDetails", "dst_city": "Rome", "or_city": null, '
+            '"str_date": null, "end_date": null, "budget": null, "n_adults": "1", "n_children": null, '
+            '"unsupported_airports": []}'
+        )
+        self.assertEqual(jsonpickle.decode(legacy), BookingDetails(dst_city="Rome", n_adults="1"))
+
+    def test_rejects_newer_versions(self):
+        with self.assertRaises(Exception):
+            BookingDetails.from_compact([BookingDetails.VERSION + 1, "Paris"])
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            DETAILS.travel_class = "economy"
@@ -0,0 +1,65 @@
+import asyncio
+
+import aiounittest
+
+from booking_details import BookingDetails
+from config import DefaultConfig
+from storage import BoundedMemoryStorage, create_storage
+from tests.utils import FakeClock
+
+
+class BoundedMemoryStorageTest(aiounittest.AsyncTestCase):
+    async def test_evicts_the_least_recently_used_beyond_max_entries(self):
+        storage = BoundedMemoryStorage(max_entries=2)
+        await storage.write({"a": {"count": 1}, "b": {"count": 2}})
+        await storage.read(["a"])
+        await storage.write({"c": {"count": 3}})
+
+        self.assertEqual(await storage.read(["a", "b", "c"]), {"a": {"count": 1}, "c": {"count": 3}})
+        self.assertEqual(storage.stats()["evicted"], {"idle": 0, "entries": 1, "bytes": 0})
+
+    async def test_tracks_and_bounds_the_approximate_size(self):
+        storage = BoundedMemoryStorage()
+        await storage.write({"a": {"details": BookingDetails(dst_city="Paris")}})
+        size = storage.bytes
+        self.assertGreater(size, 0)
+
+        storage.max_bytes = size * 2
+        await storage.write({"b": {"details": BookingDetails(dst_city="Rome")}})
+        await storage.write({"c": {"details": BookingDetails(dst_city="Oslo")}})
+        self.assertEqual(len(storage), 2)
+        self.assertEqual(storage.evictions.value(BoundedMemoryStorage.BYTES), 1)
+
+        await storage.delete(["b", "c"])
+        self.assertEqual((len(storage), storage.bytes), (0, 0))
+
+    async def test_idle_items_expire_on_read_and_sweep(self):
+        clock = FakeClock()
+        storage = BoundedMemoryStorage(idle_ttl=10, clock=clock)
+        await storage.write({"a": {"count": 1}, "b": {"count": 2}, "c": {"count": 3}})
+
+        clock.now = 5
+        await storage.read(["a"])
+        clock.now = 10
+        self.assertEqual(await storage.read(["b"]), {})
+        self.assertEqual(storage.sweep(), 1)
+        self.assertEqual(await storage.read(["a", "c"]), {"a": {"count": 1}})
+        self.assertEqual(storage.evictions.value(BoundedMemoryStorage.IDLE), 2)
+        await storage.close()
+
+    async def test_sweeper_runs_in_the_background(self):
+        storage = BoundedMemoryStorage(idle_ttl=0.01, sweep_interval=0.01)
+        await storage.write({"a": {"count": 1}})
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(len(storage), 0)
+        await storage.close()
+
+    def test_memory_backend(self):
+        class MemoryConfig(DefaultConfig):
+            STATE_STORAGE = "memory"
+            STATE_MEMORY_MAX_ENTRIES = 1000
+
+        storage = create_storage(MemoryConfig())
+        self.assertIsInstance(storage, BoundedMemoryStorage)
+        self.assertEqual(storage.max_entries, 1000)
@@ -0,0 +1,50 @@
+import json
+
+import aiounittest
+
+from booking_details import BookingDetails
+from dialogs.flight_itinerary_card import FlightItineraryCard
+from helpers.card_template import CardTemplate
+
+CARD = {
+    "type": "AdaptiveCard",
+    "body": [
+        {"type": "Image", "url": "https://adaptivecards.io/content/airplane.png"},
+        {"type": "TextBlock", "text": "${n_adults} Adult(s), ${n_children} Child(ren)"},
+        {"type": "ColumnSet", "columns": [{"items": [{"type": "TextBlock", "text": "${or_city}"}]}]},
+    ],
+}
+
+
+class CardTemplateTest(aiounittest.AsyncTestCase):
+    def test_render_fills_slots_without_touching_the_template(self):
+        template = CardTemplate(CARD)
+        card = template.render({"n_adults": 2, "n_children": 0, "or_city": "Paris"})
+
+        self.assertEqual(template.slots, {"n_adults", "n_children", "or_city"})
+        self.assertEqual(card["body"][1]["text"], "2 Adult(s), 0 Child(ren)")
+        self.assertEqual(card["body"][2]["columns"][0]["items"][0]["text"], "Paris")
+        self.assertEqual(CARD["body"][1]["text"], "${n_adults} Adult(s), ${n_children} Child(ren)")
+        # Static parts are shared instead of copied.
+        self.assertIs(card["body"][0], CARD["body"][0])
+
+    def test_values_need_no_escaping(self):
+        value = 'Saint "Denis" \\ ${or_city}\n'
+        card = CardTemplate(CARD).render({"or_city": value})
+        self.assertEqual(card["body"][2]["columns"][0]["items"][0]["text"], value)
+        self.assertEqual(json.loads(json.dumps(card))["body"][2]["columns"][0]["items"][0]["text"], value)
+
+    def test_missing_slots_are_left_as_written(self):
+        card = CardTemplate(CARD).render({"n_adults": 1})
+        self.assertEqual(card["body"][1]["text"], "1 Adult(s), ${n_children} Child(ren)")
+
+    def test_flight_itinerary_card(self):
+        details = BookingDetails("Paris", "Berlin", "2023-02-10", "2023-02-15", "300 Euro", "2", "1")
+        attachment = FlightItineraryCard(details).create_attachment()
+
+        self.assertIs(
+            CardTemplate.load("bots/resources/FlightItineraryCard.json"),
+            CardTemplate.load("bots/resources/FlightItineraryCard.json"),
+        )
+        self.assertNotIn("${", json.dumps(attachment.content))
+        self.assertIn("Paris", json.dumps(attachment.content))
@@ -0,0 +1,42 @@
+import os
+import tempfile
+
+import aiounittest
+
+from cassette_recognizer import Cassette, CassetteMiss, RecordingRecognizer, ReplayRecognizer
+from config import DefaultConfig
+from flight_booking_recognizer import FlightBookingRecognizer
+from tests.utils import StaticRecognizer, make_context
+
+
+class CassetteRecognizerTest(aiounittest.AsyncTestCase):
+    async def test_recorded_results_are_replayed_from_the_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cassette.json")
+            inner = StaticRecognizer()
+            recorder = RecordingRecognizer(inner, Cassette.load(path))
+            await recorder.recognize(make_context("Book a flight"))
+            await recorder.recognize(make_context("book a  flight"))
+
+            replay = ReplayRecognizer(Cassette.load(path))
+            result = await replay.recognize(make_context("BOOK A FLIGHT"))
+
+        self.assertEqual(inner.calls, 2)
+        self.assertEqual(len(replay.cassette), 1)
+        self.assertEqual(result.text, "BOOK A FLIGHT")
+        self.assertEqual({name: intent.score for name, intent in result.intents.items()}, {"None": 1.0})
+
+    async def test_replayed_results_are_copies(self):
+        cassette = Cassette("unused.json")
+        cassette.put("Paris", await StaticRecognizer().recognize(make_context("Paris")))
+        replay = ReplayRecognizer(cassette)
+
+        (await replay.recognize(make_context("Paris"))).entities["city"] = ["Paris"]
+        self.assertEqual((await replay.recognize(make_context("Paris"))).entities, {})
+
+    async def test_unrecorded_utterances_fail_instead_of_degrading(self):
+        recognizer = FlightBookingRecognizer(DefaultConfig(), recognizer=ReplayRecognizer(Cassette("unused.json")))
+
+        with self.assertRaises(CassetteMiss):
+            await recognizer.recognize(make_context("Paris"))
+        self.assertEqual(recognizer.degraded_recognitions.value(), 0)
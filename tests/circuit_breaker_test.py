@@ -0,0 +1,129 @@
+import asyncio
+
+import aiounittest
+from botbuilder.core import IntentScore, Recognizer, RecognizerResult, TurnContext
+
+from config import DefaultConfig
+from flight_booking_recognizer import FlightBookingRecognizer
+from helpers.circuit_breaker import CircuitBreaker
+from tests.utils import FakeClock, make_context
+
+
+class FlakyConfig(DefaultConfig):
+    LUIS_CACHE_SIZE = 0
+    LUIS_DEADLINE = 0.05
+    LUIS_BREAKER_FAILURES = 2
+    OFFLINE_RECOGNIZER_DEADLINE = 0.05
+
+
+class SlowRecognizer(Recognizer):
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    async def recognize(self, turn_context: TurnContext) -> RecognizerResult:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return RecognizerResult(text=turn_context.activity.text, intents={"BookFlight": IntentScore(0.9)}, entities={})
+
+
+class SlowLocalRecognizer:
+    """Stands in for OfflineFlightBookingRecognizer."""
+
+    def __init__(self, delay: float, score: float):
+        self.delay = delay
+        self.score = score
+        self.calls = 0
+
+    async def recognize_text_async(self, text: str) -> RecognizerResult:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return RecognizerResult(text=text, intents={"Cancel": IntentScore(self.score)}, entities={})
+
+    @staticmethod
+    def is_confident(recognizer_result: RecognizerResult) -> bool:
+        return recognizer_result.intents["Cancel"].score >= 0.8
+
+
+class CircuitBreakerTest(aiounittest.AsyncTestCase):
+    def test_opens_after_consecutive_failures_and_probes_after_the_timeout(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker("luis", failure_threshold=2, reset_timeout=10, clock=clock)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+        clock.now = 10
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        clock.now = 20
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.stats(), {"state": CircuitBreaker.CLOSED, "consecutive_failures": 0, "rejected": 2})
+        self.assertEqual(breaker.transitions.value(CircuitBreaker.OPEN), 2)
+
+    async def test_slow_luis_degrades_then_is_skipped(self):
+        inner = SlowRecognizer(delay=1.0)
+        recognizer = FlightBookingRecognizer(FlakyConfig(), recognizer=inner)
+
+        for _ in range(3):
+            context = make_context("Paris")
+            result = await asyncio.wait_for(recognizer.recognize(context), 0.5)
+            self.assertEqual(result.intents, {})
+            self.assertTrue(FlightBookingRecognizer.is_degraded(context))
+
+        # The third query didn't wait for LUIS: the circuit opened after the second timeout.
+        self.assertEqual(inner.calls, 2)
+        self.assertEqual(recognizer.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(recognizer.degraded_recognitions.value(), 3)
+
+    async def test_answers_within_the_deadline_are_not_degraded(self):
+        recognizer = FlightBookingRecognizer(FlakyConfig(), recognizer=SlowRecognizer(delay=0))
+        context = make_context("Paris")
+
+        result = await recognizer.recognize(context)
+        self.assertIn("BookFlight", result.intents)
+        self.assertFalse(FlightBookingRecognizer.is_degraded(context))
+
+    async def test_slow_offline_recognizer_does_not_open_the_luis_breaker(self):
+        recognizer = FlightBookingRecognizer(
+            FlakyConfig(), recognizer=SlowRecognizer(delay=0), local_recognizer=SlowLocalRecognizer(1.0, 0.9)
+        )
+
+        for _ in range(3):
+            context = make_context("Paris")
+            result = await recognizer.recognize(context)
+            self.assertIn("BookFlight", result.intents)
+            self.assertFalse(FlightBookingRecognizer.is_degraded(context))
+        self.assertEqual(recognizer.breaker.state, CircuitBreaker.CLOSED)
+
+    async def test_degraded_luis_answers_with_the_offline_result(self):
+        local_recognizer = SlowLocalRecognizer(0, 0.5)
+        recognizer = FlightBookingRecognizer(
+            FlakyConfig(), recognizer=SlowRecognizer(delay=1.0), local_recognizer=local_recognizer
+        )
+        context = make_context("Paris")
+
+        result = await recognizer.recognize(context)
+        self.assertIn("Cancel", result.intents)
+        self.assertTrue(FlightBookingRecognizer.is_degraded(context))
+        self.assertEqual(local_recognizer.calls, 1)
+
+    async def test_slow_offline_recognizer_and_luis_degrade_within_both_deadlines(self):
+        recognizer = FlightBookingRecognizer(
+            FlakyConfig(), recognizer=SlowRecognizer(delay=1.0), local_recognizer=SlowLocalRecognizer(1.0, 0.9)
+        )
+        context = make_context("Paris")
+
+        result = await asyncio.wait_for(recognizer.recognize(context), 0.5)
+        self.assertEqual(result.intents, {})
+        self.assertTrue(FlightBookingRecognizer.is_degraded(context))
@@ -1,3 +1,5 @@
+import os
+
 import aiounittest
 from botbuilder.core import TurnContext, ConversationState, MemoryStorage
 from botbuilder.core.adapters import TestAdapter
@@ -9,7 +11,22 @@ from dialogs import MainDialog, BookingDialog
 from flight_booking_recognizer import FlightBookingRecognizer
 
 
+CASSETTE = os.path.join(os.path.dirname(__file__), "cassettes", "flight_booking.json")
+
+
 class FlightBookingTest(aiounittest.AsyncTestCase):
+    """
+    The dialogs against the live LUIS app, skipped without its credentials. With LuisCassetteMode=record, the
+    recognitions are added to the cassette replayed by FlightBookingReplayTest (see .github/workflows).
+    """
+
+    def create_recognizer(self) -> FlightBookingRecognizer:
+        config = DefaultConfig()
+        if not (config.LUIS_APP_ID and config.LUIS_API_KEY and config.LUIS_API_HOST_NAME):
+            self.skipTest("LuisAppId, LuisAPIKey and LuisAPIHostName aren't set")
+        config.LUIS_CASSETTE = CASSETTE if config.LUIS_CASSETTE_MODE == "record" else ""
+        return FlightBookingRecognizer(config)
+
     async def execute_booking_dialog(self, turn_context: TurnContext, dialog_id: str,
                                      booking_details: BookingDetails = None):
         dialog_context = await self.dialogs.create_context(turn_context)
@@ -27,13 +44,12 @@ class FlightBookingTest(aiounittest.AsyncTestCase):
         self.conversation_state = ConversationState(MemoryStorage())
         self.dialogs_state = self.conversation_state.create_property("dialog_state")
         self.dialogs = DialogSet(self.dialogs_state)
+        luis_recognizer = self.create_recognizer()
         if dialog_id == BookingDialog.__name__:
-            self.dialogs.add(BookingDialog())
+            self.dialogs.add(BookingDialog(luis_recognizer=luis_recognizer))
             adapter = TestAdapter(lambda ctx: self.execute_booking_dialog(ctx, dialog_id, booking_details))
         else:
-            config = DefaultConfig()
-            luis_recognizer = FlightBookingRecognizer(config)
-            booking_dialog = BookingDialog()
+            booking_dialog = BookingDialog(luis_recognizer=luis_recognizer)
             self.dialogs.add(MainDialog(luis_recognizer, booking_dialog))
             adapter = TestAdapter(lambda ctx: self.execute_booking_dialog(ctx, MainDialog.__name__))
         return adapter
@@ -69,4 +85,15 @@ class FlightBookingTest(aiounittest.AsyncTestCase):
         adapter = self.setup_booking_dialogs(MainDialog.__name__)
         step1 = await adapter.test("Yo!", "Hello! What can I help you with today?")
         step2 = await step1.send("I love you!")
-        await step2.assert_reply("Sorry, I only book flights. Can you please rephrase your request?")
\ No newline at end of file
+        await step2.assert_reply("Sorry, I only book flights. Can you please rephrase your request?")
+
+class FlightBookingReplayTest(FlightBookingTest):
+    """The same dialogs with the LUIS results recorded in the cassette, skipped until it is recorded."""
+
+    def create_recognizer(self) -> FlightBookingRecognizer:
+        if not os.path.exists(CASSETTE):
+            self.skipTest(f"{CASSETTE} isn't recorded yet")
+        config = DefaultConfig()
+        config.LUIS_CASSETTE = CASSETTE
+        config.LUIS_CASSETTE_MODE = "replay"
+        return FlightBookingRecognizer(config)
@@ -0,0 +1,56 @@
+import os
+import tempfile
+
+import aiounittest
+from botbuilder.dialogs.prompts import PromptOptions
+
+from dialogs.texttoluisprompt import TextToLuisPrompt
+from helpers.gazetteer import Gazetteer
+from tests.utils import StaticRecognizer, make_context
+
+
+class GazetteerTest(aiounittest.AsyncTestCase):
+    def test_names_match_on_folded_token_boundaries(self):
+        gazetteer = Gazetteer(["Zürich", "New York", "New York City", "Rome"])
+
+        self.assertEqual(gazetteer.match("to ZURICH please").text, "ZURICH")
+        self.assertEqual(gazetteer.match("to ZURICH please").name, "Zürich")
+        self.assertEqual(gazetteer.match("new york city, then rome").text, "new york city")
+        self.assertEqual([match.text for match in gazetteer.find_all("New York or Rome?")], ["New York", "Rome"])
+        self.assertIsNone(gazetteer.match("romeo and juliet"))
+        self.assertIsNone(gazetteer.match("new"))
+
+    def test_cities_file(self):
+        gazetteer = Gazetteer().load("cognitiveModels/cities.txt")
+        self.assertIn("la paz", gazetteer)
+        self.assertIn("le havre", gazetteer)
+        for not_a_city in ("detrut", "barkcelona", "coruscant", "hyrule", "neverland", "europe"):
+            self.assertNotIn(not_a_city, gazetteer)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cities.txt")
+            with open(path, "w", encoding="utf-8") as names_file:
+                names_file.write("# Nordics\nReykjavík\n\n")
+            gazetteer.load(path)
+        self.assertIn("reykjavik", gazetteer)
+
+    def test_ambiguous_names_need_a_cue_or_a_capital(self):
+        gazetteer = Gazetteer(["Paris"])
+        gazetteer.add("Nice", ambiguous=True)
+
+        for text in ("that's nice", "Nice, thanks", "nice weather in paris"):
+            self.assertEqual([match.name for match in gazetteer.find_all(text)], ["Paris"] if "paris" in text else [])
+        for text in ("fly to nice", "from nice", "we love Nice in May"):
+            self.assertEqual(gazetteer.match(text).name, "Nice")
+
+    async def test_city_prompt_only_asks_luis_for_unknown_cities(self):
+        recognizer = StaticRecognizer()
+        prompt = TextToLuisPrompt("dst_city", recognizer, gazetteer=Gazetteer(["Paris"]))
+
+        result = await prompt.on_recognize(make_context("paris please"), {}, PromptOptions())
+        self.assertEqual((result.succeeded, result.value), (True, "Paris"))
+        self.assertEqual(recognizer.calls, 0)
+
+        result = await prompt.on_recognize(make_context("Gotham"), {}, PromptOptions())
+        self.assertFalse(result.succeeded)
+        self.assertEqual(recognizer.calls, 1)
@@ -0,0 +1,66 @@
+import json
+
+import aiounittest
+from aiohttp.test_utils import TestServer
+from botbuilder.ai.luis import LuisApplication
+from botbuilder.core import TurnContext
+from botbuilder.core.adapters import TestAdapter
+from botbuilder.schema import Activity, ActivityTypes, ChannelAccount, ConversationAccount
+from botframework.connector.aio import ConnectorClient
+from botframework.connector.auth import MicrosoftAppCredentials
+
+from benchmarks.load_test import StubConnector
+from benchmarks.luis_server import LuisStandIn, build_response_table, create_app
+from helpers.http_pool import HttpPool
+from pooled_luis_recognizer import PooledLuisRecognizer
+
+
+class HttpPoolTest(aiounittest.AsyncTestCase):
+    async def test_connector_replies_reuse_a_connection(self):
+        connector = StubConnector()
+        pool = HttpPool()
+        async with TestServer(connector.create_app()) as server:
+            client = ConnectorClient(MicrosoftAppCredentials.empty(), base_url=str(server.make_url("")))
+            client.config.pipeline = pool.create_pipeline(client.config)
+            for text in ("Hello", "Where to?"):
+                await client.conversations.send_to_conversation(
+                    "conversation", Activity(type=ActivityTypes.message, text=text)
+                )
+            await pool.close()
+
+        self.assertEqual([reply["text"] for reply in connector.replies["conversation"]], ["Hello", "Where to?"])
+        self.assertEqual(pool.requests.value("new"), 1)
+        self.assertEqual(pool.requests.value("reused"), 1)
+
+    async def test_requests_in_use_until_released(self):
+        pool = HttpPool()
+        async with TestServer(StubConnector().create_app()) as server:
+            async with pool.request("GET", str(server.make_url("/"))):
+                self.assertEqual(pool.in_use(), 1)
+            self.assertEqual(pool.in_use(), 0)
+            await pool.close()
+
+    async def test_luis_predictions_go_through_the_pool(self):
+        with open("cognitiveModels/FlightBooking.json", encoding="utf-8") as corpus_file:
+            table = build_response_table(json.load(corpus_file)["utterances"])
+        pool = HttpPool()
+        async with TestServer(create_app(LuisStandIn(table))) as server:
+            application = LuisApplication(
+                "00000000-0000-0000-0000-000000000000",
+                "00000000-0000-0000-0000-000000000000",
+                str(server.make_url("")).rstrip("/"),
+            )
+            recognizer = PooledLuisRecognizer(application, pool)
+            for _ in range(2):
+                context = TurnContext(TestAdapter(), Activity(
+                    type=ActivityTypes.message,
+                    text="book me from colorado to athens",
+                    conversation=ConversationAccount(id="conversation"),
+                    from_property=ChannelAccount(id="user"),
+                ))
+                result = await recognizer.recognize(context)
+                self.assertEqual(result.get_top_scoring_intent().intent, "BookFlight")
+            await pool.close()
+
+        self.assertEqual(pool.requests.value("new"), 1)
+        self.assertEqual(pool.requests.value("reused"), 1)
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import aiounittest
+
+from helpers.lazy import Lazy, build_all, warm_up
+
+
+class LazyTest(aiounittest.AsyncTestCase):
+    def test_components_are_built_once_after_their_dependencies(self):
+        built = []
+
+        def factory(name, *dependencies):
+            def build():
+                values = [dependency.get() for dependency in dependencies]
+                built.append(name)
+                return (name, values)
+            return build
+
+        config = Lazy("config", factory("config"))
+        recognizer = Lazy("recognizer", factory("recognizer", config))
+        bot = Lazy("bot", factory("bot", config, recognizer))
+
+        self.assertFalse(bot.is_built)
+        self.assertEqual(bot.get(), ("bot", [("config", []), ("recognizer", [("config", [])])]))
+        self.assertIs(bot.get(), bot.get())
+        self.assertEqual(built, ["config", "recognizer", "bot"])
+        self.assertEqual(list(build_all([config, recognizer, bot])), ["config", "recognizer", "bot"])
+        self.assertEqual(built, ["config", "recognizer", "bot"])
+
+    async def test_warm_up_builds_off_the_event_loop(self):
+        component = Lazy("component", lambda: "value")
+        times = await warm_up([component])
+        self.assertEqual(list(times), ["component"])
+        self.assertEqual(component.get(), "value")
+
+    async def test_get_async_waits_for_the_warm_up_without_blocking_the_loop(self):
+        builds = []
+
+        def build():
+            builds.append("component")
+            time.sleep(0.2)
+            return "value"
+
+        component = Lazy("component", build)
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while not component.is_built:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        warm_up_task = asyncio.ensure_future(warm_up([component]))
+        await asyncio.sleep(0.05)
+        values = await asyncio.gather(component.get_async(), component.get_async(), tick())
+
+        self.assertEqual(values[:2], ["value", "value"])
+        self.assertEqual(builds, ["component"])
+        self.assertGreater(ticks, 5)
+        await warm_up_task
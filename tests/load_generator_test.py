@@ -0,0 +1,74 @@
+import json
+import random
+
+import aiohttp
+import aiounittest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from botbuilder.core import BotFrameworkAdapterSettings, ConversationState, MemoryStorage, UserState
+from botbuilder.core import NullTelemetryClient
+from botbuilder.schema import Activity
+
+from adapter_with_error_handler import AdapterWithErrorHandler
+from benchmarks.load_test import LoadTest, Stage, StubConnector, UtterancePools
+from benchmarks.luis_server import LuisStandIn, build_response_table, create_app
+from bots import DialogAndWelcomeBot
+from config import DefaultConfig
+from dialogs import BookingDialog, MainDialog
+from flight_booking_recognizer import FlightBookingRecognizer
+from helpers.http_pool import HttpPool
+
+
+def create_bot_app(luis_url: str, http_pool: HttpPool) -> web.Application:
+    """/api/messages of the bot, recognizing with LUIS at `luis_url` and replying through the Bot Connector."""
+    config = DefaultConfig()
+    config.LUIS_APP_ID = "00000000-0000-0000-0000-000000000000"
+    config.LUIS_API_KEY = "00000000-0000-0000-0000-000000000000"
+    config.LUIS_API_HOST_NAME = luis_url
+    config.LUIS_CACHE_SIZE = 0
+
+    conversation_state = ConversationState(MemoryStorage())
+    adapter = AdapterWithErrorHandler(BotFrameworkAdapterSettings("", ""), conversation_state, http_pool)
+    recognizer = FlightBookingRecognizer(config, http_pool=http_pool)
+    dialog = MainDialog(recognizer, BookingDialog(luis_recognizer=recognizer))
+    bot = DialogAndWelcomeBot(conversation_state, UserState(MemoryStorage()), dialog, NullTelemetryClient())
+
+    async def messages(req: web.Request) -> web.Response:
+        activity = Activity().deserialize(await req.json())
+        await adapter.process_activity(activity, req.headers.get("Authorization", ""), bot.on_turn)
+        return web.Response(status=200)
+
+    app = web.Application()
+    app.router.add_post("/api/messages", messages)
+    return app
+
+
+class LoadGeneratorTest(aiounittest.AsyncTestCase):
+    async def test_conversations_against_the_luis_stand_in(self):
+        with open("cognitiveModels/FlightBooking.json", encoding="utf-8") as corpus_file:
+            utterances = json.load(corpus_file)["utterances"]
+        random.seed(0)
+
+        connector = StubConnector()
+        http_pool = HttpPool()
+        async with TestServer(create_app(LuisStandIn(build_response_table(utterances)))) as luis_server:
+            async with TestServer(connector.create_app()) as connector_server:
+                bot_app = create_bot_app(str(luis_server.make_url("")).rstrip("/"), http_pool)
+                async with TestServer(bot_app) as bot_server:
+                    load_test = LoadTest(
+                        str(bot_server.make_url("/api/messages")),
+                        str(connector_server.make_url("")).rstrip("/"),
+                        connector,
+                        UtterancePools(utterances),
+                        timeout=10,
+                    )
+                    stage = Stage(concurrency=1)
+                    async with aiohttp.ClientSession() as session:
+                        for _ in range(2):
+                            await load_test.conversation(session, stage)
+            await http_pool.close()
+
+        report = stage.report()
+        self.assertEqual(report["error_rate"], 0.0)
+        self.assertEqual(report["conversations_completed"], 2)
+        self.assertGreater(connector.received, report["turns"])
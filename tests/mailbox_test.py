@@ -0,0 +1,73 @@
+import asyncio
+
+import aiounittest
+
+from helpers.mailbox import ConversationMailboxes, MailboxFull
+
+
+class MailboxTest(aiounittest.AsyncTestCase):
+    async def test_turns_of_a_conversation_run_in_order_one_at_a_time(self):
+        mailboxes = ConversationMailboxes()
+        events = []
+
+        async def turn(name: str, delay: float):
+            async with mailboxes.turn(("test", "conversation")):
+                events.append(f"start {name}")
+                await asyncio.sleep(delay)
+                events.append(f"end {name}")
+
+        await asyncio.gather(turn("first", 0.02), turn("second", 0), turn("third", 0.01))
+
+        self.assertEqual(
+            events, ["start first", "end first", "start second", "end second", "start third", "end third"]
+        )
+        self.assertEqual(mailboxes.waited.value(), 2)
+        self.assertEqual(len(mailboxes), 0)
+
+    async def test_conversations_run_concurrently(self):
+        mailboxes = ConversationMailboxes()
+        both_running = asyncio.Event()
+        running = set()
+
+        async def turn(conversation_id: str):
+            async with mailboxes.turn(("test", conversation_id)):
+                running.add(conversation_id)
+                if len(running) == 2:
+                    both_running.set()
+                await asyncio.wait_for(both_running.wait(), 1)
+
+        await asyncio.gather(turn("a"), turn("b"))
+        self.assertEqual(mailboxes.waited.value(), 0)
+
+    async def test_failed_turns_release_the_mailbox(self):
+        mailboxes = ConversationMailboxes()
+
+        with self.assertRaises(ValueError):
+            async with mailboxes.turn(("test", "conversation")):
+                raise ValueError("turn failed")
+
+        self.assertEqual(len(mailboxes), 0)
+        async with mailboxes.turn(("test", "conversation")):
+            self.assertEqual(len(mailboxes), 1)
+
+    async def test_turns_beyond_the_waiting_limit_are_rejected(self):
+        mailboxes = ConversationMailboxes(max_waiting=1)
+        release = asyncio.Event()
+
+        async def turn():
+            async with mailboxes.turn(("test", "conversation")):
+                await release.wait()
+
+        running = asyncio.ensure_future(turn())
+        waiting = asyncio.ensure_future(turn())
+        await asyncio.sleep(0)
+        with self.assertRaises(MailboxFull):
+            async with mailboxes.turn(("test", "conversation")):
+                pass
+        async with mailboxes.turn(("test", "other")):
+            pass
+
+        release.set()
+        await asyncio.gather(running, waiting)
+        self.assertEqual(mailboxes.rejected.value(), 1)
+        self.assertEqual(len(mailboxes), 0)
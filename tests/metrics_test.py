@@ -0,0 +1,66 @@
+import aiounittest
+
+from helpers.metrics import ActiveConversations, Histogram, TurnMetrics
+from tests.utils import FakeClock
+
+
+class MetricsTest(aiounittest.AsyncTestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("latency_seconds", "Latency.", ["phase"], buckets=[0.1, 1.0])
+        for value in (0.05, 0.5, 0.5, 2.0):
+            histogram.observe(value, "recognize")
+
+        self.assertEqual(list(histogram.samples()), [
+            'latency_seconds_bucket{phase="recognize",le="0.1"} 1',
+            'latency_seconds_bucket{phase="recognize",le="1.0"} 3',
+            'latency_seconds_bucket{phase="recognize",le="+Inf"} 4',
+            'latency_seconds_sum{phase="recognize"} 3.05',
+            'latency_seconds_count{phase="recognize"} 4',
+        ])
+
+    def test_phase_timer_records_failures(self):
+        clock = FakeClock()
+        metrics = TurnMetrics(clock=clock)
+        with self.assertRaises(ValueError):
+            with metrics.time(TurnMetrics.RECOGNIZE):
+                clock.now = 0.25
+                raise ValueError("LUIS failed")
+
+        self.assertEqual(metrics.phase_seconds.count(TurnMetrics.RECOGNIZE), 1)
+        self.assertIn('bot_turn_phase_seconds_sum{phase="recognize"} 0.25', metrics.render())
+
+    def test_active_conversations_expire(self):
+        clock = FakeClock()
+        active = ActiveConversations(window=10, clock=clock)
+        active.touch("a")
+        clock.now = 5
+        active.touch("b")
+        active.touch("a")
+        clock.now = 12
+        active.touch("c")
+
+        self.assertEqual(active.count(), 3)
+        clock.now = 15.5
+        self.assertEqual(active.count(), 1)
+
+    def test_active_conversations_pruned_without_scrape(self):
+        clock = FakeClock()
+        active = ActiveConversations(window=10, clock=clock)
+        for index in range(1000):
+            clock.now = index
+            active.touch(str(index))
+
+        # Only the conversations of the last 10 seconds are held, count() was never called.
+        self.assertEqual(len(active._last_seen), 11)
+
+    def test_render_exposition_format(self):
+        metrics = TurnMetrics()
+        metrics.intents.inc("BookFlight")
+        metrics.intents.inc("BookFlight")
+        metrics.track_activity("message", "conversation-1")
+
+        text = metrics.render()
+        self.assertIn("# TYPE bot_intents_total counter", text)
+        self.assertIn('bot_intents_total{intent="BookFlight"} 2', text)
+        self.assertIn('bot_turns_total{type="message"} 1', text)
+        self.assertIn("bot_active_conversations 1", text)
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import tempfile
+
+import aiounittest
+
+from helpers.luis_helper import Intent, LuisHelper
+from offline_recognizer import IntentModel, OfflineFlightBookingRecognizer
+from tests.utils import StaticRecognizer, make_context
+
+MODEL = IntentModel.from_luis_app("cognitiveModels/FlightBooking.json")
+
+
+class OfflineRecognizerTest(aiounittest.AsyncTestCase):
+    async def test_booking_details_through_luis_helper(self):
+        recognizer = OfflineFlightBookingRecognizer(MODEL)
+        intent, booking_details = await LuisHelper.execute_luis_query(
+            recognizer,
+            make_context("I want to go to Paris from Rome for the 10th February 2023 and return the 15th"
+                         " February 2023. For 100€, 1 adult and 2 children."),
+        )
+
+        self.assertEqual(intent, Intent.BOOK_FLIGHT.value)
+        self.assertEqual(booking_details.dst_city, "Paris")
+        self.assertEqual(booking_details.or_city, "Rome")
+        self.assertEqual((booking_details.str_date, booking_details.end_date), ("2023-02-10", "2023-02-15"))
+        self.assertEqual(booking_details.budget, "100 Euro")
+        self.assertEqual((booking_details.n_adults, booking_details.n_children), ("1", "2"))
+
+    async def test_cancel_intent(self):
+        recognizer = OfflineFlightBookingRecognizer(MODEL)
+        result = await recognizer.recognize(make_context("cancel that"))
+        self.assertEqual(list(result.intents), [Intent.CANCEL.value])
+
+    async def test_low_confidence_falls_back(self):
+        fallback = StaticRecognizer()
+        recognizer = OfflineFlightBookingRecognizer(MODEL, threshold=1.01, fallback=fallback)
+        result = await recognizer.recognize(make_context("cancel that"))
+        self.assertEqual(list(result.intents), ["None"])
+        self.assertEqual(fallback.calls, 1)
+
+    async def test_recognition_does_not_block_the_event_loop(self):
+        recognizer = OfflineFlightBookingRecognizer(MODEL)
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        ticker = asyncio.ensure_future(tick())
+        await asyncio.sleep(0)
+        result = await recognizer.recognize(make_context("Paris to Rome on the 2nd of August for 100 dollars"))
+        ticker.cancel()
+
+        self.assertIn("datetime", result.entities)
+        self.assertGreater(ticks, 2)
+
+    async def test_entities_parsed_in_worker_processes(self):
+        utterance = "Paris to Rome on the 2nd of August for 100 dollars"
+        recognizer = OfflineFlightBookingRecognizer(MODEL, workers=1)
+        try:
+            result = await recognizer.recognize_text_async(utterance)
+        finally:
+            recognizer.close()
+
+        self.assertEqual(result.entities, OfflineFlightBookingRecognizer(MODEL).recognize_text(utterance).entities)
+        self.assertIn("money", result.entities)
+
+    def test_prebuilt_artifact_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "FlightBooking.npz")
+            MODEL.save(path)
+            loaded = IntentModel.load(path)
+
+        tokens = ["fly", "to", "paris"]
+        self.assertEqual(loaded.labels, MODEL.labels)
+        self.assertEqual(loaded.cities, MODEL.cities)
+        self.assertEqual(loaded.score(tokens).tolist(), MODEL.score(tokens).tolist())
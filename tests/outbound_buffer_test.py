@@ -0,0 +1,64 @@
+import aiounittest
+from aiohttp.test_utils import TestServer
+from botbuilder.core import BotFrameworkAdapterSettings, ConversationState, MemoryStorage, TurnContext
+from botbuilder.schema import Activity, ActivityTypes, ChannelAccount, ConversationAccount
+
+from adapter_with_error_handler import AdapterWithErrorHandler
+from benchmarks.load_test import StubConnector
+from helpers.outbound_buffer import send_immediately
+
+
+def make_activity(service_url: str) -> Activity:
+    return Activity(
+        type=ActivityTypes.message,
+        id="activity",
+        text="hi",
+        channel_id="test",
+        service_url=service_url,
+        conversation=ConversationAccount(id="conversation"),
+        from_property=ChannelAccount(id="user"),
+        recipient=ChannelAccount(id="bot"),
+    )
+
+
+class OutboundBufferTest(aiounittest.AsyncTestCase):
+    async def test_turn_activities_are_sent_in_order_at_turn_end(self):
+        connector = StubConnector()
+        adapter = AdapterWithErrorHandler(
+            BotFrameworkAdapterSettings("", ""), ConversationState(MemoryStorage()), batch_outbound=True
+        )
+        received = []
+
+        async def logic(context: TurnContext):
+            await context.send_activity("one")
+            received.append(connector.received)
+            await send_immediately(context, "two")
+            received.append(connector.received)
+            await context.send_activity("three")
+            received.append(connector.received)
+
+        async with TestServer(connector.create_app()) as server:
+            await adapter.process_activity(make_activity(str(server.make_url(""))), "", logic)
+
+        # "one" is held until "two" must go out, "three" until the end of the turn.
+        self.assertEqual(received, [0, 2, 2])
+        self.assertEqual([reply["text"] for reply in connector.replies["conversation"]], ["one", "two", "three"])
+
+    async def test_error_messages_follow_the_held_activities(self):
+        connector = StubConnector()
+        conversation_state = ConversationState(MemoryStorage())
+        adapter = AdapterWithErrorHandler(BotFrameworkAdapterSettings("", ""), conversation_state, batch_outbound=True)
+
+        async def logic(context: TurnContext):
+            await conversation_state.load(context)
+            await context.send_activity("one")
+            raise Exception("[OutboundBufferTest]: failed turn")
+
+        async with TestServer(connector.create_app()) as server:
+            await adapter.process_activity(make_activity(str(server.make_url(""))), "", logic)
+
+        self.assertEqual([reply["text"] for reply in connector.replies["conversation"]], [
+            "one",
+            "The bot encountered an error or bug.",
+            "To continue to run this bot, please fix the bot source code.",
+        ])
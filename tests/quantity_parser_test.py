@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+import aiounittest
+from botbuilder.dialogs.prompts import NumberPrompt, PromptOptions
+
+from dialogs.local_number_prompt import LocalNumberPrompt
+from dialogs.texttoluisprompt import TextToLuisPrompt
+from helpers.quantity_parser import parse_money, parse_number
+from tests.utils import StaticRecognizer, make_context
+
+
+class QuantityParserTest(aiounittest.AsyncTestCase):
+    def test_money_with_an_explicit_currency(self):
+        self.assertEqual(parse_money("For 100€, 1 adult"), (100, "Euro"))
+        self.assertEqual(parse_money("$1,500 max"), (1500, "Dollar"))
+        self.assertEqual(parse_money("about 500 dollars"), (500, "Dollar"))
+        self.assertEqual(parse_money("2.5k usd"), (2500, "United States dollar"))
+        self.assertEqual(parse_money("twenty three hundred pounds"), (2300, "Pound"))
+        self.assertEqual(parse_money("one bitcoin"), (1, "Bitcoin"))
+        self.assertEqual(parse_money("99.5 euros"), (99.5, "Euro"))
+        self.assertIsNone(parse_money("500"))
+        self.assertIsNone(parse_money("10 euros 50"))
+        self.assertIsNone(parse_money("the million dollar question"))
+
+    def test_cardinal_numbers(self):
+        self.assertEqual(parse_number("2"), Decimal(2))
+        self.assertEqual(parse_number("we are twenty-one adults"), Decimal(21))
+        self.assertEqual(parse_number("a hundred and five"), Decimal(105))
+        self.assertEqual(parse_number("12 thousand"), Decimal(12000))
+        self.assertIsNone(parse_number("leaving 8/31"))
+        self.assertIsNone(parse_number("the 2nd"))
+        self.assertIsNone(parse_number("one last try"))
+        self.assertIsNone(parse_number("this one"))
+        self.assertIsNone(parse_number("two and a half"))
+
+    async def test_budget_prompt_only_asks_luis_for_unparsed_amounts(self):
+        recognizer = StaticRecognizer()
+        prompt = TextToLuisPrompt("budget", recognizer)
+
+        result = await prompt.on_recognize(make_context("300 euros"), {}, PromptOptions())
+        self.assertEqual((result.succeeded, result.value), (True, "300 Euro"))
+        self.assertEqual(recognizer.calls, 0)
+
+        result = await prompt.on_recognize(make_context("three hundred"), {}, PromptOptions())
+        self.assertFalse(result.succeeded)
+        self.assertEqual(recognizer.calls, 1)
+
+    async def test_number_prompt_falls_back_to_recognizers_text(self):
+        prompt = LocalNumberPrompt(NumberPrompt.__name__)
+
+        for text, value in (("2 adults", Decimal(2)), ("two and a half", Decimal("2.5"))):
+            result = await prompt.on_recognize(make_context(text), {}, PromptOptions())
+            self.assertEqual((result.succeeded, result.value), (True, value))
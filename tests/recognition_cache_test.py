@@ -0,0 +1,114 @@
+import asyncio
+
+import aiounittest
+from botbuilder.core import IntentScore, Recognizer, RecognizerResult, TurnContext
+
+from config import DefaultConfig
+from flight_booking_recognizer import FlightBookingRecognizer
+from helpers.recognition_cache import RecognitionCache
+from tests.utils import FakeClock, make_context
+
+
+class BlockedRecognizer(Recognizer):
+    def __init__(self):
+        self.started = asyncio.Event()
+
+    async def recognize(self, turn_context: TurnContext) -> RecognizerResult:
+        self.started.set()
+        await asyncio.Event().wait()
+
+
+class CountingRecognizer(Recognizer):
+    def __init__(self):
+        self.calls = 0
+
+    async def recognize(self, turn_context: TurnContext) -> RecognizerResult:
+        self.calls += 1
+        return RecognizerResult(
+            text=turn_context.activity.text,
+            intents={"BookFlight": IntentScore(0.9)},
+            entities={"call": self.calls},
+        )
+
+
+class RecognitionCacheTest(aiounittest.AsyncTestCase):
+    def test_lru_eviction(self):
+        cache = RecognitionCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), (1, False))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_ttl_and_stale_window(self):
+        clock = FakeClock()
+        cache = RecognitionCache(max_entries=10, ttl=10, stale_ttl=5, clock=clock)
+        cache.put("a", 1)
+        clock.now = 12
+        self.assertEqual(cache.get("a"), (1, True))
+        clock.now = 16
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats(), {"entries": 0, "hits": 0, "stale_hits": 1, "misses": 1, "evictions": 1})
+
+    async def test_recognizer_serves_normalized_repeats_from_cache(self):
+        inner = CountingRecognizer()
+        recognizer = FlightBookingRecognizer(DefaultConfig(), recognizer=inner)
+
+        first = await recognizer.recognize(make_context("Paris"))
+        second = await recognizer.recognize(make_context("  paris "))
+        await recognizer.recognize(make_context("paris", locale="fr-fr"))
+
+        self.assertEqual(inner.calls, 2)
+        self.assertEqual(second.text, "  paris ")
+        self.assertEqual(first.entities, second.entities)
+        self.assertEqual(recognizer.cache_stats["hits"], 1)
+        self.assertEqual(recognizer.cache_stats["misses"], 2)
+
+    async def test_recognizer_revalidates_stale_entries(self):
+        inner = CountingRecognizer()
+        recognizer = FlightBookingRecognizer(DefaultConfig(), recognizer=inner)
+        clock = FakeClock()
+        recognizer._cache._clock = clock
+
+        await recognizer.recognize(make_context("cancel"))
+        clock.now = DefaultConfig.LUIS_CACHE_TTL + 1
+        stale = await recognizer.recognize(make_context("cancel"))
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(stale.entities, {"call": 1})
+        self.assertEqual(inner.calls, 2)
+        fresh = await recognizer.recognize(make_context("cancel"))
+        self.assertEqual(fresh.entities, {"call": 2})
+
+    async def test_close_cancels_refreshes(self):
+        recognizer = FlightBookingRecognizer(DefaultConfig(), recognizer=CountingRecognizer())
+        clock = FakeClock()
+        recognizer._cache._clock = clock
+        await recognizer.recognize(make_context("cancel"))
+
+        blocked = recognizer._recognizer = BlockedRecognizer()
+        clock.now = DefaultConfig.LUIS_CACHE_TTL + 1
+        await recognizer.recognize(make_context("cancel"))
+        await asyncio.wait_for(blocked.started.wait(), 1)
+
+        await recognizer.close()
+        self.assertEqual(recognizer._in_flight.stats()["in_flight"], 0)
+
+    async def test_shared_query_runs_on_a_detached_context(self):
+        contexts = []
+
+        class RecordingRecognizer(CountingRecognizer):
+            async def recognize(self, turn_context: TurnContext) -> RecognizerResult:
+                contexts.append(turn_context)
+                await asyncio.sleep(0.01)
+                return await super().recognize(turn_context)
+
+        recognizer = FlightBookingRecognizer(DefaultConfig(), recognizer=RecordingRecognizer())
+        first, second = make_context("Paris"), make_context("paris")
+        results = await asyncio.gather(recognizer.recognize(first), recognizer.recognize(second))
+
+        self.assertEqual(len(contexts), 1)
+        self.assertNotIn(contexts[0], (first, second))
+        self.assertEqual([result.text for result in results], ["Paris", "paris"])
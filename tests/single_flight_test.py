@@ -0,0 +1,69 @@
+import asyncio
+
+import aiounittest
+
+from helpers.single_flight import SingleFlight
+
+
+class SingleFlightTest(aiounittest.AsyncTestCase):
+    async def test_concurrent_callers_share_one_call(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        async def query():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*[single_flight.do("paris", query) for _ in range(10)])
+
+        self.assertEqual(results, ["result"] * 10)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(single_flight.stats(), {"in_flight": 0, "executed": 1, "coalesced": 9})
+
+    async def test_errors_propagate_to_every_waiter(self):
+        single_flight = SingleFlight()
+
+        async def query():
+            await asyncio.sleep(0.01)
+            raise ValueError("LUIS failed")
+
+        results = await asyncio.gather(
+            single_flight.do("paris", query), single_flight.do("paris", query), return_exceptions=True
+        )
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertNotIn("paris", single_flight)
+
+    async def test_cancelling_one_waiter_keeps_the_shared_call(self):
+        single_flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def query():
+            started.set()
+            await asyncio.sleep(0.01)
+            return "result"
+
+        first = asyncio.ensure_future(single_flight.do("paris", query))
+        second = asyncio.ensure_future(single_flight.do("paris", query))
+        await started.wait()
+        first.cancel()
+
+        self.assertEqual(await second, "result")
+        self.assertTrue(first.cancelled())
+
+    async def test_cancelling_every_waiter_cancels_the_call(self):
+        single_flight = SingleFlight()
+        finished = []
+
+        async def query():
+            await asyncio.sleep(1)
+            finished.append(1)
+
+        waiter = asyncio.ensure_future(single_flight.do("paris", query))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(finished, [])
+        self.assertEqual(len(single_flight), 0)
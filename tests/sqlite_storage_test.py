@@ -0,0 +1,109 @@
+import asyncio
+import contextlib
+import io
+import sqlite3
+import tempfile
+import time
+
+import aiounittest
+
+from booking_details import BookingDetails
+from storage import SqliteStorage
+
+
+class SqliteStorageTest(aiounittest.AsyncTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    async def test_buffered_writes_are_readable_and_persisted(self):
+        storage = SqliteStorage(self.directory.name, shards=4, flush_interval=60)
+        await storage.write({"test/conversations/1": {"details": BookingDetails(dst_city="Paris")}})
+
+        items = await storage.read(["test/conversations/1", "test/conversations/2"])
+        self.assertEqual(list(items), ["test/conversations/1"])
+        self.assertEqual(items["test/conversations/1"]["details"].dst_city, "Paris")
+        await storage.close()
+
+        reopened = SqliteStorage(self.directory.name, shards=4)
+        items = await reopened.read(["test/conversations/1"])
+        self.assertEqual(items["test/conversations/1"]["details"].dst_city, "Paris")
+        await reopened.close()
+
+    async def test_synchronous_commit_and_delete(self):
+        storage = SqliteStorage(self.directory.name, shards=2, write_behind=False)
+        await storage.write({"a": {"count": 1}, "b": {"count": 2}})
+        await storage.delete(["a"])
+        await storage.flush()
+
+        self.assertEqual(await storage.read(["a", "b"]), {"b": {"count": 2}})
+        await storage.close()
+
+    async def test_e_tag_conflict(self):
+        storage = SqliteStorage(self.directory.name)
+        await storage.write({"item": {"e_tag": "*", "count": 1}})
+        item = (await storage.read(["item"]))["item"]
+
+        await storage.write({"item": dict(item, count=2)})
+        with self.assertRaises(KeyError):
+            await storage.write({"item": dict(item, count=3)})
+        self.assertEqual((await storage.read(["item"]))["item"]["count"], 2)
+        await storage.close()
+
+    async def test_synchronous_write_to_several_shards(self):
+        storage = SqliteStorage(self.directory.name, shards=2, flush_interval=0, write_behind=False)
+        # "a" and "d" live in different shards: the first one commits while the e_tag of the second is read.
+        changes = {"a": {"e_tag": "*", "count": 1}, "d": {"e_tag": "*", "count": 2}}
+        self.assertNotEqual(storage._shard("a"), storage._shard("d"))
+        slow_shard = storage._shard("d")
+        select = slow_shard._select
+        slow_shard._select = lambda keys: time.sleep(0.2) or select(keys)
+
+        await asyncio.wait_for(storage.write(changes), 5)
+        items = await storage.read(["a", "d"])
+        self.assertEqual({key: item["count"] for key, item in items.items()}, {"a": 1, "d": 2})
+        await storage.close()
+
+    async def test_e_tag_checked_at_commit(self):
+        storage = SqliteStorage(self.directory.name, shards=1, flush_interval=60)
+        other = SqliteStorage(self.directory.name, shards=1, flush_interval=60)
+        await storage.write({"item": {"e_tag": "*", "count": 1}})
+        await storage.flush()
+        item = (await storage.read(["item"]))["item"]
+
+        # Both writes pass the e_tag check, the one of `other` commits first.
+        await storage.write({"item": dict(item, count=2)})
+        await other.write({"item": dict(item, count=3)})
+        await other.flush()
+        with contextlib.redirect_stderr(io.StringIO()) as errors:
+            await storage.flush()
+        self.assertIn("e_tag conflict", errors.getvalue())
+        await storage.close()
+
+        self.assertEqual((await other.read(["item"]))["item"]["count"], 3)
+        await other.close()
+
+    async def test_failed_commit_is_retried(self):
+        storage = SqliteStorage(self.directory.name, shards=1, flush_interval=0)
+        shard = storage._shard("item")
+        commit, failures = shard._commit, []
+
+        def fail_once(batch, expected):
+            if not failures:
+                failures.append(batch)
+                raise sqlite3.OperationalError("database is locked")
+            return commit(batch, expected)
+
+        shard._commit = fail_once
+        with contextlib.redirect_stderr(io.StringIO()) as errors:
+            await storage.write({"item": {"count": 1}})
+            await storage.flush()
+        self.assertEqual(len(failures), 1)
+        self.assertIn("retrying", errors.getvalue())
+        await storage.close()
+
+        reopened = SqliteStorage(self.directory.name, shards=1)
+        self.assertEqual(await reopened.read(["item"]), {"item": {"count": 1}})
+        await reopened.close()
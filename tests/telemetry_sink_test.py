@@ -0,0 +1,60 @@
+import asyncio
+import contextlib
+import io
+
+import aiounittest
+from botbuilder.core import NullTelemetryClient
+
+from dialogs import BookingDialog
+from helpers.telemetry_sink import BufferedTelemetryClient
+
+
+class RecordingTelemetryClient(NullTelemetryClient):
+    def __init__(self):
+        super().__init__()
+        self.traces = []
+
+    def track_trace(self, name, properties=None, severity=None):
+        self.traces.append((name, properties, severity))
+
+
+class TelemetrySinkTest(aiounittest.AsyncTestCase):
+    async def test_records_are_delivered_in_background(self):
+        backend = RecordingTelemetryClient()
+        client = BufferedTelemetryClient(backend, batch_size=10, flush_interval=0.01)
+        client.track_trace("Info", BookingDialog.generate_step_log("From?", "Paris", "or_city_step"), "INFO")
+
+        self.assertEqual(backend.traces, [])
+        await asyncio.sleep(0.05)
+        self.assertEqual(backend.traces, [
+            ("Info", {"bot": "From?", "user": "Paris", "step": "or_city_step"}, "INFO"),
+        ])
+        self.assertEqual(client.stats()["delivered"], 1)
+
+    async def test_full_buffer_drops_oldest(self):
+        backend = RecordingTelemetryClient()
+        client = BufferedTelemetryClient(backend, capacity=3, batch_size=10, flush_interval=60)
+        for index in range(5):
+            client.track_trace(f"step {index}")
+        await client.drain()
+
+        self.assertEqual([name for name, _, _ in backend.traces], ["step 2", "step 3", "step 4"])
+        self.assertEqual(client.stats(), {"buffered": 0, "delivered": 3, "dropped": 2, "failed": 0})
+
+    async def test_failed_deliveries_are_counted(self):
+        class FailingTelemetryClient(NullTelemetryClient):
+            def track_trace(self, name, properties=None, severity=None):
+                raise ConnectionError("backend unreachable")
+
+        client = BufferedTelemetryClient(FailingTelemetryClient(), flush_interval=60)
+        client.track_trace("Info")
+        with contextlib.redirect_stdout(io.StringIO()):
+            await client.drain()
+
+        self.assertEqual(client.stats()["failed"], 1)
+        self.assertIn('bot_telemetry_records_total{outcome="failed"} 1', list(client.records.samples()))
+
+    def test_delivers_inline_without_event_loop(self):
+        backend = RecordingTelemetryClient()
+        BufferedTelemetryClient(backend).track_trace("Info")
+        self.assertEqual(backend.traces, [("Info", None, None)])
@@ -0,0 +1,45 @@
+import datetime
+
+import aiounittest
+
+from dialogs import BookingDialog
+from helpers.timex_parser import TIMEX_PARSER, TimexParser, parse_timex
+
+
+class TimexParserTest(aiounittest.AsyncTestCase):
+    def test_parsed_records(self):
+        parsed = TimexParser().parse("2023-02-10T08")
+        self.assertEqual(parsed.date, datetime.date(2023, 2, 10))
+        self.assertTrue(parsed.definite)
+        self.assertIsInstance(parsed.types, frozenset)
+
+        parsed = TimexParser().parse("XXXX-02-10")
+        self.assertIsNone(parsed.date)
+        self.assertFalse(parsed.definite)
+
+    def test_bounded_memo_and_stats(self):
+        parser = TimexParser(max_entries=2)
+        for timex in ("2023-02-10", "2023-02-10", "2023-02-11", "2023-02-12", "2023-02-10"):
+            parser.parse(timex)
+        self.assertIs(parser.parse("2023-02-12"), parser.parse("2023-02-12"))
+        self.assertEqual(parser.stats(), {"entries": 2, "hits": 3, "misses": 4})
+
+    def test_counters_survive_clear(self):
+        parser = TimexParser()
+        parser.parse("2023-02-10")
+        parser.parse("2023-02-10")
+        parser.clear()
+        parser.parse("2023-02-10")
+
+        self.assertEqual(parser.stats(), {"entries": 1, "hits": 1, "misses": 2})
+        samples = [sample for metric in parser.metrics() if metric.kind == "counter" for sample in metric.samples()]
+        self.assertEqual(samples, ["bot_timex_cache_hits_total 1", "bot_timex_cache_misses_total 2"])
+
+    def test_booking_dialog_shares_the_memo(self):
+        TIMEX_PARSER.clear()
+        hits = TIMEX_PARSER.stats()["hits"]
+        dialog = BookingDialog()
+        self.assertFalse(dialog.is_ambiguous("2023-02-10"))
+        self.assertTrue(dialog.is_ambiguous("XXXX-02-10"))
+        self.assertFalse(parse_timex("2023-02-10").date is None)
+        self.assertEqual(TIMEX_PARSER.stats()["hits"], hits + 1)
@@ -0,0 +1,90 @@
+import tempfile
+
+import aiounittest
+from botbuilder.core import MemoryStorage
+from botbuilder.dialogs import DialogInstance, DialogState
+
+from booking_details import BookingDetails
+from storage import SqliteStorage, TrackedConversationState
+from tests.utils import make_context
+
+
+class RecordingMemoryStorage(MemoryStorage):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    async def write(self, changes):
+        self.writes += 1
+        await super().write(changes)
+
+
+class RecordingSqliteStorage(SqliteStorage):
+    def __init__(self, directory: str):
+        super().__init__(directory, shards=2)
+        self.written_parts = []
+
+    async def write_parts(self, key, changed, removed=()):
+        self.written_parts.append((sorted(changed), sorted(removed)))
+        await super().write_parts(key, changed, removed)
+
+
+def dialog_instance(dialog_id: str, state: dict) -> DialogInstance:
+    instance = DialogInstance()
+    instance.id = dialog_id
+    instance.state = state
+    return instance
+
+
+class TrackedStateTest(aiounittest.AsyncTestCase):
+    async def test_unchanged_state_is_not_written(self):
+        storage = RecordingMemoryStorage()
+        conversation_state = TrackedConversationState(storage)
+        accessor = conversation_state.create_property("count")
+
+        turn_context = make_context()
+        await accessor.set(turn_context, 1)
+        await conversation_state.save_changes(turn_context)
+        self.assertEqual(storage.writes, 1)
+
+        turn_context = make_context()
+        self.assertEqual(await accessor.get(turn_context), 1)
+        await conversation_state.save_changes(turn_context)
+        self.assertEqual(storage.writes, 1)
+
+    async def test_only_changed_stack_frames_are_written(self):
+        with tempfile.TemporaryDirectory() as directory:
+            storage = RecordingSqliteStorage(directory)
+            conversation_state = TrackedConversationState(storage)
+            accessor = conversation_state.create_property("DialogState")
+
+            turn_context = make_context()
+            await accessor.set(turn_context, DialogState([
+                dialog_instance("BookingDialog", {"options": BookingDetails(dst_city="Paris"), "stepIndex": 0}),
+                dialog_instance("MainDialog", {"stepIndex": 1}),
+            ]))
+            await conversation_state.save_changes(turn_context)
+
+            # Next turn: the booking dialog advances and pushes a prompt on top of the stack.
+            turn_context = make_context()
+            dialog_state = await accessor.get(turn_context)
+            dialog_state.dialog_stack[0].state["stepIndex"] = 1
+            dialog_state.dialog_stack.insert(0, dialog_instance("TextPrompt", {}))
+            await conversation_state.save_changes(turn_context)
+
+            # Then the prompt completes.
+            turn_context = make_context()
+            dialog_state = await accessor.get(turn_context)
+            self.assertEqual(
+                [instance.id for instance in dialog_state.dialog_stack], ["TextPrompt", "BookingDialog", "MainDialog"]
+            )
+            self.assertEqual(dialog_state.dialog_stack[1].state["options"].dst_city, "Paris")
+            dialog_state.dialog_stack.pop(0)
+            await conversation_state.save_changes(turn_context)
+            await storage.close()
+
+        self.assertEqual(storage.written_parts, [
+            (["p:DialogState", "s:DialogState:0000", "s:DialogState:0001"], []),
+            (["s:DialogState:0001", "s:DialogState:0002"], []),
+            ([], ["s:DialogState:0002"]),
+        ])
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import tempfile
+import time
+
+import aiounittest
+
+from helpers.turn_profiler import TurnProfiler
+
+
+def busy_turn(seconds: float):
+    deadline = time.process_time() + seconds
+    while time.process_time() < deadline:
+        pass
+
+
+def other_turn(seconds: float):
+    busy_turn(seconds)
+
+
+def read_profiles(directory: str) -> list:
+    profiles = []
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), encoding="utf-8") as file:
+            profiles.append(file.read())
+    return profiles
+
+
+class TurnProfilerTest(aiounittest.AsyncTestCase):
+    async def test_samples_one_in_n_turns_as_collapsed_stacks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            profiler = TurnProfiler(directory, sample_rate=2, interval=0.001)
+            for _ in range(4):
+                async with profiler.profile("conversation"):
+                    busy_turn(0.05)
+            await profiler.drain()
+
+            profiles = read_profiles(directory)
+
+        self.assertEqual(len(profiles), 2)
+        self.assertEqual(profiler.profiles.value(), 2)
+        for profile in profiles:
+            stack, count = profile.splitlines()[0].rsplit(" ", 1)
+            self.assertGreater(int(count), 0)
+            self.assertIn("test_samples_one_in_n_turns_as_collapsed_stacks", profile)
+            self.assertIn(";busy_turn (tests/turn_profiler_test.py:", profile)
+
+    async def test_flagged_conversations_only_count_their_own_turn(self):
+        with tempfile.TemporaryDirectory() as directory:
+            profiler = TurnProfiler(directory, interval=0.001)
+            profiler.update(flag=["flagged"])
+
+            async def turn(conversation_id: str, work):
+                async with profiler.profile(conversation_id):
+                    for _ in range(10):
+                        work(0.005)
+                        await asyncio.sleep(0)
+
+            await asyncio.gather(turn("flagged", busy_turn), turn("other", other_turn))
+            profiler.update(unflag=["flagged"])
+            await turn("flagged", busy_turn)
+            await profiler.drain()
+
+            profiles = read_profiles(directory)
+
+        self.assertEqual(len(profiles), 1)
+        self.assertIn("busy_turn", profiles[0])
+        self.assertNotIn("other_turn", profiles[0])
+
+    async def test_keeps_the_latest_profiles(self):
+        with tempfile.TemporaryDirectory() as directory:
+            profiler = TurnProfiler(directory, sample_rate=1, interval=0.001, max_files=2)
+            for index in range(3):
+                async with profiler.profile(f"conversation/{index}"):
+                    busy_turn(0.02)
+                await profiler.drain()
+
+            names = sorted(os.listdir(directory))
+
+        self.assertEqual(len(names), 2)
+        self.assertTrue(names[0].endswith("-conversation_1.folded"))
+        self.assertTrue(names[1].endswith("-conversation_2.folded"))
+
+    def test_rejects_invalid_settings(self):
+        profiler = TurnProfiler("profiles")
+        with self.assertRaises(ValueError):
+            profiler.update(sample_rate=-1)
+        with self.assertRaises(ValueError):
+            profiler.update(flag="conversation")
+        self.assertEqual(profiler.stats()["sample_rate"], 0)
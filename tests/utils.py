@@ -0,0 +1,35 @@
+"""Helpers shared by the test modules: turn contexts, recognizers and a controllable clock."""
+from botbuilder.core import IntentScore, Recognizer, RecognizerResult, TurnContext
+from botbuilder.core.adapters import TestAdapter
+from botbuilder.schema import Activity, ActivityTypes, ChannelAccount, ConversationAccount
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StaticRecognizer(Recognizer):
+    """Answers the "None" intent without entities, counting its calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def recognize(self, turn_context: TurnContext) -> RecognizerResult:
+        self.calls += 1
+        return RecognizerResult(text=turn_context.activity.text, intents={"None": IntentScore(1.0)}, entities={})
+
+
+def make_context(text: str = None, locale: str = None) -> TurnContext:
+    """Context of a message turn of the user "user" in the conversation "conversation"."""
+    return TurnContext(TestAdapter(), Activity(
+        type=ActivityTypes.message,
+        text=text,
+        locale=locale,
+        channel_id="test",
+        from_property=ChannelAccount(id="user"),
+        conversation=ConversationAccount(id="conversation"),
+    ))
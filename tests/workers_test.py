@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+
+import aiounittest
+
+from config import DefaultConfig
+from workers import Supervisor, run_workers
+
+
+class WorkersTest(aiounittest.AsyncTestCase):
+    def test_crashed_worker_is_restarted_with_backoff(self):
+        supervisor = Supervisor([sys.executable, "-c", "import sys; sys.exit(3)"], 1, min_restart_delay=0.05)
+        worker = supervisor.workers[0]
+        supervisor._start(worker)
+        worker.process.wait()
+
+        supervisor._check(worker)
+        self.assertIsNone(worker.process)
+        self.assertEqual(worker.restart_delay, 0.05)
+
+        time.sleep(0.06)
+        supervisor._check(worker)
+        self.assertEqual(worker.restarts, 1)
+        worker.process.wait()
+
+        supervisor._check(worker)
+        self.assertEqual(worker.restart_delay, 0.1)
+
+    def test_memory_storage_is_refused(self):
+        config = DefaultConfig()
+        config.WORKERS = 2
+        config.STATE_STORAGE = ""
+        config.STATE_STORAGE_PATH = ""
+        with self.assertRaises(Exception):
+            run_workers(config, [sys.executable, "app.py"])
+
+    def test_write_behind_is_refused(self):
+        config = DefaultConfig()
+        config.WORKERS = 2
+        config.STATE_STORAGE_PATH = "state"
+        os.environ["StateStorageWriteBehind"] = "true"
+        try:
+            with self.assertRaises(Exception):
+                run_workers(config, [sys.executable, "app.py"])
+        finally:
+            del os.environ["StateStorageWriteBehind"]
@@ -0,0 +1,152 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+"""
+Multi-process mode: a supervisor running `Workers` copies of app.py bound to the same port with SO_REUSEPORT,
+the kernel spreading connections across them. Crashed workers are restarted with an exponential backoff.
+
+Conversations move between workers from one turn to the next, so their state must live in a storage shared
+by the processes (StateStorage "sqlite" or a custom one, not "memory"):
+
+    Workers=4 StateStoragePath=/var/lib/flyme/state python app.py
+
+For a turn handled by another worker to see the state saved by the previous one, the storage must commit before
+the turn ends: write-behind is turned off in the workers, and the supervisor refuses to start with
+StateStorageWriteBehind=true.
+
+The turns of a conversation are run one at a time within a worker only (see helpers/mailbox.py): two messages of
+a conversation reaching different workers may still run concurrently. The conversation state is written part by
+part without an e_tag check, so the last writer of each part wins and the saved dialog stack may then mix frames
+of both turns.
+"""
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from config import DefaultConfig
+
+POLL_INTERVAL = 0.5
+# A worker living longer than this is considered healthy again: its next crash restarts it right away.
+HEALTHY_UPTIME = 60.0
+
+
+class _Worker:
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.process: Optional[subprocess.Popen] = None
+        self.started_at = 0.0
+        self.restart_delay = 0.0
+        self.restart_at = 0.0
+        self.restarts = 0
+
+
+class Supervisor:
+    """Starts the workers, restarts the ones that exit and stops them all on SIGINT/SIGTERM."""
+
+    def __init__(
+            self,
+            command: List[str],
+            workers: int,
+            env: Dict[str, str] = None,
+            min_restart_delay: float = 1.0,
+            max_restart_delay: float = 30.0,
+            stop_timeout: float = 10.0,
+    ):
+        if workers < 1:
+            raise Exception("[Supervisor]: at least one worker is required")
+        self.command = command
+        self.env = dict(os.environ if env is None else env)
+        self.min_restart_delay = min_restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stop_timeout = stop_timeout
+        self.workers = [_Worker(worker_id) for worker_id in range(workers)]
+        self._stopping = False
+
+    def _start(self, worker: _Worker) -> None:
+        env = dict(self.env, WorkerId=str(worker.worker_id))
+        worker.process = subprocess.Popen(self.command, env=env)
+        worker.started_at = time.monotonic()
+        print(f"[Supervisor]: worker {worker.worker_id} started, pid {worker.process.pid}", file=sys.stderr)
+
+    def _check(self, worker: _Worker) -> None:
+        now = time.monotonic()
+        if worker.process is None:
+            if now >= worker.restart_at:
+                worker.restarts += 1
+                self._start(worker)
+            return
+
+        return_code = worker.process.poll()
+        if return_code is None:
+            return
+
+        uptime = now - worker.started_at
+        if uptime >= HEALTHY_UPTIME:
+            worker.restart_delay = 0.0
+        else:
+            worker.restart_delay = min(
+                self.max_restart_delay, max(self.min_restart_delay, worker.restart_delay * 2)
+            )
+        worker.process = None
+        worker.restart_at = now + worker.restart_delay
+        print(
+            f"[Supervisor]: worker {worker.worker_id} exited with code {return_code} after {uptime:.1f}s,"
+            f" restarting in {worker.restart_delay:.1f}s",
+            file=sys.stderr,
+        )
+
+    def stop(self, *_) -> None:
+        self._stopping = True
+
+    def run(self) -> None:
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        for worker in self.workers:
+            self._start(worker)
+        try:
+            while not self._stopping:
+                for worker in self.workers:
+                    self._check(worker)
+                time.sleep(POLL_INTERVAL)
+        finally:
+            self._stop_workers()
+
+    def _stop_workers(self) -> None:
+        running = [worker.process for worker in self.workers if worker.process and worker.process.poll() is None]
+        for process in running:
+            # SIGINT lets aiohttp run the cleanup hooks (state and telemetry flushes).
+            process.send_signal(signal.SIGINT)
+
+        deadline = time.monotonic() + self.stop_timeout
+        for process in running:
+            try:
+                process.wait(max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+def run_workers(configuration: DefaultConfig, command: List[str]) -> None:
+    """Supervise `configuration.WORKERS` processes running `command`."""
+    if configuration.STATE_STORAGE == "memory" or not (configuration.STATE_STORAGE or configuration.STATE_STORAGE_PATH):
+        raise Exception(
+            "[run_workers]: conversations move between workers, set StateStoragePath (or StateStorage) to a"
+            " storage shared by the processes"
+        )
+    env = dict(os.environ)
+    if env.get("StateStorageWriteBehind", "false").lower() == "true":
+        raise Exception(
+            "[run_workers]: a turn handled by another worker must see the previous turn's state, unset"
+            " StateStorageWriteBehind or set it to false"
+        )
+
+    # The workers read their configuration from the environment: wait for commits at the end of each turn.
+    env["StateStorageWriteBehind"] = "false"
+    Supervisor(command, configuration.WORKERS, env).run()
+
+
+if __name__ == "__main__":
+    run_workers(DefaultConfig(), [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")])